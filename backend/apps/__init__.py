@@ -1 +1 @@
-# Users app
+# Users app
@@ -1,18 +1,18 @@
-# Generated by Django 4.2.28 on 2026-02-05 20:46
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('payments', '0001_initial'),
-    ]
-
-    operations = [
-        migrations.AddField(
-            model_name='transaction',
-            name='screenshot',
-            field=models.ImageField(blank=True, null=True, upload_to='payment_screenshots/'),
-        ),
-    ]
+# Generated by Django 4.2.28 on 2026-02-05 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='screenshot',
+            field=models.ImageField(blank=True, null=True, upload_to='payment_screenshots/'),
+        ),
+    ]
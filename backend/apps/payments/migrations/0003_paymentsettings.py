@@ -1,27 +1,27 @@
-# Generated by Django 4.2.28 on 2026-02-05 21:07
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('payments', '0002_transaction_screenshot'),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='PaymentSettings',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('upi_id', models.CharField(default='sajin.602@oksbi', max_length=100)),
-                ('qr_code', models.ImageField(blank=True, null=True, upload_to='payment_settings/')),
-                ('is_active', models.BooleanField(default=True)),
-                ('updated_at', models.DateTimeField(auto_now=True)),
-            ],
-            options={
-                'verbose_name': 'Payment Settings',
-                'verbose_name_plural': 'Payment Settings',
-            },
-        ),
-    ]
+# Generated by Django 4.2.28 on 2026-02-05 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_transaction_screenshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentSettings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upi_id', models.CharField(default='sajin.602@oksbi', max_length=100)),
+                ('qr_code', models.ImageField(blank=True, null=True, upload_to='payment_settings/')),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Payment Settings',
+                'verbose_name_plural': 'Payment Settings',
+            },
+        ),
+    ]
@@ -1,27 +1,36 @@
-from django.contrib import admin
-from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
-
-
-@admin.register(User)
-class UserAdmin(BaseUserAdmin):
-    list_display = ['email', 'name', 'is_active', 'is_admin', 'created_at']
-    list_filter = ['is_active', 'is_admin', 'is_staff']
-    search_fields = ['email', 'name']
-    ordering = ['-created_at']
-    
-    fieldsets = (
-        (None, {'fields': ('email', 'password')}),
-        ('Personal Info', {'fields': ('name', 'avatar')}),
-        ('Permissions', {'fields': ('is_active', 'is_staff', 'is_admin', 'is_superuser', 'groups', 'user_permissions')}),
-        ('Dates', {'fields': ('created_at', 'updated_at')}),
-    )
-    
-    add_fieldsets = (
-        (None, {
-            'classes': ('wide',),
-            'fields': ('email', 'name', 'password1', 'password2'),
-        }),
-    )
-    
-    readonly_fields = ['created_at', 'updated_at']
+from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from .models import User, EmailOutbox
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    list_display = ['email', 'name', 'is_active', 'is_admin', 'created_at']
+    list_filter = ['is_active', 'is_admin', 'is_staff']
+    search_fields = ['email', 'name']
+    ordering = ['-created_at']
+    
+    fieldsets = (
+        (None, {'fields': ('email', 'password')}),
+        ('Personal Info', {'fields': ('name', 'avatar')}),
+        ('Permissions', {'fields': ('is_active', 'is_staff', 'is_admin', 'is_superuser', 'groups', 'user_permissions')}),
+        ('Dates', {'fields': ('created_at', 'updated_at')}),
+    )
+    
+    add_fieldsets = (
+        (None, {
+            'classes': ('wide',),
+            'fields': ('email', 'name', 'password1', 'password2'),
+        }),
+    )
+    
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'subject', 'status', 'attempts', 'provider', 'latency_ms', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'provider']
+    search_fields = ['recipient', 'subject']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at', 'sent_at', 'latency_ms', 'provider', 'last_error']
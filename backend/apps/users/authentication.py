@@ -0,0 +1,108 @@
+"""
+JWT authentication with a cached user lookup.
+
+simplejwt's JWTAuthentication loads the User row on every request. Here the
+user is resolved from a two-level cache instead: a per-process dict with a
+very short TTL in front of the shared Django cache. Saving or deleting a
+user (which covers deactivation and password changes) invalidates both
+levels in the current process and the shared cache; other workers' local
+entries expire within AUTH_USER_LOCAL_CACHE_TIMEOUT seconds.
+
+The shared level is only used when the default cache really is shared
+(Redis). With the per-process LocMemCache an invalidation would not reach
+the other workers, so only the short-lived local level is kept and a stale
+user is accepted for at most AUTH_USER_LOCAL_CACHE_TIMEOUT seconds either
+way.
+
+Code that changes user rows with queryset.update() bypasses the signal and
+must call invalidate_user() itself.
+"""
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from config import caching, metrics
+
+CACHE_REQUESTS = metrics.counter(
+    'voiceai_cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result']
+)
+
+_local_users = {}
+_local_lock = threading.Lock()
+
+
+def _cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_cached_user(user_id):
+    """Return a private copy of the cached user, or None on a miss."""
+    user_id = str(user_id)
+    now = time.monotonic()
+    with _local_lock:
+        entry = _local_users.get(user_id)
+    if entry and entry[1] > now:
+        return copy.copy(entry[0])
+
+    if not caching.is_shared():
+        return None
+    user = cache.get(_cache_key(user_id))
+    if user is not None:
+        _store_local(user_id, user)
+        return copy.copy(user)
+    return None
+
+
+def cache_user(user):
+    if caching.is_shared():
+        cache.set(_cache_key(user.pk), user, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+    _store_local(user.pk, user)
+
+
+def invalidate_user(user_id):
+    cache.delete(_cache_key(user_id))
+    with _local_lock:
+        _local_users.pop(str(user_id), None)
+
+
+def _store_local(user_id, user):
+    timeout = getattr(settings, 'AUTH_USER_LOCAL_CACHE_TIMEOUT', 5)
+    if timeout <= 0:
+        return
+    with _local_lock:
+        _local_users[str(user_id)] = (copy.copy(user), time.monotonic() + timeout)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves users through the user cache."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = get_cached_user(user_id)
+        CACHE_REQUESTS.inc(cache='auth_user', result='miss' if user is None else 'hit')
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+            return user
+
+        # Same checks simplejwt applies to a freshly loaded user
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
@@ -0,0 +1,52 @@
+"""
+Worker that delivers queued emails from the outbox.
+Run with: python manage.py dispatch_emails
+Options:
+  --once          Deliver one batch and exit
+  --interval N    Seconds to sleep when the queue is empty (default 2)
+  --batch-size N  Messages claimed per batch (default 50)
+  --stats         Print delivery stats per provider and exit
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.users import outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox with retries and backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Deliver one batch and exit')
+        parser.add_argument('--interval', type=float, default=2.0, help='Idle poll interval in seconds')
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages claimed per batch')
+        parser.add_argument('--max-attempts', type=int, default=outbox.MAX_ATTEMPTS, help='Attempts before a message is marked failed')
+        parser.add_argument('--stats', action='store_true', help='Print delivery stats per provider and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for row in outbox.provider_stats():
+                latency = row['avg_latency_ms']
+                latency = f'{latency:.0f}' if latency is not None else '-'
+                self.stdout.write(
+                    f"{row['provider']}: sent={row['sent']} failed={row['failed']} "
+                    f"retrying={row['retrying']} avg_latency_ms={latency}"
+                )
+            return
+
+        self.stdout.write('Email dispatcher started.')
+        while True:
+            close_old_connections()
+            sent, not_sent = outbox.dispatch_pending(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            if sent or not_sent:
+                self.stdout.write(f'Delivered {sent}, deferred/failed {not_sent}')
+            if options['once']:
+                return
+            if not sent and not not_sent:
+                time.sleep(options['interval'])
@@ -1,30 +1,30 @@
-# Generated by Django 6.0.2 on 2026-02-05 19:10
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('users', '0001_initial'),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='EmailOTP',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('email', models.EmailField(max_length=254)),
-                ('otp', models.CharField(max_length=6)),
-                ('name', models.CharField(max_length=255)),
-                ('password', models.CharField(max_length=255)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('expires_at', models.DateTimeField()),
-                ('is_used', models.BooleanField(default=False)),
-            ],
-            options={
-                'db_table': 'email_otps',
-                'ordering': ['-created_at'],
-            },
-        ),
-    ]
+# Generated by Django 6.0.2 on 2026-02-05 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOTP',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('otp', models.CharField(max_length=6)),
+                ('name', models.CharField(max_length=255)),
+                ('password', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('is_used', models.BooleanField(default=False)),
+            ],
+            options={
+                'db_table': 'email_otps',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
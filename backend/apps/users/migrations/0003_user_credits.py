@@ -1,18 +1,18 @@
-# Generated by Django 4.2.28 on 2026-02-05 20:22
-
-from django.db import migrations, models
-
-
-class Migration(migrations.Migration):
-
-    dependencies = [
-        ('users', '0002_emailotp'),
-    ]
-
-    operations = [
-        migrations.AddField(
-            model_name='user',
-            name='credits',
-            field=models.IntegerField(default=10),
-        ),
-    ]
+# Generated by Django 4.2.28 on 2026-02-05 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_emailotp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='credits',
+            field=models.IntegerField(default=10),
+        ),
+    ]
@@ -0,0 +1,209 @@
+"""
+Email outbox.
+
+Request handlers enqueue messages here and return immediately; the
+dispatch_emails management command delivers them with retries and
+exponential backoff, so a slow Resend/SMTP round trip never holds a
+Gunicorn thread.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from config import metrics
+
+from .models import EmailOutbox
+
+EMAIL_SEND_SECONDS = metrics.histogram(
+    'voiceai_email_send_seconds', 'Email delivery latency per provider', ['provider']
+)
+EMAIL_FAILURES = metrics.counter(
+    'voiceai_email_failures_total', 'Failed email delivery attempts per provider', ['provider']
+)
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+# A claimed message is retried if its dispatcher dies before recording a result
+CLAIM_LEASE_SECONDS = 5 * 60
+
+
+def enqueue_email(subject, message, recipient, from_email=None):
+    """Queue a plain-text email for delivery by the dispatcher."""
+    return EmailOutbox.objects.create(
+        recipient=recipient,
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL or '',
+        next_attempt_at=timezone.now(),
+    )
+
+
+def backoff_delay(attempts):
+    """Seconds to wait before retry number `attempts` (1-based)."""
+    return min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+
+
+def provider_name():
+    return getattr(settings, 'EMAIL_BACKEND', '').rsplit('.', 1)[-1]
+
+
+def claim_due(batch_size):
+    """
+    Atomically move up to `batch_size` due messages to 'sending'.
+
+    Uses SKIP LOCKED where the database supports it, so several dispatchers
+    can run side by side without sending a message twice. Claims are leased:
+    a 'sending' row whose lease expired is picked up again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = EmailOutbox.objects.filter(
+            status__in=['queued', 'sending'], next_attempt_at__lte=now
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        claimed = list(due.order_by('next_attempt_at')[:batch_size])
+        EmailOutbox.objects.filter(id__in=[m.id for m in claimed]).update(
+            status='sending',
+            next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS),
+        )
+    return claimed
+
+
+def _build_message(outbox_message, email_connection):
+    return EmailMessage(
+        subject=outbox_message.subject,
+        body=outbox_message.body,
+        from_email=outbox_message.from_email or None,
+        to=[outbox_message.recipient],
+        connection=email_connection,
+    )
+
+
+def _record_success(outbox_message, latency_ms):
+    EMAIL_SEND_SECONDS.observe(latency_ms / 1000, provider=provider_name())
+    outbox_message.attempts += 1
+    outbox_message.provider = provider_name()
+    outbox_message.latency_ms = latency_ms
+    outbox_message.status = 'sent'
+    outbox_message.sent_at = timezone.now()
+    outbox_message.last_error = ''
+    outbox_message.save(update_fields=[
+        'attempts', 'provider', 'latency_ms', 'last_error', 'status', 'sent_at',
+    ])
+
+
+def deliver(outbox_message, email_connection, max_attempts=MAX_ATTEMPTS):
+    """Send one claimed message and record the outcome on its row."""
+    message = _build_message(outbox_message, email_connection)
+    started = time.monotonic()
+    try:
+        message.send(fail_silently=False)
+    except Exception as e:
+        EMAIL_FAILURES.inc(provider=provider_name())
+        outbox_message.attempts += 1
+        outbox_message.provider = provider_name()
+        outbox_message.latency_ms = int((time.monotonic() - started) * 1000)
+        outbox_message.last_error = str(e)[:2000]
+        if outbox_message.attempts >= max_attempts:
+            outbox_message.status = 'failed'
+        else:
+            outbox_message.status = 'queued'
+            outbox_message.next_attempt_at = timezone.now() + timedelta(
+                seconds=backoff_delay(outbox_message.attempts)
+            )
+        outbox_message.save(update_fields=[
+            'attempts', 'provider', 'latency_ms', 'last_error', 'status', 'next_attempt_at',
+        ])
+        return False
+    _record_success(outbox_message, int((time.monotonic() - started) * 1000))
+    return True
+
+
+def _deliver_batch(claimed, email_connection):
+    """
+    Hand the whole batch to a backend that sends it in one API call.
+
+    Returns the messages that did not go through (without recording
+    anything for them), so the caller can retry them one by one. A backend
+    that sent part of the batch before failing reports the delivered
+    messages on the exception as `sent_messages` (see PartialSendError in
+    config/email_backend.py); those are recorded as sent.
+    """
+    started = time.monotonic()
+    messages = [_build_message(m, email_connection) for m in claimed]
+    try:
+        sent = email_connection.send_messages(messages)
+    except Exception as e:
+        delivered = {id(message) for message in getattr(e, 'sent_messages', ())}
+    else:
+        if sent != len(claimed):
+            return claimed
+        delivered = {id(message) for message in messages}
+    latency_ms = int((time.monotonic() - started) * 1000)
+    remaining = []
+    for outbox_message, message in zip(claimed, messages):
+        if id(message) in delivered:
+            _record_success(outbox_message, latency_ms)
+        else:
+            remaining.append(outbox_message)
+    return remaining
+
+
+def dispatch_pending(batch_size=50, max_attempts=MAX_ATTEMPTS):
+    """
+    Deliver one batch of due messages over a single backend connection.
+
+    Backends that advertise `supports_batch` (e.g. ResendEmailBackend) get
+    the whole batch in one call; others, or the messages of a batch that
+    failed, are sent message by message so each failure is retried on its own.
+
+    Returns a (sent, not_sent) tuple; not_sent messages are retried or failed.
+    """
+    claimed = claim_due(batch_size)
+    if not claimed:
+        return 0, 0
+
+    sent = 0
+    email_connection = get_connection(fail_silently=False)
+    try:
+        email_connection.open()
+    except Exception:
+        # Let each message record the connection error and back off
+        pass
+    try:
+        remaining = claimed
+        if len(claimed) > 1 and getattr(email_connection, 'supports_batch', False):
+            remaining = _deliver_batch(claimed, email_connection)
+            sent = len(claimed) - len(remaining)
+        for outbox_message in remaining:
+            if deliver(outbox_message, email_connection, max_attempts):
+                sent += 1
+    finally:
+        try:
+            email_connection.close()
+        except Exception:
+            pass
+    return sent, len(claimed) - sent
+
+
+def provider_stats():
+    """Delivery counts and average latency per email provider."""
+    return list(
+        EmailOutbox.objects.exclude(provider='')
+        .values('provider')
+        .annotate(
+            sent=Count('id', filter=Q(status='sent')),
+            failed=Count('id', filter=Q(status='failed')),
+            retrying=Count('id', filter=Q(status='queued', attempts__gt=0)),
+            avg_latency_ms=Avg('latency_ms', filter=Q(status='sent')),
+        )
+        .order_by('provider')
+    )
@@ -1,120 +1,127 @@
-from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from django.contrib.auth import get_user_model
-from django.contrib.auth.password_validation import validate_password
-
-User = get_user_model()
-
-
-class UserSerializer(serializers.ModelSerializer):
-    """Serializer for user details."""
-    
-    class Meta:
-        model = User
-        fields = ['id', 'email', 'name', 'avatar', 'is_admin', 'created_at', 'credits']
-        read_only_fields = ['id', 'email', 'is_admin', 'created_at', 'credits']
-
-
-class RegisterSerializer(serializers.ModelSerializer):
-    """Serializer for user registration."""
-    
-    password = serializers.CharField(write_only=True, validators=[validate_password])
-    password_confirm = serializers.CharField(write_only=True)
-    
-    class Meta:
-        model = User
-        fields = ['email', 'name', 'password', 'password_confirm']
-    
-    def validate(self, attrs):
-        if attrs['password'] != attrs['password_confirm']:
-            raise serializers.ValidationError({'password_confirm': 'Passwords do not match'})
-        return attrs
-    
-    def create(self, validated_data):
-        validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
-        return user
-
-
-class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
-    """Custom JWT serializer with additional user data."""
-    
-    @classmethod
-    def get_token(cls, user):
-        token = super().get_token(user)
-        token['email'] = user.email
-        token['name'] = user.name
-        token['is_admin'] = user.is_admin
-        return token
-    
-    def validate(self, attrs):
-        data = super().validate(attrs)
-        data['user'] = UserSerializer(self.user).data
-        return data
-
-
-class ChangePasswordSerializer(serializers.Serializer):
-    """Serializer for password change."""
-    
-    old_password = serializers.CharField(required=True)
-    new_password = serializers.CharField(required=True, validators=[validate_password])
-    
-    def validate_old_password(self, value):
-        user = self.context['request'].user
-        if not user.check_password(value):
-            raise serializers.ValidationError('Current password is incorrect')
-        return value
-
-
-class AdminUserSerializer(serializers.ModelSerializer):
-    """Serializer for admin user management."""
-    
-    password = serializers.CharField(write_only=True, required=False)
-    
-    class Meta:
-        model = User
-        fields = ['id', 'email', 'name', 'avatar', 'is_active', 'is_admin', 'created_at', 'password']
-        read_only_fields = ['id', 'created_at']
-    
-    def create(self, validated_data):
-        password = validated_data.pop('password', None)
-        user = User(**validated_data)
-        if password:
-            user.set_password(password)
-        user.save()
-        return user
-    
-    def update(self, instance, validated_data):
-        password = validated_data.pop('password', None)
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        if password:
-            instance.set_password(password)
-        instance.save()
-        return instance
-
-
-class SendOTPSerializer(serializers.Serializer):
-    """Serializer for sending OTP."""
-    
-    email = serializers.EmailField()
-    name = serializers.CharField(max_length=255)
-    password = serializers.CharField(write_only=True, validators=[validate_password])
-    password_confirm = serializers.CharField(write_only=True)
-    
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError('Email already registered')
-        return value
-    
-    def validate(self, attrs):
-        if attrs['password'] != attrs['password_confirm']:
-            raise serializers.ValidationError({'password_confirm': 'Passwords do not match'})
-        return attrs
-
-
-class VerifyOTPSerializer(serializers.Serializer):
-    """Serializer for verifying OTP."""
-    
-    email = serializers.EmailField()
-    otp = serializers.CharField(max_length=6, min_length=6)
+from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+
+User = get_user_model()
+
+
+class UserSerializer(serializers.ModelSerializer):
+    """Serializer for user details."""
+    
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'name', 'avatar', 'is_admin', 'created_at', 'credits']
+        read_only_fields = ['id', 'email', 'is_admin', 'created_at', 'credits']
+
+
+class RegisterSerializer(serializers.ModelSerializer):
+    """Serializer for user registration."""
+    
+    password = serializers.CharField(write_only=True, validators=[validate_password])
+    password_confirm = serializers.CharField(write_only=True)
+    
+    class Meta:
+        model = User
+        fields = ['email', 'name', 'password', 'password_confirm']
+    
+    def validate(self, attrs):
+        if attrs['password'] != attrs['password_confirm']:
+            raise serializers.ValidationError({'password_confirm': 'Passwords do not match'})
+        return attrs
+    
+    def create(self, validated_data):
+        validated_data.pop('password_confirm')
+        user = User.objects.create_user(**validated_data)
+        return user
+
+
+class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Custom JWT serializer with additional user data."""
+    
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['email'] = user.email
+        token['name'] = user.name
+        token['is_admin'] = user.is_admin
+        return token
+    
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        data['user'] = UserSerializer(self.user).data
+        return data
+
+
+class ChangePasswordSerializer(serializers.Serializer):
+    """Serializer for password change."""
+    
+    old_password = serializers.CharField(required=True)
+    new_password = serializers.CharField(required=True, validators=[validate_password])
+    
+    def validate_old_password(self, value):
+        user = self.context['request'].user
+        if not user.check_password(value):
+            raise serializers.ValidationError('Current password is incorrect')
+        return value
+
+
+class AdminUserSerializer(serializers.ModelSerializer):
+    """Serializer for admin user management."""
+    
+    password = serializers.CharField(write_only=True, required=False)
+    
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'name', 'avatar', 'is_active', 'is_admin', 'created_at', 'password']
+        read_only_fields = ['id', 'created_at']
+    
+    def create(self, validated_data):
+        password = validated_data.pop('password', None)
+        user = User(**validated_data)
+        if password:
+            user.set_password(password)
+        user.save()
+        return user
+    
+    def update(self, instance, validated_data):
+        password = validated_data.pop('password', None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        if password:
+            instance.set_password(password)
+        instance.save()
+        return instance
+
+
+class SendOTPSerializer(serializers.Serializer):
+    """Serializer for sending OTP."""
+    
+    email = serializers.EmailField()
+    name = serializers.CharField(max_length=255)
+    password = serializers.CharField(write_only=True, validators=[validate_password])
+    password_confirm = serializers.CharField(write_only=True)
+    
+    def validate_email(self, value):
+        if User.objects.filter(email=value).exists():
+            raise serializers.ValidationError('Email already registered')
+        return value
+    
+    def validate(self, attrs):
+        if attrs['password'] != attrs['password_confirm']:
+            raise serializers.ValidationError({'password_confirm': 'Passwords do not match'})
+        return attrs
+
+
+class TextMailSerializer(serializers.Serializer):
+    """Serializer for the text mail endpoint."""
+    
+    email = serializers.EmailField()
+    message = serializers.CharField()
+
+
+class VerifyOTPSerializer(serializers.Serializer):
+    """Serializer for verifying OTP."""
+    
+    email = serializers.EmailField()
+    otp = serializers.CharField(max_length=6, min_length=6)
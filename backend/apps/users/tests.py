@@ -1,31 +1,276 @@
-from django.test import TestCase
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
-class UserTests(TestCase):
-    def test_create_user(self):
-        """Test creating a new user with email and password."""
-        email = 'test@example.com'
-        password = 'testpassword123'
-        name = 'Test User'
-        
-        user = User.objects.create_user(email=email, password=password, name=name)
-        
-        self.assertEqual(user.email, email)
-        self.assertEqual(user.name, name)
-        self.assertTrue(user.check_password(password))
-        self.assertTrue(user.is_active)
-        self.assertFalse(user.is_staff)
-        self.assertFalse(user.is_superuser)
-
-    def test_create_superuser(self):
-        """Test creating a superuser."""
-        email = 'admin@example.com'
-        password = 'adminpassword123'
-        
-        admin = User.objects.create_superuser(email=email, password=password)
-        
-        self.assertTrue(admin.is_staff)
-        self.assertTrue(admin.is_superuser)
-        self.assertTrue(admin.is_active)
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+class UserTests(TestCase):
+    def test_create_user(self):
+        """Test creating a new user with email and password."""
+        email = 'test@example.com'
+        password = 'testpassword123'
+        name = 'Test User'
+        
+        user = User.objects.create_user(email=email, password=password, name=name)
+        
+        self.assertEqual(user.email, email)
+        self.assertEqual(user.name, name)
+        self.assertTrue(user.check_password(password))
+        self.assertTrue(user.is_active)
+        self.assertFalse(user.is_staff)
+        self.assertFalse(user.is_superuser)
+
+    def test_create_superuser(self):
+        """Test creating a superuser."""
+        email = 'admin@example.com'
+        password = 'adminpassword123'
+        
+        admin = User.objects.create_superuser(email=email, password=password)
+        
+        self.assertTrue(admin.is_staff)
+        self.assertTrue(admin.is_superuser)
+        self.assertTrue(admin.is_active)
+
+
+class EmailOutboxTests(TestCase):
+    def test_send_otp_queues_email_without_sending(self):
+        from django.core import mail
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from .models import EmailOutbox
+
+        cache.clear()
+        response = APIClient().post('/api/auth/send-otp/', {
+            'email': 'new@example.com',
+            'name': 'New User',
+            'password': 'Str0ng-pass!',
+            'password_confirm': 'Str0ng-pass!',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get(recipient='new@example.com')
+        self.assertEqual(queued.status, 'queued')
+
+    def test_dispatch_delivers_and_backs_off_on_failure(self):
+        from unittest import mock
+        from django.core import mail
+        from .models import EmailOutbox
+        from . import outbox
+
+        ok = outbox.enqueue_email('Hello', 'Body', 'ok@example.com')
+        self.assertEqual(outbox.dispatch_pending(), (1, 0))
+        ok.refresh_from_db()
+        self.assertEqual(ok.status, 'sent')
+        self.assertEqual(ok.attempts, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+        failing = outbox.enqueue_email('Hello', 'Body', 'fail@example.com')
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('timeout')):
+            self.assertEqual(outbox.dispatch_pending(max_attempts=2), (0, 1))
+            failing.refresh_from_db()
+            self.assertEqual(failing.status, 'queued')
+            self.assertEqual(failing.last_error, 'timeout')
+            self.assertGreater(failing.next_attempt_at, failing.created_at)
+
+            EmailOutbox.objects.filter(id=failing.id).update(next_attempt_at=failing.created_at)
+            outbox.dispatch_pending(max_attempts=2)
+            failing.refresh_from_db()
+            self.assertEqual(failing.status, 'failed')
+
+    def test_text_mail_rejects_invalid_addresses(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from .models import EmailOutbox
+
+        cache.clear()
+        client = APIClient()
+        invalid = client.post('/api/auth/text-mail/', {'email': 'not-an-address', 'message': 'Hi'}, format='json')
+        missing = client.post('/api/auth/text-mail/', {'email': 'ok@example.com'}, format='json')
+        valid = client.post('/api/auth/text-mail/', {'email': 'ok@example.com', 'message': 'Hi'}, format='json')
+
+        self.assertEqual(invalid.status_code, 400)
+        self.assertIn('email', invalid.data)
+        self.assertEqual(missing.status_code, 400)
+        self.assertEqual(valid.status_code, 202)
+        self.assertEqual(list(EmailOutbox.objects.values_list('recipient', flat=True)), ['ok@example.com'])
+
+    def test_partially_sent_batch_only_retries_the_rest(self):
+        from unittest import mock
+        from django.core import mail
+        from config.email_backend import PartialSendError
+        from .models import EmailOutbox
+        from . import outbox
+
+        class HalfBatchBackend(mail.backends.locmem.EmailBackend):
+            supports_batch = True
+
+            def send_messages(self, messages):
+                if len(messages) == 1:
+                    return super().send_messages(messages)
+                super().send_messages(messages[:2])
+                raise PartialSendError(OSError('second batch timed out'), messages[:2])
+
+        for i in range(3):
+            outbox.enqueue_email('Hello', 'Body', f'user{i}@example.com')
+        with mock.patch('apps.users.outbox.get_connection', return_value=HalfBatchBackend()):
+            self.assertEqual(outbox.dispatch_pending(), (3, 0))
+
+        # The third message was sent on its own; none went out twice
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['user0@example.com', 'user1@example.com', 'user2@example.com'])
+        self.assertEqual(EmailOutbox.objects.filter(status='sent', attempts=1).count(), 3)
+
+
+class ResendEmailBackendTests(TestCase):
+    """Exercise the Resend backend against a local fake Resend API."""
+
+    def setUp(self):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import resend
+
+        self.requests = []
+        recorded = self.requests
+
+        class FakeResend(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                recorded.append((self.path, body, self.client_address[1]))
+                if self.path == '/emails/batch' and len(body) == test.failing_batch_size:
+                    self.send_response(500)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if self.path == '/emails/batch':
+                    payload = {'data': [{'id': str(i)} for i in range(len(body))]}
+                else:
+                    payload = {'id': '1'}
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.failing_batch_size = None
+        test = self
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeResend)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        for attr in ('api_url', 'api_key', 'default_http_client'):
+            self.addCleanup(setattr, resend, attr, getattr(resend, attr))
+        resend.api_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def _messages(self, count):
+        from django.core.mail import EmailMessage
+        return [
+            EmailMessage(f'Subject {i}', 'Body', 'from@example.com', [f'user{i}@example.com'])
+            for i in range(count)
+        ]
+
+    def test_batches_and_reuses_connections(self):
+        from django.test import override_settings
+        from config.email_backend import ResendEmailBackend
+
+        with override_settings(RESEND_API_KEY='test-key'):
+            backend = ResendEmailBackend()
+            self.assertEqual(backend.send_messages(self._messages(1)), 1)
+            self.assertEqual(backend.send_messages(self._messages(3)), 3)
+
+        paths = [path for path, _, _ in self.requests]
+        self.assertEqual(paths, ['/emails', '/emails/batch'])
+        self.assertEqual(len(self.requests[1][1]), 3)
+        # Both calls went over the same kept-alive connection
+        self.assertEqual(len({port for _, _, port in self.requests}), 1)
+
+    def test_large_sends_are_split_into_concurrent_batches(self):
+        from django.test import override_settings
+        from config.email_backend import ResendEmailBackend
+
+        with override_settings(RESEND_API_KEY='test-key'):
+            sent = ResendEmailBackend().send_messages(self._messages(250))
+
+        self.assertEqual(sent, 250)
+        sizes = sorted(len(body) for path, body, _ in self.requests)
+        self.assertEqual(sizes, [50, 100, 100])
+
+
+    def test_failed_batch_reports_the_messages_that_went_out(self):
+        from django.test import override_settings
+        from config.email_backend import PartialSendError, ResendEmailBackend
+
+        self.failing_batch_size = 50
+        messages = self._messages(250)
+        with override_settings(RESEND_API_KEY='test-key'):
+            with self.assertRaises(PartialSendError) as caught:
+                ResendEmailBackend().send_messages(messages)
+
+        self.assertEqual(caught.exception.sent, 200)
+        self.assertEqual(caught.exception.sent_messages, messages[:200])
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        cache.clear()
+        self.user = User.objects.create_user(email='jwt@example.com', password='pass12345', name='JWT')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_profile_is_served_without_auth_queries_once_cached(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.json()['email'], 'jwt@example.com')
+
+    def test_shared_level_is_skipped_with_a_per_process_cache(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from apps.users.authentication import cache_user
+
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        self.assertIsNone(cache.get(f'auth:user:{self.user.pk}'))
+
+        with mock.patch('apps.users.authentication.caching.is_shared', return_value=True):
+            cache_user(self.user)
+        self.assertEqual(cache.get(f'auth:user:{self.user.pk}').pk, self.user.pk)
+
+    def test_profile_and_password_updates_keep_concurrent_balance_changes(self):
+        from django.db.models import F
+
+        self.user.credits = 100
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        # Charged by another worker while this one holds the cached copy
+        User.objects.filter(pk=self.user.pk).update(credits=F('credits') - 50)
+
+        response = self.client.patch('/api/auth/profile/', {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['credits'], 50)
+        User.objects.filter(pk=self.user.pk).update(credits=F('credits') - 10)
+        response = self.client.put('/api/auth/change-password/', {
+            'old_password': 'pass12345', 'new_password': 'N3w-pass-phrase!',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.credits, self.user.name), (40, 'Renamed'))
+        self.assertTrue(self.user.check_password('N3w-pass-phrase!'))
+        self.assertEqual(self.client.get('/api/auth/profile/').json()['name'], 'Renamed')
+
+    def test_deactivation_invalidates_cached_user(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
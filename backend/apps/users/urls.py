@@ -1,34 +1,34 @@
-from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
-
-from .views import (
-    RegisterView,
-    LoginView,
-    ProfileView,
-    ChangePasswordView,
-    AdminUserViewSet,
-    SendOTPView,
-    VerifyOTPView,
-    TextMailView,
-    TextMailView,
-    DebugCORSView,
-    TestEmailView,
-)
-
-router = DefaultRouter()
-router.register(r'admin/users', AdminUserViewSet, basename='admin-users')
-
-urlpatterns = [
-    path('register/', RegisterView.as_view(), name='register'),
-    path('login/', LoginView.as_view(), name='login'),
-    path('refresh/', TokenRefreshView.as_view(), name='token-refresh'),
-    path('profile/', ProfileView.as_view(), name='profile'),
-    path('change-password/', ChangePasswordView.as_view(), name='change-password'),
-    path('send-otp/', SendOTPView.as_view(), name='send-otp'),
-    path('verify-otp/', VerifyOTPView.as_view(), name='verify-otp'),
-    path('text-mail/', TextMailView.as_view(), name='text-mail'),
-    path('debug-cors/', DebugCORSView.as_view(), name='debug-cors'),
-    path('test-email/', TestEmailView.as_view(), name='test-email'),
-    path('', include(router.urls)),
-]
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from .views import (
+    RegisterView,
+    LoginView,
+    ProfileView,
+    ChangePasswordView,
+    AdminUserViewSet,
+    SendOTPView,
+    VerifyOTPView,
+    TextMailView,
+    TextMailView,
+    DebugCORSView,
+    TestEmailView,
+)
+
+router = DefaultRouter()
+router.register(r'admin/users', AdminUserViewSet, basename='admin-users')
+
+urlpatterns = [
+    path('register/', RegisterView.as_view(), name='register'),
+    path('login/', LoginView.as_view(), name='login'),
+    path('refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('profile/', ProfileView.as_view(), name='profile'),
+    path('change-password/', ChangePasswordView.as_view(), name='change-password'),
+    path('send-otp/', SendOTPView.as_view(), name='send-otp'),
+    path('verify-otp/', VerifyOTPView.as_view(), name='verify-otp'),
+    path('text-mail/', TextMailView.as_view(), name='text-mail'),
+    path('debug-cors/', DebugCORSView.as_view(), name='debug-cors'),
+    path('test-email/', TestEmailView.as_view(), name='test-email'),
+    path('', include(router.urls)),
+]
@@ -1 +1 @@
-# Voices app
+# Voices app
@@ -1,7 +1,10 @@
-from django.apps import AppConfig
-
-
-class VoicesConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.voices'
-    verbose_name = 'Voices'
+from django.apps import AppConfig
+
+
+class VoicesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.voices'
+    verbose_name = 'Voices'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,214 @@
+"""
+Audio analysis for voice clone samples.
+
+Samples are decoded to mono PCM in fixed-size blocks (the wave module for
+WAV, an ffmpeg pipe for everything else) and each block is reduced with
+NumPy, so memory stays constant however long the upload is:
+
+- duration and source sample rate
+- loudness (RMS dBFS) and peak level (dBFS)
+- silence ratio: share of 20 ms windows below SILENCE_DBFS
+- clipping ratio: share of samples at full scale
+- zero-crossing rate (high values with little silence suggest noise)
+
+check_sample() turns the metrics into user-facing rejection reasons.
+"""
+
+import math
+import os
+import subprocess
+import tempfile
+import wave
+
+import numpy as np
+
+BLOCK_FRAMES = 64 * 1024
+WINDOW_SECONDS = 0.02
+# Rate ffmpeg resamples to when decoding non-WAV input
+DECODE_SAMPLE_RATE = 24000
+
+SILENCE_DBFS = -45.0
+CLIP_LEVEL = 0.999
+
+MIN_SPEECH_SECONDS = 3.0
+MAX_SILENCE_RATIO = 0.8
+MAX_CLIPPING_RATIO = 0.01
+MIN_LOUDNESS_DBFS = -40.0
+MIN_SAMPLE_RATE = 8000
+
+
+class AudioDecodeError(Exception):
+    """The file could not be decoded (unknown format, or no ffmpeg for it)."""
+
+
+def _wav_blocks(path):
+    try:
+        wav = wave.open(path, 'rb')
+    except (wave.Error, EOFError):
+        return None
+    sample_width = wav.getsampwidth()
+    if sample_width not in (1, 2, 4):
+        wav.close()
+        return None
+
+    def blocks():
+        with wav:
+            channels = wav.getnchannels()
+            while True:
+                raw = wav.readframes(BLOCK_FRAMES)
+                if not raw:
+                    return
+                if sample_width == 1:
+                    samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+                elif sample_width == 2:
+                    samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+                else:
+                    samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648
+                if channels > 1:
+                    samples = samples[:len(samples) - len(samples) % channels]
+                    samples = samples.reshape(-1, channels).mean(axis=1)
+                yield samples
+
+    return wav.getframerate(), blocks()
+
+
+def _ffmpeg_blocks(path):
+    from .services import ffmpeg_binary
+
+    binary = ffmpeg_binary()
+    if binary is None:
+        raise AudioDecodeError('ffmpeg is required to decode this format')
+    process = subprocess.Popen(
+        [binary, '-hide_banner', '-loglevel', 'error', '-i', path, '-vn',
+         '-ac', '1', '-ar', str(DECODE_SAMPLE_RATE), '-f', 's16le', '-'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    def blocks():
+        try:
+            while True:
+                raw = process.stdout.read(BLOCK_FRAMES * 2)
+                if not raw:
+                    break
+                raw = raw[:len(raw) - len(raw) % 2]
+                yield np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+        finally:
+            process.stdout.close()
+            if process.wait() != 0:
+                raise AudioDecodeError('ffmpeg could not decode the file')
+
+    return DECODE_SAMPLE_RATE, blocks()
+
+
+def iter_blocks(path):
+    """Return (sample_rate, iterator of float32 mono blocks in [-1, 1])."""
+    decoded = _wav_blocks(path)
+    if decoded is None:
+        decoded = _ffmpeg_blocks(path)
+    return decoded
+
+
+def _source_sample_rate(path, default):
+    """The file's own sample rate (ffmpeg output is always resampled)."""
+    try:
+        import mutagen
+        audio = mutagen.File(path)
+        return int(audio.info.sample_rate) or default
+    except Exception:
+        return default
+
+
+def _dbfs(value):
+    return round(20 * math.log10(value), 2) if value > 0 else None
+
+
+def analyze(path):
+    """
+    Compute sample metrics for the audio file at `path`.
+
+    Raises AudioDecodeError if the file cannot be decoded.
+    """
+    sample_rate, blocks = iter_blocks(path)
+    window = max(1, int(sample_rate * WINDOW_SECONDS))
+    silence_power = 10 ** (SILENCE_DBFS / 10)
+
+    total = 0
+    sum_squares = 0.0
+    peak = 0.0
+    clipped = 0
+    crossings = 0
+    windows = 0
+    silent_windows = 0
+    previous_sign = None
+    carry = np.empty(0, dtype=np.float32)
+
+    for block in blocks:
+        if not len(block):
+            continue
+        total += len(block)
+        sum_squares += float(np.dot(block, block))
+        magnitudes = np.abs(block)
+        peak = max(peak, float(magnitudes.max()))
+        clipped += int(np.count_nonzero(magnitudes >= CLIP_LEVEL))
+
+        signs = np.signbit(block)
+        crossings += int(np.count_nonzero(signs[1:] != signs[:-1]))
+        if previous_sign is not None and previous_sign != signs[0]:
+            crossings += 1
+        previous_sign = signs[-1]
+
+        # RMS over fixed windows; the remainder carries into the next block
+        samples = np.concatenate((carry, block)) if len(carry) else block
+        usable = len(samples) - len(samples) % window
+        if usable:
+            power = np.square(samples[:usable]).reshape(-1, window).mean(axis=1)
+            windows += len(power)
+            silent_windows += int(np.count_nonzero(power < silence_power))
+        carry = samples[usable:]
+
+    if total == 0:
+        raise AudioDecodeError('The file contains no audio')
+
+    return {
+        'duration_seconds': round(total / sample_rate, 2),
+        'sample_rate': sample_rate if path.lower().endswith('.wav') else _source_sample_rate(path, sample_rate),
+        'loudness_dbfs': _dbfs(math.sqrt(sum_squares / total)),
+        'peak_dbfs': _dbfs(peak),
+        'silence_ratio': round(silent_windows / windows, 4) if windows else 1.0,
+        'clipping_ratio': round(clipped / total, 5),
+        'zero_crossing_rate': round(crossings / total, 4),
+    }
+
+
+def analyze_upload(uploaded_file):
+    """analyze() for a Django UploadedFile, which may only exist in memory."""
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return analyze(uploaded_file.temporary_file_path())
+    suffix = os.path.splitext(uploaded_file.name or '')[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+        for chunk in uploaded_file.chunks():
+            f.write(chunk)
+        f.flush()
+        uploaded_file.seek(0)
+        return analyze(f.name)
+
+
+def check_sample(metrics):
+    """User-facing reasons the sample is unsuitable for cloning (empty if fine)."""
+    problems = []
+    speech_seconds = metrics['duration_seconds'] * (1 - metrics['silence_ratio'])
+    if metrics['sample_rate'] < MIN_SAMPLE_RATE:
+        problems.append(f"Sample rate is {metrics['sample_rate']} Hz; at least {MIN_SAMPLE_RATE} Hz is needed.")
+    if metrics['silence_ratio'] > MAX_SILENCE_RATIO:
+        problems.append(f"The sample is {metrics['silence_ratio']:.0%} silence.")
+    elif speech_seconds < MIN_SPEECH_SECONDS:
+        problems.append(
+            f'The sample has {speech_seconds:.1f}s of speech; at least {MIN_SPEECH_SECONDS:.0f}s is needed.'
+        )
+    if metrics['clipping_ratio'] > MAX_CLIPPING_RATIO:
+        problems.append('The recording is clipped (too loud); please record at a lower level.')
+    loudness = metrics['loudness_dbfs']
+    if loudness is None or loudness < MIN_LOUDNESS_DBFS:
+        problems.append('The recording is too quiet.')
+    return problems
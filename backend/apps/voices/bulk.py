@@ -0,0 +1,208 @@
+"""
+Bulk speech generation streamed back as a ZIP archive.
+
+A manifest of (text, voice_profile_id, filename) items is planned into
+unique syntheses: items with the same text, voice and output format share
+one synthesis (and one charge) but still get their own archive entry.
+Credits for every unique synthesis are taken up front in a single
+conditional UPDATE, and whatever did not complete is refunded in one
+UPDATE when the archive is closed.
+
+BulkArchive is the StreamingHttpResponse body. Syntheses run on a thread
+pool of BULK_CONCURRENCY workers; each finished file is written to the
+ZIP (stored, since the audio is already compressed) and flushed to the
+client right away, so memory holds at most one read chunk, not the
+archive. A closing manifest.json records every entry's outcome. Django
+calls close() when the response ends or the client disconnects, which
+cancels queued syntheses, records the completed ones in the user's
+history and issues the refund.
+"""
+
+import json
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+from config import metrics
+
+from . import credits
+from .credits import CREDIT_COST
+from .models import GeneratedSpeech
+from .services import OUTPUT_FORMATS, voice_service
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK = 256 * 1024
+MAX_FILENAME_LENGTH = 100
+
+BULK_ITEMS = metrics.counter(
+    'voiceai_bulk_items_total', 'Bulk generation items by outcome', ['outcome']
+)
+
+
+def safe_stem(filename):
+    """Archive-safe file name without directory parts or extension."""
+    stem = os.path.splitext(os.path.basename(filename.replace('\\', '/')))[0]
+    stem = re.sub(r'[^\w\-. ]+', '_', stem).strip(' ._')
+    return stem[:MAX_FILENAME_LENGTH]
+
+
+def plan(items, output_format):
+    """
+    Group manifest items into unique syntheses.
+
+    Returns a list of jobs, each a dict with 'text', 'voice_profile' and
+    the 'entries' (item indexes) that use its audio.
+    """
+    jobs = {}
+    for index, item in enumerate(items):
+        key = (item['text'], item['voice_profile'].id, output_format)
+        job = jobs.setdefault(key, {'text': item['text'], 'voice_profile': item['voice_profile'], 'entries': []})
+        job['entries'].append(index)
+    return list(jobs.values())
+
+
+class _ZipBuffer:
+    """Append-only file object for ZipFile; drain() hands over what was written."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BulkArchive:
+    """Iterable ZIP body for a planned bulk run; see the module docstring."""
+
+    def __init__(self, user, items, jobs, output_format, cleanup=None):
+        self.user = user
+        self.items = items
+        self.jobs = jobs
+        self.output_format = output_format
+        self.cleanup = cleanup
+        self._executor = None
+        self._futures = {}
+        self._stream = None
+        self._closed = False
+
+    def __iter__(self):
+        if self._stream is None:
+            self._stream = self._generate()
+        return self._stream
+
+    def _generate(self):
+        buffer = _ZipBuffer()
+        entries = [None] * len(self.items)
+        concurrency = max(1, getattr(settings, 'BULK_CONCURRENCY', 4))
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-tts')
+        self._futures = futures = {
+            self._executor.submit(
+                voice_service.generate_speech,
+                text=job['text'],
+                voice_profile=job['voice_profile'],
+                output_format=self.output_format,
+            ): index
+            for index, job in enumerate(self.jobs)
+        }
+
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for future in as_completed(futures):
+                index = futures[future]
+                job = self.jobs[index]
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception('Bulk synthesis failed')
+                    result = {'success': False}
+
+                for position, entry in enumerate(job['entries']):
+                    item = self.items[entry]
+                    entries[entry] = {
+                        'filename': None,
+                        'text': item['text'],
+                        'voice_profile_id': item['voice_profile'].id,
+                        'status': 'failed',
+                    }
+                    if not result['success']:
+                        BULK_ITEMS.inc(outcome='failed')
+                        continue
+                    BULK_ITEMS.inc(outcome='synthesized' if position == 0 else 'deduplicated')
+                    extension = OUTPUT_FORMATS[result['output_format']]['extension']
+                    name = f"{item['filename']}.{extension}"
+                    entries[entry].update({
+                        'filename': name, 'status': 'ok', 'duration_seconds': result['duration'],
+                    })
+                    path = os.path.join(voice_service.media_root, result['audio_path'])
+                    with open(path, 'rb') as source, archive.open(name, 'w') as target:
+                        while chunk := source.read(READ_CHUNK):
+                            target.write(chunk)
+                            yield buffer.drain()
+                    yield buffer.drain()
+
+            archive.writestr('manifest.json', json.dumps({'items': entries}, indent=2))
+        yield buffer.drain()
+
+    def close(self):
+        """Stop pending work, record completed syntheses and refund the rest."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._stream is not None:
+                self._stream.close()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            completed = []
+            for future, index in self._futures.items():
+                if future.cancelled() or future.exception() is not None:
+                    continue
+                result = future.result()
+                if result['success']:
+                    completed.append((self.jobs[index], result))
+                else:
+                    # generate_speech leaves an empty placeholder file on failure
+                    voice_service.delete_media(result['audio_path'])
+            refund = (len(self.jobs) - len(completed)) * CREDIT_COST
+            credits.refund(self.user.id, refund)
+            balance = credits.balance(self.user.id)
+            GeneratedSpeech.objects.bulk_create([
+                GeneratedSpeech(
+                    user=self.user,
+                    voice_profile=job['voice_profile'],
+                    input_text=job['text'],
+                    audio_file=result['audio_path'],
+                    duration_seconds=result['duration'],
+                    word_timings=result['word_timings'] or None,
+                    credits_used=CREDIT_COST,
+                    balance_after=balance,
+                    waveform=result['waveform'],
+                    **result['metadata'],
+                )
+                for job, result in completed
+            ])
+            logger.info(
+                'Bulk generation for user %s: %d items, %d syntheses, %d completed, %d credits refunded',
+                self.user.id, len(self.items), len(self.jobs), len(completed), refund,
+            )
+        finally:
+            if self.cleanup is not None:
+                self.cleanup()
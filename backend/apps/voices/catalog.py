@@ -0,0 +1,79 @@
+"""
+Cache for the serialized voice catalog.
+
+The catalog is the most requested read in the app (Dashboard and VoiceGenerate
+load it on every visit) but it only changes when admins edit profiles. Each
+filter combination is serialized once and kept in the Django cache under a
+catalog version; saving or deleting a VoiceProfile bumps the version, which
+orphans every cached entry at once.
+
+A bump is only seen by the processes sharing the cache. With a
+per-process cache (no REDIS_URL) the version itself expires after
+LOCAL_VERSION_TIMEOUT, so other workers pick up a change within that
+time instead of serving the old catalog and ETag for a day.
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+from config import caching, metrics
+
+CACHE_REQUESTS = metrics.counter(
+    'voiceai_cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result']
+)
+
+VERSION_KEY = 'voices:catalog:version'
+ENTRY_TIMEOUT = 60 * 60 * 24
+LOCAL_VERSION_TIMEOUT = 60
+
+
+def _version_timeout():
+    return None if caching.is_shared() else LOCAL_VERSION_TIMEOUT
+
+
+def get_version():
+    """Return the current catalog version (a millisecond timestamp)."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = int(time.time() * 1000)
+        # add() so concurrent workers agree on a single initial version
+        if not cache.add(VERSION_KEY, version, _version_timeout()):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate():
+    """Start a new catalog version; existing entries are never read again."""
+    version = max(int(time.time() * 1000), (cache.get(VERSION_KEY) or 0) + 1)
+    cache.set(VERSION_KEY, version, _version_timeout())
+
+
+def _entry_key(request, version):
+    # File fields serialize to absolute URLs, so the host is part of the key.
+    params = sorted(request.query_params.lists())
+    raw = json.dumps([request.build_absolute_uri('/'), params])
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'voices:catalog:{version}:{digest}'
+
+
+def get_entry(request):
+    """Return the cached entry for this request's filters, or None."""
+    entry = cache.get(_entry_key(request, get_version()))
+    CACHE_REQUESTS.inc(cache='catalog', result='miss' if entry is None else 'hit')
+    return entry
+
+
+def store_entry(request, data):
+    """Cache serialized catalog data and return the entry with its validators."""
+    version = get_version()
+    body = json.dumps(data, sort_keys=True, default=str)
+    entry = {
+        'data': data,
+        'etag': '"%s"' % hashlib.md5(body.encode('utf-8')).hexdigest(),
+        'last_modified': version // 1000,
+    }
+    cache.set(_entry_key(request, version), entry, _version_timeout() or ENTRY_TIMEOUT)
+    return entry
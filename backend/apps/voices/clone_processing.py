@@ -0,0 +1,65 @@
+"""
+Background processing of voice clones.
+
+Creating a clone only stores the sample and leaves it `pending`; the
+process_clones management command claims pending clones, moves them to
+`processing` and runs VoiceGenerationService.process_voice_clone, which
+ends in `ready` or `failed`.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import VoiceClone
+from .services import voice_service
+
+logger = logging.getLogger(__name__)
+
+# A clone stuck in 'processing' this long (worker died) is picked up again
+CLAIM_LEASE_SECONDS = 10 * 60
+
+
+def claim_pending(batch_size):
+    """
+    Atomically move up to `batch_size` pending clones to 'processing'.
+
+    Uses SKIP LOCKED where supported so several workers can run at once.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=CLAIM_LEASE_SECONDS)
+    with transaction.atomic():
+        due = VoiceClone.objects.filter(
+            Q(status='pending') | Q(status='processing', processing_started_at__lt=stale)
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        claimed = list(due.order_by('created_at')[:batch_size])
+        VoiceClone.objects.filter(id__in=[c.id for c in claimed]).update(
+            status='processing', processing_started_at=now
+        )
+    for voice_clone in claimed:
+        voice_clone.status = 'processing'
+        voice_clone.processing_started_at = now
+    return claimed
+
+
+def process_pending(batch_size=10):
+    """Process one batch of pending clones. Returns a (ready, failed) tuple."""
+    ready = failed = 0
+    for voice_clone in claim_pending(batch_size):
+        try:
+            voice_service.process_voice_clone(voice_clone)
+        except Exception:
+            logger.exception('Processing voice clone %s failed', voice_clone.id)
+            voice_clone.status = 'failed'
+            voice_clone.processing_error = 'Processing failed unexpectedly. Please upload the sample again.'
+            voice_clone.save(update_fields=['status', 'processing_error', 'updated_at'])
+        if voice_clone.status == 'ready':
+            ready += 1
+        else:
+            failed += 1
+    return ready, failed
@@ -0,0 +1,43 @@
+"""
+Credit charges for generation endpoints that synthesize several pieces.
+
+Everything a request will synthesize is charged in one conditional
+UPDATE up front, and whatever could not be produced is refunded in one
+UPDATE afterwards, so the balance never goes negative and a partly failed
+request costs only what it delivered.
+"""
+
+from django.db.models import F
+
+from apps.users.authentication import invalidate_user
+from apps.users.models import User
+
+# Credits per synthesis, as charged by /generate/
+CREDIT_COST = 5
+
+
+class InsufficientCredits(Exception):
+    def __init__(self, needed):
+        super().__init__(f'Insufficient credits. This request needs {needed}.')
+        self.needed = needed
+
+
+def charge(user_id, amount):
+    """Take `amount` credits or raise InsufficientCredits."""
+    if amount <= 0:
+        return
+    updated = User.objects.filter(id=user_id, credits__gte=amount).update(credits=F('credits') - amount)
+    if not updated:
+        raise InsufficientCredits(amount)
+    invalidate_user(user_id)
+
+
+def refund(user_id, amount):
+    if amount <= 0:
+        return
+    User.objects.filter(id=user_id).update(credits=F('credits') + amount)
+    invalidate_user(user_id)
+
+
+def balance(user_id):
+    return User.objects.values_list('credits', flat=True).get(id=user_id)
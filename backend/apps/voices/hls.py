@@ -0,0 +1,285 @@
+"""
+Segmented (HLS) output for long generations.
+
+With `segmented: true`, /generate/ answers 202 as soon as synthesis has
+been started: the GeneratedSpeech row already exists and its
+`hls_playlist` points to an EVENT playlist that grows while edge-tts
+streams. Players can start (and seek within what exists) right away and
+only fetch the segments they need.
+
+SegmentWriter cuts the incoming MP3 at frame boundaries into segments of
+at most HLS_SEGMENT_SECONDS; no decoding or re-encoding is involved. After
+each segment the playlist is rewritten atomically, and #EXT-X-ENDLIST is
+added once synthesis has finished. The full MP3 is written alongside as
+the row's audio_file, so downloads, subtitles and the other per-file
+features work as for any generation.
+
+Synthesis runs on a pool of HLS_CONCURRENCY threads, holding the user's
+generation slot (config.throttling.generation_slot) until it is done. At
+most HLS_MAX_PENDING jobs may be queued or running per process; beyond
+that start() raises QueueFull. The row's hls_state moves from 'pending'
+to 'processing' to 'complete', and every transition is a conditional
+UPDATE, so a row deleted meanwhile (from the history, or by the sweeper)
+just has its files removed. When synthesis fails the credits are
+refunded and the row and its files are removed, so the playlist
+disappears (404) instead of ending early.
+
+Jobs die with their worker process (restart, deploy, crash). sweep_orphans()
+(the sweep_segmented command) refunds and removes rows that are still
+unfinished HLS_ORPHAN_SECONDS after they were created.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import credits, media, waveform
+from .models import GeneratedSpeech
+from .services import GENERATION_STAGE_SECONDS, TTS_FAILURES, voice_service
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_NAME = 'index.m3u8'
+
+# Layer III bitrates (kbit/s) by MPEG version; index 0 ("free") is unsupported
+_BITRATES = {
+    'mpeg1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    'mpeg2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def frame_header(data, position=0):
+    """(frame length, samples, sample rate) of the Layer III frame at `position`, or None."""
+    if len(data) < position + 4 or data[position] != 0xFF or data[position + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[position + 1] >> 3) & 0b11
+    layer = (data[position + 1] >> 1) & 0b11
+    bitrate_index = data[position + 2] >> 4
+    rate_index = (data[position + 2] >> 2) & 0b11
+    padding = (data[position + 2] >> 1) & 1
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        bitrate = _BITRATES['mpeg1'][bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+    bitrate = _BITRATES['mpeg2'][bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+def _write_atomic(path, data):
+    partial = f'{path}.part'
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+class SegmentWriter:
+    """Splits streamed MP3 bytes into HLS segments and keeps the playlist current."""
+
+    def __init__(self, directory, segment_seconds=None):
+        self.directory = directory
+        self.segment_seconds = segment_seconds or settings.HLS_SEGMENT_SECONDS
+        self.segments = []          # [(filename, seconds), ...]
+        self._pending = bytearray()  # bytes not yet parsed into frames
+        self._frames = bytearray()   # frames of the segment being filled
+        self._samples = 0
+        self._sample_rate = None
+        os.makedirs(directory, exist_ok=True)
+        self._write_playlist(finished=False)
+
+    @property
+    def duration(self):
+        """Seconds of audio written to finished segments."""
+        return sum(seconds for _, seconds in self.segments)
+
+    def write(self, data):
+        self._pending += data
+        position = 0
+        while True:
+            header = frame_header(self._pending, position)
+            if header is None:
+                if len(self._pending) - position < 4:
+                    break
+                # Not a frame start (never the case for edge-tts); resync
+                position += 1
+                continue
+            length, samples, sample_rate = header
+            if len(self._pending) < position + length:
+                break
+            limit = self.segment_seconds * sample_rate
+            if self._samples and self._samples + samples > limit:
+                self._flush()
+            self._sample_rate = sample_rate
+            self._frames += self._pending[position:position + length]
+            self._samples += samples
+            position += length
+        del self._pending[:position]
+
+    def close(self):
+        """Write the last segment and end the playlist."""
+        if self._samples:
+            self._flush(playlist=False)
+        self._write_playlist(finished=True)
+
+    def _flush(self, playlist=True):
+        filename = f'segment{len(self.segments):05d}.mp3'
+        _write_atomic(os.path.join(self.directory, filename), bytes(self._frames))
+        self.segments.append((filename, self._samples / self._sample_rate))
+        self._frames.clear()
+        self._samples = 0
+        if playlist:
+            self._write_playlist(finished=False)
+
+    def _write_playlist(self, finished):
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            f'#EXT-X-TARGETDURATION:{math.ceil(self.segment_seconds)}',
+            '#EXT-X-MEDIA-SEQUENCE:0',
+            '#EXT-X-PLAYLIST-TYPE:EVENT',
+        ]
+        for filename, seconds in self.segments:
+            lines += [f'#EXTINF:{seconds:.3f},', filename]
+        if finished:
+            lines.append('#EXT-X-ENDLIST')
+        _write_atomic(os.path.join(self.directory, PLAYLIST_NAME), ('\n'.join(lines) + '\n').encode())
+
+
+def new_names():
+    """(audio name, playlist name) of a new segmented generation, sharing one sharded key."""
+    stem = media.shard_stem(uuid.uuid4().hex)
+    return f'generated_audio/{stem}.mp3', f'generated_hls/{stem}/{PLAYLIST_NAME}'
+
+
+def discard(name):
+    """Remove a playlist and its segments."""
+    if name:
+        shutil.rmtree(os.path.join(voice_service.media_root, os.path.dirname(name)), ignore_errors=True)
+
+
+class QueueFull(Exception):
+    """HLS_MAX_PENDING segmented generations are already queued or running."""
+
+
+_executor = None
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, settings.HLS_CONCURRENCY), thread_name_prefix='hls-tts')
+    return _executor
+
+
+def _run(fn, args, cleanup):
+    global _pending
+    try:
+        fn(*args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+        cleanup()
+        # Pool threads outlive requests, so nothing else closes their connection
+        close_old_connections()
+
+
+def launch(fn, *args, cleanup):
+    """
+    Run `fn(*args)` on the HLS synthesis pool, then `cleanup()`.
+
+    Raises QueueFull (without calling cleanup) when the pool is saturated.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.HLS_MAX_PENDING:
+            raise QueueFull()
+        _pending += 1
+    try:
+        return _pool().submit(_run, fn, args, cleanup)
+    except BaseException:
+        with _pending_lock:
+            _pending -= 1
+        raise
+
+
+def start(speech, text, voice_shortname, cleanup):
+    """
+    Write the (still empty) playlist of `speech`, then synthesize it in the background.
+
+    `cleanup` runs once the job is over (it releases the generation slot).
+    """
+    writer = SegmentWriter(os.path.join(voice_service.media_root, os.path.dirname(speech.hls_playlist.name)))
+    return launch(
+        _synthesize, speech.id, speech.user_id, speech.audio_file.name, speech.hls_playlist.name,
+        text, voice_shortname, speech.credits_used, writer,
+        cleanup=cleanup,
+    )
+
+
+def _remove_files(audio_name, playlist_name):
+    discard(playlist_name)
+    voice_service.delete_media(audio_name)
+
+
+def _synthesize(speech_id, user_id, audio_name, playlist_name, text, voice_shortname, cost, writer):
+    rows = GeneratedSpeech.objects.filter(pk=speech_id)
+    if not rows.filter(hls_state='pending').update(hls_state='processing'):
+        # Deleted before the job got to run
+        _remove_files(audio_name, playlist_name)
+        return
+
+    audio_path = media.absolute_path(voice_service.media_root, audio_name)
+    try:
+        with GENERATION_STAGE_SECONDS.time(stage='tts'):
+            word_timings = asyncio.run(
+                voice_service.stream_to_file(text, voice_shortname, audio_path, on_chunk=writer.write)
+            )
+        writer.close()
+    except Exception:
+        TTS_FAILURES.inc()
+        logger.exception('Segmented synthesis failed for speech %s', speech_id)
+        deleted, _ = rows.filter(hls_state='processing').delete()
+        if deleted:
+            credits.refund(user_id, cost)
+        _remove_files(audio_name, playlist_name)
+        return
+
+    finished = rows.filter(hls_state='processing').update(
+        hls_state='complete',
+        duration_seconds=round(writer.duration, 2),
+        word_timings=word_timings or None,
+        waveform=waveform.compute(audio_path),
+        **media.describe(audio_path),
+    )
+    if not finished:
+        # Deleted while it was being synthesized
+        _remove_files(audio_name, playlist_name)
+
+
+def sweep_orphans():
+    """Refund and remove segmented generations whose job was lost; returns how many."""
+    cutoff = timezone.now() - timedelta(seconds=settings.HLS_ORPHAN_SECONDS)
+    unfinished = GeneratedSpeech.objects.filter(hls_state__in=['pending', 'processing'], created_at__lt=cutoff)
+    swept = 0
+    for speech in unfinished.only('id', 'user_id', 'audio_file', 'hls_playlist', 'credits_used'):
+        deleted, _ = GeneratedSpeech.objects.filter(pk=speech.pk, hls_state__in=['pending', 'processing']).delete()
+        if not deleted:
+            continue
+        credits.refund(speech.user_id, speech.credits_used)
+        _remove_files(speech.audio_file.name, speech.hls_playlist.name)
+        swept += 1
+    return swept
@@ -0,0 +1,37 @@
+"""
+Management command to apply the generated-audio retention policy.
+Run with: python manage.py apply_retention
+Options:
+  --workers N      Processes for re-encoding and archiving (default: CPU count, 0 = inline)
+  --batch-size N   Rows per batch (default 100)
+  --dry-run        Only count what each step would touch
+
+The policy (RETENTION_* settings) and the tiers are described in
+apps/voices/retention.py. Safe to run from cron; an interrupted run
+resumes where it stopped.
+"""
+
+import os
+
+from django.core.management.base import BaseCommand
+
+from apps.voices import retention
+
+
+class Command(BaseCommand):
+    help = 'Re-encode, archive and expire old generated audio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--batch-size', type=int, default=100, help='Rows per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        stats = retention.apply(
+            workers=options['workers'], batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        if stats.pop('compact_skipped', 0):
+            self.stdout.write(self.style.WARNING('ffmpeg is not installed; compaction skipped'))
+        prefix = 'Would process' if options['dry_run'] else 'Done!'
+        summary = ', '.join(f'{outcome}: {stats[outcome]}' for outcome in sorted(stats)) or 'nothing to do'
+        self.stdout.write(self.style.SUCCESS(f'{prefix} {summary}'))
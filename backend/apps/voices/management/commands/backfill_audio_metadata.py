@@ -0,0 +1,66 @@
+"""
+Management command to record file metadata on existing generated speech.
+Run with: python manage.py backfill_audio_metadata
+Options:
+  --workers N      Files read in parallel (default 4)
+  --batch-size N   Rows per query and bulk update (default 200)
+  --force          Re-describe rows that already have metadata
+
+New rows get size, SHA-256, codec, sample rate and bitrate when their
+audio is written (media.describe); this fills them in for older rows.
+Hashing is I/O bound and releases the GIL, so files are read on a thread
+pool and each batch is saved with one bulk_update.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.voices import media
+from apps.voices.models import GeneratedSpeech
+from apps.voices.services import voice_service
+
+FIELDS = ['size_bytes', 'sha256', 'codec', 'sample_rate', 'bitrate']
+
+
+def _describe(name):
+    try:
+        return media.describe(os.path.join(voice_service.media_root, name))
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Record size, hash, codec, sample rate and bitrate of generated speech files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Files read in parallel')
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows per batch')
+        parser.add_argument('--force', action='store_true', help='Re-describe rows that have metadata')
+
+    def handle(self, *args, **options):
+        rows = GeneratedSpeech.objects.exclude(audio_file='').order_by('pk').only('pk', 'audio_file')
+        if not options['force']:
+            rows = rows.filter(sha256__isnull=True)
+
+        done = missing = 0
+        last_pk = None
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            while True:
+                batch = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:options['batch_size']])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                described = []
+                for speech, metadata in zip(batch, executor.map(_describe, [s.audio_file.name for s in batch])):
+                    if metadata is None:
+                        missing += 1
+                        continue
+                    for field in FIELDS:
+                        setattr(speech, field, metadata[field])
+                    described.append(speech)
+                GeneratedSpeech.objects.bulk_update(described, FIELDS)
+                done += len(described)
+
+        self.stdout.write(self.style.SUCCESS(f'Done! Described: {done}, Missing files: {missing}'))
@@ -0,0 +1,53 @@
+"""
+Management command to compute acoustic feature vectors for voice matching.
+Run with: python manage.py compute_voice_features
+Options:
+  --force    Recompute even if features already exist
+  --clones   Also compute features for ready voice clones
+
+Catalog features come from VoiceProfile.sample_audio (run generate_samples
+first). Decoding MP3 samples needs ffmpeg.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.voices import audio_analysis, voice_features
+from apps.voices.models import VoiceClone, VoiceProfile
+
+
+class Command(BaseCommand):
+    help = 'Compute acoustic feature vectors for catalog voices (and clones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recompute existing features')
+        parser.add_argument('--clones', action='store_true', help='Also process ready voice clones')
+
+    def handle(self, *args, **options):
+        profiles = VoiceProfile.objects.exclude(sample_audio='').exclude(sample_audio__isnull=True)
+        clones = VoiceClone.objects.filter(status='ready').exclude(audio_sample='')
+        if not options['force']:
+            profiles = profiles.filter(acoustic_features__isnull=True)
+            clones = clones.filter(acoustic_features__isnull=True)
+
+        done, failed = self._compute(profiles, 'sample_audio')
+        if options['clones']:
+            clone_done, clone_failed = self._compute(clones, 'audio_sample')
+            done += clone_done
+            failed += clone_failed
+
+        self.stdout.write(self.style.SUCCESS(f'Done! Computed: {done}, Failed: {failed}'))
+
+    def _compute(self, queryset, file_field):
+        done = failed = 0
+        for obj in queryset.iterator():
+            try:
+                vector = voice_features.extract_features(getattr(obj, file_field).path)
+            except (audio_analysis.AudioDecodeError, OSError, ValueError) as e:
+                self.stdout.write(self.style.ERROR(f'{obj}: {e}'))
+                failed += 1
+                continue
+            obj.acoustic_features = voice_features.encode(vector)
+            # save() (not update()) so the catalog version, and the match index, refresh
+            obj.save(update_fields=['acoustic_features'])
+            done += 1
+        return done, failed
@@ -0,0 +1,46 @@
+"""
+Worker that processes newly uploaded voice clones.
+Run with: python manage.py process_clones
+Options:
+  --once          Process one batch and exit
+  --interval N    Seconds to sleep when nothing is pending (default 2)
+  --batch-size N  Clones claimed per batch (default 10)
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.voices import clone_processing, uploads
+
+# Abandoned chunked uploads are swept this often
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = 'Validate and normalize pending voice clone samples'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process one batch and exit')
+        parser.add_argument('--interval', type=float, default=2.0, help='Idle poll interval in seconds')
+        parser.add_argument('--batch-size', type=int, default=10, help='Clones claimed per batch')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Clone processor started.')
+        last_prune = 0.0
+        while True:
+            close_old_connections()
+            if time.monotonic() - last_prune >= PRUNE_INTERVAL:
+                pruned = uploads.prune_stale_uploads()
+                if pruned:
+                    self.stdout.write(f'Removed {pruned} abandoned uploads')
+                last_prune = time.monotonic()
+
+            ready, failed = clone_processing.process_pending(batch_size=options['batch_size'])
+            if ready or failed:
+                self.stdout.write(f'Clones ready {ready}, failed {failed}')
+            if options['once']:
+                return
+            if not ready and not failed:
+                time.sleep(options['interval'])
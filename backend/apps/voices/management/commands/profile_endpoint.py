@@ -0,0 +1,159 @@
+"""
+Management command to profile the generate/translate stack offline.
+Run with: python manage.py profile_endpoint generate_speech
+Options:
+  --iterations N   Number of requests to profile (default 5)
+  --text TEXT      Input text
+  --email EMAIL    User to run as (default: first administrator)
+  --profile-id ID  Voice profile to use (default: first active profile)
+  --sort KEY       pstats sort key (default cumulative)
+  --limit N        Rows to print (default 30)
+
+The request goes through the real view, serializer, ORM and service code
+against the current database, but edge-tts and Google Translate are
+replaced by local stubs so only our own code is measured. Database changes
+are rolled back and generated files deleted afterwards. The .prof file is
+saved to PROFILES_DIR and can be downloaded from /api/admin/profiling/.
+"""
+
+import cProfile
+import os
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.users.models import User
+from apps.voices.models import VoiceProfile
+from apps.voices.segments import FRAME_MS, SILENT_FRAME
+from apps.voices.services import voice_service
+from apps.voices.views import GenerateSpeechView, TranslateTextView
+from config.profiling import SORT_KEYS, format_stats, get_profiles_dir, save_profile
+
+FRAMES_PER_CHARACTER = 3
+# One silent frame in edge-tts' 100 ns ticks
+FRAME_TICKS = FRAME_MS * 10_000
+
+
+class StubCommunicate:
+    """Stands in for edge_tts.Communicate; streams silence proportional to the text."""
+
+    def __init__(self, text, voice, **kwargs):
+        self.text = text
+
+    async def stream(self):
+        # A WordBoundary per word, then its audio, as edge-tts interleaves them
+        offset = 0
+        for word in self.text.split() or ['']:
+            frames = max(1, (len(word) + 1) * FRAMES_PER_CHARACTER)
+            duration = frames * FRAME_TICKS
+            # edge-tts reports words without their punctuation
+            spoken = word.strip('.,;:!?"')
+            if spoken:
+                yield {'type': 'WordBoundary', 'offset': offset, 'duration': duration, 'text': spoken}
+            yield {'type': 'audio', 'data': SILENT_FRAME * frames}
+            offset += duration
+
+    async def save(self, audio_fname, metadata_fname=None):
+        with open(audio_fname, 'wb') as f:
+            async for chunk in self.stream():
+                if chunk['type'] == 'audio':
+                    f.write(chunk['data'])
+
+
+class StubTranslator:
+    """Stands in for deep_translator.GoogleTranslator; echoes the input."""
+
+    def __init__(self, source='auto', target='en', **kwargs):
+        pass
+
+    def translate(self, text, **kwargs):
+        return text
+
+
+def _files(directory):
+    """Paths of all files below `directory` (generated audio is sharded into subdirectories)."""
+    return {
+        os.path.join(root, filename)
+        for root, _, filenames in os.walk(directory)
+        for filename in filenames
+    }
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Profile generate_speech or translate through the view stack with stubbed backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', choices=['generate_speech', 'translate'])
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--text', default='The quick brown fox jumps over the lazy dog. ' * 4)
+        parser.add_argument('--email', help='User to run as (default: first administrator)')
+        parser.add_argument('--profile-id', help='Voice profile id for generate_speech')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='cumulative')
+        parser.add_argument('--limit', type=int, default=30)
+
+    def handle(self, *args, **options):
+        user = self._get_user(options['email'])
+        factory = APIRequestFactory()
+
+        if options['target'] == 'generate_speech':
+            profile = self._get_profile(options['profile_id'])
+            view = GenerateSpeechView.as_view(throttle_classes=[])
+            url = '/api/voices/generate/'
+            payload = {'text': options['text'], 'voice_profile_id': str(profile.id)}
+        else:
+            view = TranslateTextView.as_view(throttle_classes=[])
+            url = '/api/voices/translate/'
+            payload = {'text': options['text'], 'target_language': 'es'}
+
+        output_dir = voice_service.output_dir
+        existing = _files(output_dir)
+        profiler = cProfile.Profile()
+        statuses = []
+
+        try:
+            with mock.patch('apps.voices.services.edge_tts.Communicate', StubCommunicate), \
+                    mock.patch('apps.voices.translation.GoogleTranslator', StubTranslator), \
+                    transaction.atomic():
+                # Enough credits for every iteration; rolled back with everything else
+                User.objects.filter(pk=user.pk).update(credits=F('credits') + 5 * options['iterations'])
+                for _ in range(options['iterations']):
+                    request = factory.post(url, payload, format='json')
+                    force_authenticate(request, user=user)
+                    response = profiler.runcall(view, request)
+                    statuses.append(response.status_code)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            for path in _files(output_dir) - existing:
+                os.remove(path)
+
+        name = save_profile(profiler, f"cmd-{options['target']}")
+        path = os.path.join(get_profiles_dir(), name)
+        self.stdout.write(format_stats(path, options['sort'], options['limit']))
+        self.stdout.write(f'Response statuses: {statuses}')
+        self.stdout.write(self.style.SUCCESS(f'Profile saved to {path}'))
+
+    def _get_user(self, email):
+        users = User.objects.all()
+        if email:
+            user = users.filter(email=email).first()
+        else:
+            user = users.filter(Q(is_admin=True) | Q(is_superuser=True)).first()
+        if user is None:
+            raise CommandError('No matching user found; pass --email.')
+        return user
+
+    def _get_profile(self, profile_id):
+        profiles = VoiceProfile.objects.filter(is_active=True)
+        profile = profiles.filter(id=profile_id).first() if profile_id else profiles.first()
+        if profile is None:
+            raise CommandError('No active voice profile found; run seed_voices or pass --profile-id.')
+        return profile
@@ -0,0 +1,102 @@
+"""
+Management command to move media files written before the sharded layout.
+Run with: python manage.py shard_media
+Options:
+  --batch-size N   Rows per query (default 500)
+  --sleep S        Seconds to pause between batches, to spare the disk
+  --dry-run        Only count the files that would move
+
+Each file is hard-linked (copied across filesystems) to its sharded name,
+the row is switched with a conditional UPDATE and only then is the old
+name removed, so requests keep finding the file at every point and the
+command can be interrupted and re-run safely. See apps/voices/media.py.
+"""
+
+import os
+import shutil
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.voices import catalog, media
+from apps.voices.models import Document, GeneratedSpeech, SpeechSegment, VoiceClone, VoiceProfile
+from apps.voices.services import voice_service
+
+# (model, file field, directory prefix)
+TARGETS = [
+    (GeneratedSpeech, 'audio_file', 'generated_audio'),
+    (SpeechSegment, 'audio_file', 'speech_segments'),
+    (Document, 'audio_file', 'documents'),
+    (VoiceClone, 'audio_sample', 'clone_samples'),
+    (VoiceProfile, 'sample_audio', 'voiceprofile_audio'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Move media files into the sharded directory layout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per batch')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would move')
+
+    def handle(self, *args, **options):
+        total_moved = 0
+        for model, field, prefix in TARGETS:
+            moved, missing = self._shard(model, field, prefix, options)
+            total_moved += moved
+            label = f'{model.__name__}.{field}'
+            verb = 'would move' if options['dry_run'] else 'moved'
+            self.stdout.write(f'{label}: {verb} {moved}, missing {missing}')
+            if model is VoiceProfile and moved and not options['dry_run']:
+                # update() skips post_save, so refresh the catalog explicitly
+                catalog.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Done! {total_moved} files'))
+
+    def _shard(self, model, field, prefix, options):
+        media_root = voice_service.media_root
+        unsharded = (
+            model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            .exclude(**{f'{field}__regex': media.SHARDED_PATTERN})
+            .order_by('pk')
+        )
+        moved = missing = 0
+        last_pk = None
+        while True:
+            batch = unsharded if last_pk is None else unsharded.filter(pk__gt=last_pk)
+            rows = list(batch.values_list('pk', field)[:options['batch_size']])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            for pk, old_name in rows:
+                new_name = media.shard_name(prefix, os.path.basename(old_name))
+                old_path = os.path.join(media_root, old_name)
+                new_path = os.path.join(media_root, new_name)
+                # A row sharing a file that already moved only needs its name updated
+                if not os.path.exists(old_path) and not os.path.exists(new_path):
+                    missing += 1
+                    continue
+                moved += 1
+                if options['dry_run']:
+                    continue
+                linked = not os.path.exists(new_path)
+                if linked:
+                    _link(old_path, media.absolute_path(media_root, new_name))
+                updated = model.objects.filter(pk=pk, **{field: old_name}).update(**{field: new_name})
+                if updated:
+                    if os.path.exists(old_path):
+                        os.remove(old_path)
+                elif linked:
+                    # Changed underneath us; leave the row and its file alone
+                    os.remove(new_path)
+                    moved -= 1
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        return moved, missing
+
+
+def _link(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
@@ -0,0 +1,20 @@
+"""
+Management command to clean up segmented generations whose job was lost.
+Run with: python manage.py sweep_segmented   (e.g. every few minutes from cron)
+
+Background HLS synthesis dies with its worker process. Rows still pending
+or processing HLS_ORPHAN_SECONDS after creation are refunded and removed
+together with their playlist, segments and MP3. See apps/voices/hls.py.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.voices import hls
+
+
+class Command(BaseCommand):
+    help = 'Refund and remove segmented generations that never finished'
+
+    def handle(self, *args, **options):
+        swept = hls.sweep_orphans()
+        self.stdout.write(self.style.SUCCESS(f'Done! Removed {swept} unfinished segmented generations'))
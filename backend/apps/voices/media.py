@@ -0,0 +1,113 @@
+"""
+Sharded media layout.
+
+Audio files are spread over two levels of hex directories instead of one
+flat directory per kind, e.g.
+
+    generated_audio/3f/a2/3fa2c1...e9.mp3
+
+so no directory grows past a few thousand entries however many files
+there are. New names are random uuids, which spreads them evenly; the
+shard_media command moves files written before this layout.
+
+describe() reads the facts about a finished file (size, SHA-256, codec,
+sample rate, bitrate) once, when it is written, so they can be stored
+with the row instead of being looked up on disk later.
+"""
+
+import hashlib
+import os
+import re
+import uuid
+
+from django.utils.deconstruct import deconstructible
+
+READ_CHUNK = 256 * 1024
+# mutagen file types -> codec names (as ffmpeg calls them)
+CODECS = {'MP3': 'mp3', 'OggOpus': 'opus', 'OggVorbis': 'vorbis', 'WAVE': 'pcm_s16le', 'FLAC': 'flac'}
+# Containers mutagen can't parse, by extension
+EXTENSION_CODECS = {'.webm': 'opus'}
+
+# Names already in the layout (usable as a __regex lookup)
+SHARDED_PATTERN = r'^[^/]+/[0-9a-f]{2}/[0-9a-f]{2}/[^/]+$'
+_SHARDED = re.compile(SHARDED_PATTERN)
+_HEX_STEM = re.compile(r'^[0-9a-f]{4,}')
+
+
+def shard_stem(key):
+    """`aa/bb/key` for a hex key."""
+    return f'{key[:2]}/{key[2:4]}/{key}'
+
+
+def shard_name(prefix, filename):
+    """`prefix/aa/bb/filename`, sharded on the filename's hex stem (or its hash)."""
+    match = _HEX_STEM.match(filename)
+    key = match.group(0) if match else hashlib.md5(filename.encode('utf-8')).hexdigest()
+    return f'{prefix}/{key[:2]}/{key[2:4]}/{filename}'
+
+
+def new_name(prefix, extension, stem_suffix=''):
+    """A fresh sharded media name: `prefix/aa/bb/<uuid><stem_suffix>.<extension>`."""
+    return shard_name(prefix, f'{uuid.uuid4().hex}{stem_suffix}.{extension.lstrip(".")}')
+
+
+def is_sharded(name):
+    return bool(_SHARDED.match(name or ''))
+
+
+def absolute_path(media_root, name):
+    """Absolute path for a media name, creating its shard directories."""
+    path = os.path.join(media_root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+@deconstructible
+class ShardedUploadTo:
+    """FileField upload_to that stores uploads under a random sharded name."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def __call__(self, instance, filename):
+        extension = os.path.splitext(filename)[1].lower() or '.bin'
+        return new_name(self.prefix, extension)
+
+    def __eq__(self, other):
+        return isinstance(other, ShardedUploadTo) and other.prefix == self.prefix
+
+
+def describe(path):
+    """
+    Size, content hash and stream parameters of an audio file.
+
+    Returns a dict with the GeneratedSpeech metadata fields: size_bytes,
+    sha256, and codec, sample_rate and bitrate (None where unknown).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while chunk := f.read(READ_CHUNK):
+            digest.update(chunk)
+            size += len(chunk)
+
+    codec = sample_rate = bitrate = None
+    try:
+        import mutagen
+        audio = mutagen.File(path) if size else None
+    except Exception:
+        audio = None
+    if audio is not None and getattr(audio, 'info', None):
+        codec = CODECS.get(type(audio).__name__)
+        sample_rate = getattr(audio.info, 'sample_rate', None) or None
+        bitrate = getattr(audio.info, 'bitrate', None) or None
+    if codec is None and size:
+        codec = EXTENSION_CODECS.get(os.path.splitext(path)[1].lower())
+
+    return {
+        'size_bytes': size,
+        'sha256': digest.hexdigest(),
+        'codec': codec,
+        'sample_rate': sample_rate,
+        'bitrate': bitrate,
+    }
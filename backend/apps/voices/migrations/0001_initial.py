@@ -1,73 +1,73 @@
-# Generated by Django 4.2.28 on 2026-02-03 18:47
-
-from django.conf import settings
-from django.db import migrations, models
-import django.db.models.deletion
-
-
-class Migration(migrations.Migration):
-
-    initial = True
-
-    dependencies = [
-        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='VoiceProfile',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(max_length=100)),
-                ('description', models.TextField(blank=True)),
-                ('gender', models.CharField(choices=[('male', 'Male'), ('female', 'Female')], max_length=10)),
-                ('emotion', models.CharField(choices=[('neutral', 'Neutral'), ('happy', 'Happy'), ('sad', 'Sad'), ('angry', 'Angry'), ('excited', 'Excited'), ('calm', 'Calm')], default='neutral', max_length=20)),
-                ('language', models.CharField(choices=[('en', 'English'), ('es', 'Spanish'), ('fr', 'French'), ('de', 'German'), ('hi', 'Hindi'), ('ja', 'Japanese'), ('zh', 'Chinese')], default='en', max_length=10)),
-                ('sample_audio', models.FileField(blank=True, null=True, upload_to='voice_samples/')),
-                ('preview_image', models.ImageField(blank=True, null=True, upload_to='voice_previews/')),
-                ('is_active', models.BooleanField(default=True)),
-                ('is_premium', models.BooleanField(default=False)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('updated_at', models.DateTimeField(auto_now=True)),
-            ],
-            options={
-                'db_table': 'voice_profiles',
-                'ordering': ['name'],
-            },
-        ),
-        migrations.CreateModel(
-            name='VoiceClone',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('name', models.CharField(max_length=100)),
-                ('description', models.TextField(blank=True)),
-                ('audio_sample', models.FileField(upload_to='clone_samples/')),
-                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20)),
-                ('is_active', models.BooleanField(default=True)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('updated_at', models.DateTimeField(auto_now=True)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='voice_clones', to=settings.AUTH_USER_MODEL)),
-            ],
-            options={
-                'db_table': 'voice_clones',
-                'ordering': ['-created_at'],
-            },
-        ),
-        migrations.CreateModel(
-            name='GeneratedSpeech',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('input_text', models.TextField()),
-                ('audio_file', models.FileField(upload_to='generated_audio/')),
-                ('duration_seconds', models.FloatField(blank=True, null=True)),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generated_speeches', to=settings.AUTH_USER_MODEL)),
-                ('voice_clone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_speeches', to='voices.voiceclone')),
-                ('voice_profile', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_speeches', to='voices.voiceprofile')),
-            ],
-            options={
-                'db_table': 'generated_speeches',
-                'ordering': ['-created_at'],
-            },
-        ),
-    ]
+# Generated by Django 4.2.28 on 2026-02-03 18:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoiceProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('gender', models.CharField(choices=[('male', 'Male'), ('female', 'Female')], max_length=10)),
+                ('emotion', models.CharField(choices=[('neutral', 'Neutral'), ('happy', 'Happy'), ('sad', 'Sad'), ('angry', 'Angry'), ('excited', 'Excited'), ('calm', 'Calm')], default='neutral', max_length=20)),
+                ('language', models.CharField(choices=[('en', 'English'), ('es', 'Spanish'), ('fr', 'French'), ('de', 'German'), ('hi', 'Hindi'), ('ja', 'Japanese'), ('zh', 'Chinese')], default='en', max_length=10)),
+                ('sample_audio', models.FileField(blank=True, null=True, upload_to='voice_samples/')),
+                ('preview_image', models.ImageField(blank=True, null=True, upload_to='voice_previews/')),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_premium', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'voice_profiles',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VoiceClone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('audio_sample', models.FileField(upload_to='clone_samples/')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='voice_clones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'voice_clones',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GeneratedSpeech',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_text', models.TextField()),
+                ('audio_file', models.FileField(upload_to='generated_audio/')),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generated_speeches', to=settings.AUTH_USER_MODEL)),
+                ('voice_clone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_speeches', to='voices.voiceclone')),
+                ('voice_profile', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_speeches', to='voices.voiceprofile')),
+            ],
+            options={
+                'db_table': 'generated_speeches',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
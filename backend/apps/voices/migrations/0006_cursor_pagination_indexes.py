@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0005_alter_voiceprofile_sample_audio'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generatedspeech',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='speech_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedspeech',
+            index=models.Index(fields=['-created_at', '-id'], name='speech_created_idx'),
+        ),
+    ]
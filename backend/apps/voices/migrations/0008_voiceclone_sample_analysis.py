@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0007_clone_uploads_and_processing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voiceclone',
+            name='clipping_ratio',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceclone',
+            name='loudness_dbfs',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceclone',
+            name='peak_dbfs',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceclone',
+            name='sample_duration_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceclone',
+            name='sample_rate',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceclone',
+            name='silence_ratio',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceclone',
+            name='zero_crossing_rate',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0008_voiceclone_sample_analysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voiceclone',
+            name='acoustic_features',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceprofile',
+            name='acoustic_features',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
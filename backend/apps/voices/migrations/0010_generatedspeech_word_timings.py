@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0009_acoustic_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedspeech',
+            name='word_timings',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
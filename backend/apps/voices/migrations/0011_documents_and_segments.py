@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0010_generatedspeech_word_timings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpeechSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('voice_shortname', models.CharField(max_length=100)),
+                ('text', models.TextField()),
+                ('audio_file', models.FileField(upload_to='speech_segments/')),
+                ('duration_seconds', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'speech_segments',
+                'indexes': [models.Index(fields=['last_used_at'], name='segment_last_used_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Document',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('text', models.TextField()),
+                ('audio_file', models.FileField(blank=True, null=True, upload_to='documents/')),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('segments', models.JSONField(blank=True, default=list, editable=False)),
+                ('rendered_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to=settings.AUTH_USER_MODEL)),
+                ('voice_clone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='documents', to='voices.voiceclone')),
+                ('voice_profile', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='documents', to='voices.voiceprofile')),
+            ],
+            options={
+                'db_table': 'documents',
+                'ordering': ['-updated_at'],
+                'indexes': [models.Index(fields=['user', '-updated_at'], name='document_user_updated_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0011_documents_and_segments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voiceprofile',
+            name='sample_duration_ms',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceprofile',
+            name='sample_offset_ms',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='voiceprofile',
+            name='sample_sprite',
+            field=models.FileField(blank=True, editable=False, null=True, upload_to='voiceprofile_sprites/'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:29
+
+import apps.voices.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0012_voiceprofile_sample_sprite'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='audio_file',
+            field=models.FileField(blank=True, null=True, upload_to=apps.voices.media.ShardedUploadTo('documents')),
+        ),
+        migrations.AlterField(
+            model_name='generatedspeech',
+            name='audio_file',
+            field=models.FileField(upload_to=apps.voices.media.ShardedUploadTo('generated_audio')),
+        ),
+        migrations.AlterField(
+            model_name='speechsegment',
+            name='audio_file',
+            field=models.FileField(upload_to=apps.voices.media.ShardedUploadTo('speech_segments')),
+        ),
+        migrations.AlterField(
+            model_name='voiceclone',
+            name='audio_sample',
+            field=models.FileField(upload_to=apps.voices.media.ShardedUploadTo('clone_samples')),
+        ),
+        migrations.AlterField(
+            model_name='voiceprofile',
+            name='sample_audio',
+            field=models.FileField(blank=True, null=True, upload_to=apps.voices.media.ShardedUploadTo('voiceprofile_audio')),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0014_generatedspeech_file_metadata'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedspeech',
+            name='storage_tier',
+            field=models.CharField(choices=[('hot', 'Hot'), ('compact', 'Compact'), ('cold', 'Cold'), ('expired', 'Expired')], default='hot', editable=False, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='generatedspeech',
+            index=models.Index(fields=['storage_tier', 'created_at'], name='speech_tier_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0015_generatedspeech_storage_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedspeech',
+            name='waveform',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0016_generatedspeech_waveform'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedspeech',
+            name='hls_playlist',
+            field=models.FileField(blank=True, editable=False, max_length=200, null=True, upload_to=''),
+        ),
+    ]
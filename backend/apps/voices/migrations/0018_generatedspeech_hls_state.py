@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voices', '0017_generatedspeech_hls_playlist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedspeech',
+            name='hls_state',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('processing', 'Processing'), ('complete', 'Complete')], editable=False, max_length=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='generatedspeech',
+            index=models.Index(fields=['hls_state', 'created_at'], name='speech_hls_state_idx'),
+        ),
+    ]
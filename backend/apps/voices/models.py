@@ -1,174 +1,354 @@
-from django.db import models
-from django.conf import settings
-
-
-class VoiceProfile(models.Model):
-    """System voice profiles for speech generation."""
-    
-    GENDER_CHOICES = [
-        ('male', 'Male'),
-        ('female', 'Female'),
-    ]
-    
-    EMOTION_CHOICES = [
-        ('neutral', 'Neutral'),
-        ('happy', 'Happy'),
-        ('sad', 'Sad'),
-        ('angry', 'Angry'),
-        ('excited', 'Excited'),
-        ('calm', 'Calm'),
-    ]
-    
-    LANGUAGE_CHOICES = [
-        # Major Languages
-        ('en', 'English'),
-        ('es', 'Spanish'),
-        ('fr', 'French'),
-        ('de', 'German'),
-        ('pt', 'Portuguese'),
-        ('it', 'Italian'),
-        ('ru', 'Russian'),
-        ('ja', 'Japanese'),
-        ('ko', 'Korean'),
-        ('zh', 'Chinese'),
-        # South Asian
-        ('hi', 'Hindi'),
-        ('bn', 'Bengali'),
-        ('ta', 'Tamil'),
-        ('te', 'Telugu'),
-        ('mr', 'Marathi'),
-        ('gu', 'Gujarati'),
-        ('kn', 'Kannada'),
-        ('ml', 'Malayalam'),
-        ('pa', 'Punjabi'),
-        ('ur', 'Urdu'),
-        # Southeast Asian
-        ('th', 'Thai'),
-        ('vi', 'Vietnamese'),
-        ('id', 'Indonesian'),
-        ('ms', 'Malay'),
-        ('fil', 'Filipino'),
-        ('my', 'Burmese'),
-        # Middle Eastern
-        ('ar', 'Arabic'),
-        ('he', 'Hebrew'),
-        ('fa', 'Persian'),
-        ('tr', 'Turkish'),
-        # European
-        ('nl', 'Dutch'),
-        ('pl', 'Polish'),
-        ('sv', 'Swedish'),
-        ('da', 'Danish'),
-        ('no', 'Norwegian'),
-        ('fi', 'Finnish'),
-        ('el', 'Greek'),
-        ('cs', 'Czech'),
-        ('hu', 'Hungarian'),
-        ('ro', 'Romanian'),
-        ('uk', 'Ukrainian'),
-        ('bg', 'Bulgarian'),
-        ('sk', 'Slovak'),
-        ('hr', 'Croatian'),
-        ('sl', 'Slovenian'),
-        ('lt', 'Lithuanian'),
-        ('lv', 'Latvian'),
-        ('et', 'Estonian'),
-        ('ca', 'Catalan'),
-        ('ga', 'Irish'),
-        ('cy', 'Welsh'),
-        # African
-        ('sw', 'Swahili'),
-        ('af', 'Afrikaans'),
-        ('am', 'Amharic'),
-        ('zu', 'Zulu'),
-    ]
-    
-    name = models.CharField(max_length=100)
-    description = models.TextField(blank=True)
-    gender = models.CharField(max_length=10, choices=GENDER_CHOICES)
-    emotion = models.CharField(max_length=20, choices=EMOTION_CHOICES, default='neutral')
-    language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES, default='en')
-    sample_audio = models.FileField(upload_to='voiceprofile_audio/', null=True, blank=True)
-    preview_image = models.ImageField(upload_to='voice_previews/', null=True, blank=True)
-    is_active = models.BooleanField(default=True)
-    is_premium = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-    
-    class Meta:
-        db_table = 'voice_profiles'
-        ordering = ['name']
-    
-    def __str__(self):
-        return f"{self.name} ({self.gender}, {self.emotion})"
-
-
-class VoiceClone(models.Model):
-    """User's cloned voice profiles."""
-    
-    user = models.ForeignKey(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE,
-        related_name='voice_clones'
-    )
-    name = models.CharField(max_length=100)
-    description = models.TextField(blank=True)
-    language = models.CharField(max_length=10, choices=VoiceProfile.LANGUAGE_CHOICES, default='en')
-    audio_sample = models.FileField(upload_to='clone_samples/')
-    status = models.CharField(
-        max_length=20,
-        choices=[
-            ('pending', 'Pending'),
-            ('processing', 'Processing'),
-            ('ready', 'Ready'),
-            ('failed', 'Failed'),
-        ],
-        default='pending'
-    )
-    is_active = models.BooleanField(default=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-    
-    class Meta:
-        db_table = 'voice_clones'
-        ordering = ['-created_at']
-    
-    def __str__(self):
-        return f"{self.name} (by {self.user.email})"
-
-
-class GeneratedSpeech(models.Model):
-    """Generated speech records."""
-    
-    user = models.ForeignKey(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE,
-        related_name='generated_speeches'
-    )
-    voice_profile = models.ForeignKey(
-        VoiceProfile,
-        on_delete=models.SET_NULL,
-        null=True,
-        blank=True,
-        related_name='generated_speeches'
-    )
-    voice_clone = models.ForeignKey(
-        VoiceClone,
-        on_delete=models.SET_NULL,
-        null=True,
-        blank=True,
-        related_name='generated_speeches'
-    )
-    input_text = models.TextField()
-    audio_file = models.FileField(upload_to='generated_audio/')
-    duration_seconds = models.FloatField(null=True, blank=True)
-    credits_used = models.IntegerField(default=5)
-    balance_after = models.IntegerField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    
-    class Meta:
-        db_table = 'generated_speeches'
-        ordering = ['-created_at']
-    
-    def __str__(self):
-        return f"Speech by {self.user.email} - {self.created_at}"
+import uuid
+
+from django.db import models
+from django.conf import settings
+
+from .media import ShardedUploadTo
+
+
+class VoiceProfile(models.Model):
+    """System voice profiles for speech generation."""
+    
+    GENDER_CHOICES = [
+        ('male', 'Male'),
+        ('female', 'Female'),
+    ]
+    
+    EMOTION_CHOICES = [
+        ('neutral', 'Neutral'),
+        ('happy', 'Happy'),
+        ('sad', 'Sad'),
+        ('angry', 'Angry'),
+        ('excited', 'Excited'),
+        ('calm', 'Calm'),
+    ]
+    
+    LANGUAGE_CHOICES = [
+        # Major Languages
+        ('en', 'English'),
+        ('es', 'Spanish'),
+        ('fr', 'French'),
+        ('de', 'German'),
+        ('pt', 'Portuguese'),
+        ('it', 'Italian'),
+        ('ru', 'Russian'),
+        ('ja', 'Japanese'),
+        ('ko', 'Korean'),
+        ('zh', 'Chinese'),
+        # South Asian
+        ('hi', 'Hindi'),
+        ('bn', 'Bengali'),
+        ('ta', 'Tamil'),
+        ('te', 'Telugu'),
+        ('mr', 'Marathi'),
+        ('gu', 'Gujarati'),
+        ('kn', 'Kannada'),
+        ('ml', 'Malayalam'),
+        ('pa', 'Punjabi'),
+        ('ur', 'Urdu'),
+        # Southeast Asian
+        ('th', 'Thai'),
+        ('vi', 'Vietnamese'),
+        ('id', 'Indonesian'),
+        ('ms', 'Malay'),
+        ('fil', 'Filipino'),
+        ('my', 'Burmese'),
+        # Middle Eastern
+        ('ar', 'Arabic'),
+        ('he', 'Hebrew'),
+        ('fa', 'Persian'),
+        ('tr', 'Turkish'),
+        # European
+        ('nl', 'Dutch'),
+        ('pl', 'Polish'),
+        ('sv', 'Swedish'),
+        ('da', 'Danish'),
+        ('no', 'Norwegian'),
+        ('fi', 'Finnish'),
+        ('el', 'Greek'),
+        ('cs', 'Czech'),
+        ('hu', 'Hungarian'),
+        ('ro', 'Romanian'),
+        ('uk', 'Ukrainian'),
+        ('bg', 'Bulgarian'),
+        ('sk', 'Slovak'),
+        ('hr', 'Croatian'),
+        ('sl', 'Slovenian'),
+        ('lt', 'Lithuanian'),
+        ('lv', 'Latvian'),
+        ('et', 'Estonian'),
+        ('ca', 'Catalan'),
+        ('ga', 'Irish'),
+        ('cy', 'Welsh'),
+        # African
+        ('sw', 'Swahili'),
+        ('af', 'Afrikaans'),
+        ('am', 'Amharic'),
+        ('zu', 'Zulu'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    gender = models.CharField(max_length=10, choices=GENDER_CHOICES)
+    emotion = models.CharField(max_length=20, choices=EMOTION_CHOICES, default='neutral')
+    language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES, default='en')
+    sample_audio = models.FileField(upload_to=ShardedUploadTo('voiceprofile_audio'), null=True, blank=True)
+    preview_image = models.ImageField(upload_to='voice_previews/', null=True, blank=True)
+    # float32 feature vector of sample_audio (see apps.voices.voice_features)
+    acoustic_features = models.BinaryField(null=True, blank=True, editable=False)
+    # Where sample_audio sits in its language's sprite (see apps.voices.sprites)
+    sample_sprite = models.FileField(upload_to='voiceprofile_sprites/', null=True, blank=True, editable=False)
+    sample_offset_ms = models.IntegerField(null=True, blank=True, editable=False)
+    sample_duration_ms = models.IntegerField(null=True, blank=True, editable=False)
+    is_active = models.BooleanField(default=True)
+    is_premium = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'voice_profiles'
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.gender}, {self.emotion})"
+
+
+class VoiceClone(models.Model):
+    """User's cloned voice profiles."""
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='voice_clones'
+    )
+    name = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    language = models.CharField(max_length=10, choices=VoiceProfile.LANGUAGE_CHOICES, default='en')
+    audio_sample = models.FileField(upload_to=ShardedUploadTo('clone_samples'))
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('pending', 'Pending'),
+            ('processing', 'Processing'),
+            ('ready', 'Ready'),
+            ('failed', 'Failed'),
+        ],
+        default='pending'
+    )
+    # Set by the process_clones worker
+    processing_error = models.TextField(blank=True)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    # Sample analysis (see apps.voices.audio_analysis)
+    sample_duration_seconds = models.FloatField(null=True, blank=True)
+    sample_rate = models.PositiveIntegerField(null=True, blank=True)
+    loudness_dbfs = models.FloatField(null=True, blank=True)
+    peak_dbfs = models.FloatField(null=True, blank=True)
+    silence_ratio = models.FloatField(null=True, blank=True)
+    clipping_ratio = models.FloatField(null=True, blank=True)
+    zero_crossing_rate = models.FloatField(null=True, blank=True)
+    # float32 feature vector used to pick the closest catalog voice
+    acoustic_features = models.BinaryField(null=True, blank=True, editable=False)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'voice_clones'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='clone_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} (by {self.user.email})"
+    
+    ANALYSIS_FIELDS = {
+        'duration_seconds': 'sample_duration_seconds',
+        'sample_rate': 'sample_rate',
+        'loudness_dbfs': 'loudness_dbfs',
+        'peak_dbfs': 'peak_dbfs',
+        'silence_ratio': 'silence_ratio',
+        'clipping_ratio': 'clipping_ratio',
+        'zero_crossing_rate': 'zero_crossing_rate',
+    }
+    
+    def apply_analysis(self, metrics):
+        for key, field in self.ANALYSIS_FIELDS.items():
+            setattr(self, field, metrics[key])
+    
+    def analysis(self):
+        if self.sample_duration_seconds is None:
+            return None
+        return {key: getattr(self, field) for key, field in self.ANALYSIS_FIELDS.items()}
+
+
+class CloneUpload(models.Model):
+    """A resumable, chunked upload of a voice clone sample."""
+    
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+        ('consumed', 'Consumed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='clone_uploads'
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'clone_uploads'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+
+class GeneratedSpeech(models.Model):
+    """Generated speech records."""
+    
+    STORAGE_TIER_CHOICES = [
+        ('hot', 'Hot'),            # as generated, in MEDIA_ROOT
+        ('compact', 'Compact'),    # re-encoded to a low bitrate, in MEDIA_ROOT
+        ('cold', 'Cold'),          # in the "cold" storage, not served
+        ('expired', 'Expired'),    # audio deleted
+    ]
+    
+    HLS_STATE_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('complete', 'Complete'),
+    ]
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='generated_speeches'
+    )
+    voice_profile = models.ForeignKey(
+        VoiceProfile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='generated_speeches'
+    )
+    voice_clone = models.ForeignKey(
+        VoiceClone,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='generated_speeches'
+    )
+    input_text = models.TextField()
+    audio_file = models.FileField(upload_to=ShardedUploadTo('generated_audio'))
+    duration_seconds = models.FloatField(null=True, blank=True)
+    # HLS playlist of a segmented generation (see hls.py); the segments sit next to it
+    hls_playlist = models.FileField(max_length=200, null=True, blank=True, editable=False)
+    hls_state = models.CharField(max_length=10, choices=HLS_STATE_CHOICES, null=True, blank=True, editable=False)
+    # [[start_ms, end_ms, word], ...] from edge-tts word boundaries; see subtitles.py
+    word_timings = models.JSONField(null=True, blank=True, editable=False)
+    # Min/max peaks at a few resolutions for the history player; see waveform.py
+    waveform = models.JSONField(null=True, blank=True, editable=False)
+    # File facts recorded when the audio is written (media.describe), so
+    # dedupe, integrity checks and Content-Length need no disk access
+    size_bytes = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    sha256 = models.CharField(max_length=64, null=True, blank=True, db_index=True, editable=False)
+    codec = models.CharField(max_length=20, null=True, blank=True, editable=False)
+    sample_rate = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    bitrate = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # Where the audio lives now; apply_retention moves rows along as they age
+    storage_tier = models.CharField(max_length=10, choices=STORAGE_TIER_CHOICES, default='hot', editable=False)
+    credits_used = models.IntegerField(default=5)
+    balance_after = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'generated_speeches'
+        ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination seeks on (created_at, id), per user and globally
+            models.Index(fields=['user', '-created_at', '-id'], name='speech_user_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='speech_created_idx'),
+            models.Index(fields=['storage_tier', 'created_at'], name='speech_tier_created_idx'),
+            models.Index(fields=['hls_state', 'created_at'], name='speech_hls_state_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Speech by {self.user.email} - {self.created_at}"
+
+
+class SpeechSegment(models.Model):
+    """
+    Content-addressed cache of synthesized MP3 pieces (see segments.py).
+    
+    `key` is the SHA-256 of the edge-tts voice and the normalized text, so
+    a paragraph or dialogue line is only ever synthesized once per voice.
+    """
+    
+    key = models.CharField(max_length=64, unique=True)
+    voice_shortname = models.CharField(max_length=100)
+    text = models.TextField()
+    audio_file = models.FileField(upload_to=ShardedUploadTo('speech_segments'))
+    duration_seconds = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'speech_segments'
+        indexes = [
+            models.Index(fields=['last_used_at'], name='segment_last_used_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.voice_shortname}: {self.text[:40]}"
+
+
+class Document(models.Model):
+    """Long-form script rendered paragraph by paragraph from cached segments."""
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='documents'
+    )
+    title = models.CharField(max_length=200)
+    text = models.TextField()
+    voice_profile = models.ForeignKey(
+        VoiceProfile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='documents'
+    )
+    voice_clone = models.ForeignKey(
+        VoiceClone,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='documents'
+    )
+    audio_file = models.FileField(upload_to=ShardedUploadTo('documents'), null=True, blank=True)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    # Layout of the last render: [{'key', 'start_ms', 'duration_ms'}, ...] per paragraph
+    segments = models.JSONField(default=list, blank=True, editable=False)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'documents'
+        ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='document_user_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return self.title
@@ -0,0 +1,265 @@
+"""
+Tiered retention of generated audio.
+
+As GeneratedSpeech rows age (by created_at) they move through the tiers
+in GeneratedSpeech.STORAGE_TIER_CHOICES:
+
+- compact: MP3 audio is re-encoded to RETENTION_COMPACT_FORMAT (low
+  bitrate MP3), still in MEDIA_ROOT. Other formats (opus, ogg, wav) and
+  files that would not get smaller are kept as they are.
+- cold: moved to the "cold" storage (STORAGES['cold']), which is not
+  publicly served; the API reports no audio_file for these rows.
+- expired: the audio is deleted; the row, text and timings stay.
+
+The HLS segments of segmented generations are dropped at the first step,
+leaving the single file.
+
+Cached speech segments that no render has used for RETENTION_SEGMENT_DAYS
+are deleted too.
+
+Rows are processed in keyset-paginated batches. The file work (ffmpeg,
+hashing, copying) runs on a process pool and only sees paths; the parent
+saves each batch with one bulk_update and removes the replaced files
+afterwards, so a row never points at a file that is gone. Rows whose file
+could not be processed stay in their tier and are retried on the next
+run.
+"""
+
+import logging
+import os
+import subprocess
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import storages
+from django.utils import timezone
+
+from . import hls, media
+from .models import GeneratedSpeech, SpeechSegment
+from .services import OUTPUT_FORMATS, ffmpeg_binary, transcode, voice_service
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ['size_bytes', 'sha256', 'codec', 'sample_rate', 'bitrate']
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs jobs in this process (workers=0)."""
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def executor(workers):
+    """A process pool of `workers` processes, or an inline executor for 0."""
+    if workers <= 0:
+        return _InlineExecutor()
+    # Workers set Django up themselves where they are spawned rather than forked
+    return ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+
+
+def policy():
+    """Cutoff datetime of each step, or None where the step is off."""
+    now = timezone.now()
+    days = {
+        'compact': settings.RETENTION_COMPACT_DAYS,
+        'archive': settings.RETENTION_COLD_DAYS,
+        'expire': settings.RETENTION_EXPIRE_DAYS,
+        'segments': settings.RETENTION_SEGMENT_DAYS,
+    }
+    return {step: now - timedelta(days=n) if n > 0 else None for step, n in days.items()}
+
+
+def _batches(queryset, batch_size):
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(page.order_by('pk')[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        yield batch
+
+
+def _media_path(name):
+    return os.path.join(voice_service.media_root, name)
+
+
+# Pool jobs: plain arguments in, (result, error) out, no database access
+
+def _compact_file(job):
+    source_path, target_path, output_format = job
+    try:
+        transcode(source_path, target_path, output_format)
+        metadata = media.describe(target_path)
+        if metadata['size_bytes'] >= os.path.getsize(source_path):
+            os.remove(target_path)
+            return {}, None
+        return metadata, None
+    except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        return None, str(e)
+
+
+def _archive_file(job):
+    source_path, name = job
+    try:
+        with open(source_path, 'rb') as f:
+            return storages['cold'].save(name, File(f)), None
+    except OSError as e:
+        return None, str(e)
+
+
+def compact(before, pool, batch_size=100, output_format=None, dry_run=False):
+    """Re-encode hot MP3 audio created before `before`."""
+    output_format = output_format or settings.RETENTION_COMPACT_FORMAT
+    extension = OUTPUT_FORMATS[output_format]['extension']
+    if extension != 'mp3':
+        raise ValueError(f'Audio can only be compacted to MP3, not {output_format}.')
+    # Other codecs were asked for explicitly; keep them
+    rows = GeneratedSpeech.objects.filter(
+        storage_tier='hot', created_at__lt=before, audio_file__iendswith='.mp3'
+    )
+    stats = Counter()
+    for batch in _batches(rows, batch_size):
+        if dry_run:
+            stats['compacted'] += len(batch)
+            continue
+        names = [media.new_name('generated_audio', extension) for _ in batch]
+        jobs = [
+            (_media_path(speech.audio_file.name), media.absolute_path(voice_service.media_root, name), output_format)
+            for speech, name in zip(batch, names)
+        ]
+        changed, replaced, playlists = [], [], []
+        for speech, name, (metadata, error) in zip(batch, names, pool.map(_compact_file, jobs)):
+            if error is not None:
+                logger.warning('Could not compact speech %s: %s', speech.id, error)
+                stats['failed'] += 1
+                continue
+            if metadata:
+                replaced.append(speech.audio_file.name)
+                speech.audio_file = name
+                for field in METADATA_FIELDS:
+                    setattr(speech, field, metadata[field])
+                stats['compacted'] += 1
+            else:
+                stats['kept'] += 1
+            playlists.append(speech.hls_playlist.name)
+            speech.hls_playlist = None
+            speech.storage_tier = 'compact'
+            changed.append(speech)
+        GeneratedSpeech.objects.bulk_update(changed, ['audio_file', 'hls_playlist', 'storage_tier', *METADATA_FIELDS])
+        for name in replaced:
+            voice_service.delete_media(name)
+        for name in playlists:
+            hls.discard(name)
+    return stats
+
+
+def archive(before, pool, batch_size=100, dry_run=False):
+    """Move hot and compact audio created before `before` to cold storage."""
+    rows = (
+        GeneratedSpeech.objects.filter(storage_tier__in=['hot', 'compact'], created_at__lt=before)
+        .exclude(audio_file='')
+    )
+    stats = Counter()
+    for batch in _batches(rows, batch_size):
+        if dry_run:
+            stats['archived'] += len(batch)
+            continue
+        jobs = [(_media_path(speech.audio_file.name), speech.audio_file.name) for speech in batch]
+        changed, replaced, playlists = [], [], []
+        for speech, (name, error) in zip(batch, pool.map(_archive_file, jobs)):
+            if error is not None:
+                logger.warning('Could not archive speech %s: %s', speech.id, error)
+                stats['failed'] += 1
+                continue
+            replaced.append(speech.audio_file.name)
+            playlists.append(speech.hls_playlist.name)
+            speech.audio_file = name
+            speech.hls_playlist = None
+            speech.storage_tier = 'cold'
+            changed.append(speech)
+            stats['archived'] += 1
+        GeneratedSpeech.objects.bulk_update(changed, ['audio_file', 'hls_playlist', 'storage_tier'])
+        for name in replaced:
+            voice_service.delete_media(name)
+        for name in playlists:
+            hls.discard(name)
+    return stats
+
+
+def expire(before, batch_size=100, dry_run=False):
+    """Delete the audio of rows created before `before`."""
+    rows = GeneratedSpeech.objects.exclude(storage_tier='expired').filter(created_at__lt=before)
+    stats = Counter()
+    for batch in _batches(rows.only('id', 'audio_file', 'hls_playlist', 'storage_tier'), batch_size):
+        stats['expired'] += len(batch)
+        if dry_run:
+            continue
+        GeneratedSpeech.objects.filter(pk__in=[speech.pk for speech in batch]).update(
+            storage_tier='expired', audio_file='', hls_playlist=None
+        )
+        for speech in batch:
+            hls.discard(speech.hls_playlist.name)
+            if not speech.audio_file.name:
+                continue
+            if speech.storage_tier == 'cold':
+                storages['cold'].delete(speech.audio_file.name)
+            else:
+                voice_service.delete_media(speech.audio_file.name)
+    return stats
+
+
+def expire_segments(before, batch_size=100, dry_run=False):
+    """Delete cached segments no render has used since `before`."""
+    rows = SpeechSegment.objects.filter(last_used_at__lt=before).only('id', 'audio_file')
+    stats = Counter()
+    for batch in _batches(rows, batch_size):
+        if dry_run:
+            stats['segments'] += len(batch)
+            continue
+        pks = [segment.pk for segment in batch]
+        # A render may have picked a segment up since the batch was read
+        SpeechSegment.objects.filter(pk__in=pks, last_used_at__lt=before).delete()
+        kept = set(SpeechSegment.objects.filter(pk__in=pks).values_list('pk', flat=True))
+        for segment in batch:
+            if segment.pk not in kept:
+                voice_service.delete_media(segment.audio_file.name)
+                stats['segments'] += 1
+    return stats
+
+
+def apply(workers=0, batch_size=100, dry_run=False):
+    """
+    Run every enabled step, oldest tier first.
+
+    Returns a Counter of outcomes. Compaction is skipped (counted as
+    'compact_skipped') when ffmpeg is not available.
+    """
+    cutoffs = policy()
+    stats = Counter()
+    if cutoffs['expire']:
+        stats += expire(cutoffs['expire'], batch_size, dry_run)
+    if cutoffs['segments']:
+        stats += expire_segments(cutoffs['segments'], batch_size, dry_run)
+    with executor(workers) as pool:
+        if cutoffs['archive']:
+            stats += archive(cutoffs['archive'], pool, batch_size, dry_run)
+        if cutoffs['compact']:
+            if ffmpeg_binary() is None:
+                stats['compact_skipped'] += 1
+            else:
+                stats += compact(cutoffs['compact'], pool, batch_size, dry_run=dry_run)
+    return stats
@@ -0,0 +1,251 @@
+"""
+Cached speech segments and MP3 assembly.
+
+Long-form renders (documents, dialogues) are built from pieces: each
+paragraph or line is synthesized on its own (fan-out previews use the same
+cache, one segment per voice) and stored as a SpeechSegment
+keyed by SHA-256(voice, normalized text). A render looks all of its keys
+up in one query, synthesizes only the missing ones (concurrently, on one
+event loop) and concatenates the cached files.
+
+edge-tts always returns 24 kHz / 48 kbit/s mono MPEG-2 Layer III without
+tags, so segments can be joined frame-wise by plain byte concatenation,
+and pauses are runs of silent frames of the same format; no decoding or
+re-encoding is needed to assemble even a long document.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+from config import timing
+
+from . import credits, media
+from .models import SpeechSegment
+from .services import GENERATION_STAGE_SECONDS, voice_service
+
+logger = logging.getLogger(__name__)
+
+# One silent frame in edge-tts' output format: 576 samples = 24 ms
+SILENT_FRAME = b'\xff\xf3\x64\xc0' + b'\x00' * 140
+FRAME_MS = 24
+COPY_CHUNK = 256 * 1024
+
+
+class SegmentError(Exception):
+    """Some segments could not be synthesized."""
+
+    def __init__(self, failed):
+        super().__init__(f'{len(failed)} segment(s) could not be synthesized')
+        self.failed = failed
+
+
+def normalize(text):
+    """Collapse whitespace so re-wrapping a paragraph doesn't change its key."""
+    return ' '.join(text.split())
+
+
+def segment_key(voice_shortname, text):
+    return hashlib.sha256(f'{voice_shortname}\n{normalize(text)}'.encode()).hexdigest()
+
+
+def split_paragraphs(text):
+    """Non-empty, normalized paragraphs separated by blank lines."""
+    return [normalize(p) for p in re.split(r'\n\s*\n', text) if p.strip()]
+
+
+def silence(ms):
+    """Silent MP3 frames lasting `ms` (rounded to whole frames)."""
+    return SILENT_FRAME * max(0, round(ms / FRAME_MS))
+
+
+def _segment_path(key):
+    return media.shard_name('speech_segments', f'{key}.mp3')
+
+
+async def _synthesize(key, voice_shortname, text, semaphore):
+    """Synthesize one segment file; returns its duration."""
+    path = os.path.join(voice_service.media_root, _segment_path(key))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f'{path}.{uuid.uuid4().hex}.part'
+    async with semaphore:
+        try:
+            with GENERATION_STAGE_SECONDS.time(stage='tts'):
+                await voice_service.stream_to_file(text, voice_shortname, partial)
+            duration = voice_service.mp3_duration(text, partial)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+    return duration
+
+
+async def _synthesize_all(missing, workers):
+    semaphore = asyncio.Semaphore(workers)
+    return await asyncio.gather(
+        *(_synthesize(key, voice, text, semaphore) for key, (voice, text) in missing.items()),
+        return_exceptions=True,
+    )
+
+
+class SegmentPlan:
+    """
+    The segments needed for a list of (voice_shortname, text) pieces.
+
+    `keys` follows the input order; `segments` holds the cached ones and
+    `missing` the distinct pieces that still have to be synthesized,
+    including cached ones whose file has gone.
+    """
+
+    def __init__(self, pieces):
+        self.keys = [segment_key(voice, text) for voice, text in pieces]
+        # Touch before loading: retention only deletes segments untouched
+        # since its cutoff, so whatever is loaded here stays
+        SpeechSegment.objects.filter(key__in=set(self.keys)).update(last_used_at=timezone.now())
+        self.segments = {
+            key: segment
+            for key, segment in SpeechSegment.objects.in_bulk(set(self.keys), field_name='key').items()
+            if os.path.exists(os.path.join(voice_service.media_root, segment.audio_file.name))
+        }
+        self.missing = {}
+        for key, (voice, text) in zip(self.keys, pieces):
+            if key not in self.segments:
+                self.missing[key] = (voice, normalize(text))
+
+    @property
+    def cost(self):
+        return len(self.missing) * credits.CREDIT_COST
+
+    def synthesize(self):
+        """
+        Synthesize the missing segments concurrently and store them.
+
+        All syntheses share one event loop, at most SEGMENT_CONCURRENCY at a
+        time. Returns the keys that failed.
+        """
+        durations = {}
+        failed = []
+        if self.missing:
+            workers = max(1, getattr(settings, 'SEGMENT_CONCURRENCY', 4))
+            with timing.span('tts'):
+                results = asyncio.run(_synthesize_all(self.missing, workers))
+            for key, result in zip(self.missing, results):
+                if isinstance(result, Exception):
+                    logger.error('Segment synthesis failed', exc_info=result)
+                    failed.append(key)
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    durations[key] = result
+
+        SpeechSegment.objects.bulk_create([
+            SpeechSegment(
+                key=key,
+                voice_shortname=self.missing[key][0],
+                text=self.missing[key][1],
+                audio_file=_segment_path(key),
+                duration_seconds=duration,
+            )
+            for key, duration in durations.items()
+        ], update_conflicts=True, unique_fields=['key'], update_fields=['audio_file', 'duration_seconds'])
+        if durations:
+            self.segments.update(SpeechSegment.objects.in_bulk(list(durations), field_name='key'))
+        return failed
+
+    def ordered(self):
+        return [self.segments[key] for key in self.keys]
+
+
+def concatenate(target_path, parts, missing_ok=False):
+    """
+    Join MP3 files into `target_path` (written atomically).
+
+    `parts` is a list of (source_path, duration_ms, gap_ms): the silence
+    before each file, then the file itself. With `missing_ok`, a file that
+    does not exist is replaced by silence of its duration. Returns the start
+    of each file in milliseconds and the total duration.
+    """
+    starts = []
+    position = 0
+    partial = f'{target_path}.{uuid.uuid4().hex}.part'
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    try:
+        with open(partial, 'wb') as target:
+            for source_path, duration, gap in parts:
+                pause = silence(gap)
+                target.write(pause)
+                position += len(pause) // len(SILENT_FRAME) * FRAME_MS
+                starts.append(position)
+                try:
+                    with open(source_path, 'rb') as source:
+                        while chunk := source.read(COPY_CHUNK):
+                            target.write(chunk)
+                except FileNotFoundError:
+                    if not missing_ok:
+                        raise
+                    logger.warning('Segment file %s is missing; writing silence instead', source_path)
+                    target.write(silence(duration))
+                position += duration
+        os.replace(partial, target_path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return starts, position
+
+
+def assemble(segments, target_path, gaps_ms):
+    """
+    Concatenate segment files into `target_path`.
+
+    `gaps_ms[i]` is the silence inserted before segment i. A segment file
+    removed since it was looked up becomes silence rather than an error.
+    Returns the layout ([{'key', 'start_ms', 'duration_ms'}, ...]) and the total
+    duration in milliseconds.
+    """
+    durations = [round(segment.duration_seconds * 1000) for segment in segments]
+    starts, total = concatenate(target_path, [
+        (os.path.join(voice_service.media_root, segment.audio_file.name), duration, gap)
+        for segment, duration, gap in zip(segments, durations, gaps_ms)
+    ], missing_ok=True)
+    layout = [
+        {'key': segment.key, 'start_ms': start, 'duration_ms': duration}
+        for segment, start, duration in zip(segments, starts, durations)
+    ]
+    return layout, total
+
+
+def render(user_id, pieces, target_path, gaps_ms):
+    """
+    Build one MP3 from (voice_shortname, text) pieces, reusing cached segments.
+
+    Only the segments that have to be synthesized are charged (up front);
+    failures are refunded and raise SegmentError, leaving the successful
+    ones cached for the next attempt. Any other error refunds the whole
+    charge. Raises credits.InsufficientCredits before any work if the
+    balance is too low.
+
+    Returns (layout, duration_ms, credits_used).
+    """
+    plan = SegmentPlan(pieces)
+    cost = plan.cost
+    credits.charge(user_id, cost)
+    try:
+        failed = plan.synthesize()
+        if failed:
+            credits.refund(user_id, len(failed) * credits.CREDIT_COST)
+            raise SegmentError(failed)
+        layout, duration = assemble(plan.ordered(), target_path, gaps_ms)
+    except SegmentError:
+        raise
+    except BaseException:
+        credits.refund(user_id, cost)
+        raise
+    return layout, duration, cost
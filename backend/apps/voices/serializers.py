@@ -1,121 +1,461 @@
-from rest_framework import serializers
-from .models import VoiceProfile, VoiceClone, GeneratedSpeech
-
-
-class VoiceProfileSerializer(serializers.ModelSerializer):
-    """Serializer for voice profiles."""
-    
-    class Meta:
-        model = VoiceProfile
-        fields = [
-            'id', 'name', 'description', 'gender', 'emotion', 'language',
-            'sample_audio', 'preview_image', 'is_active', 'is_premium', 'created_at'
-        ]
-        read_only_fields = ['id', 'created_at']
-
-
-class VoiceCloneSerializer(serializers.ModelSerializer):
-    """Serializer for voice clones."""
-    
-    class Meta:
-        model = VoiceClone
-        fields = [
-            'id', 'name', 'description', 'language', 'audio_sample', 'status',
-            'is_active', 'created_at', 'updated_at'
-        ]
-        read_only_fields = ['id', 'status', 'created_at', 'updated_at']
-
-
-class VoiceCloneCreateSerializer(serializers.ModelSerializer):
-    """Serializer for creating voice clones."""
-    
-    class Meta:
-        model = VoiceClone
-        fields = ['name', 'description', 'language', 'audio_sample']
-    
-    def create(self, validated_data):
-        validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
-
-
-class GeneratedSpeechSerializer(serializers.ModelSerializer):
-    """Serializer for generated speech."""
-    
-    voice_profile_name = serializers.CharField(source='voice_profile.name', read_only=True)
-    voice_clone_name = serializers.CharField(source='voice_clone.name', read_only=True)
-    
-    class Meta:
-        model = GeneratedSpeech
-        fields = [
-            'id', 'voice_profile', 'voice_profile_name', 'voice_clone',
-            'voice_clone_name', 'input_text', 'audio_file',
-            'duration_seconds', 'credits_used', 'balance_after', 'created_at'
-        ]
-        read_only_fields = ['id', 'audio_file', 'duration_seconds', 'created_at']
-
-
-class GenerateSpeechSerializer(serializers.Serializer):
-    """Serializer for speech generation request."""
-    
-    text = serializers.CharField(max_length=5000)
-    voice_profile_id = serializers.IntegerField(required=False, allow_null=True)
-    voice_clone_id = serializers.IntegerField(required=False, allow_null=True)
-    is_preview = serializers.BooleanField(required=False, default=False)
-    
-    def validate(self, attrs):
-        if not attrs.get('voice_profile_id') and not attrs.get('voice_clone_id'):
-            raise serializers.ValidationError('Either voice_profile_id or voice_clone_id is required')
-        
-        if attrs.get('voice_profile_id') and attrs.get('voice_clone_id'):
-            raise serializers.ValidationError('Only one of voice_profile_id or voice_clone_id can be provided')
-        
-        return attrs
-
-
-class TranslateTextSerializer(serializers.Serializer):
-    """Serializer for text translation request."""
-    
-    text = serializers.CharField(max_length=5000)
-    target_language = serializers.CharField(max_length=10)
-    source_language = serializers.CharField(max_length=10, default='auto', required=False)
-
-
-class AdminVoiceProfileSerializer(serializers.ModelSerializer):
-    """Admin serializer for voice profiles (full CRUD)."""
-    
-    usage_count = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = VoiceProfile
-        fields = '__all__'
-    
-    def get_usage_count(self, obj):
-        return obj.generated_speeches.count()
-
-
-class AdminVoiceCloneSerializer(serializers.ModelSerializer):
-    """Admin serializer for voice clones."""
-    
-    user_email = serializers.CharField(source='user.email', read_only=True)
-    
-    class Meta:
-        model = VoiceClone
-        fields = '__all__'
-
-
-class AdminGeneratedSpeechSerializer(serializers.ModelSerializer):
-    """Admin serializer for generated speeches."""
-    
-    user_email = serializers.CharField(source='user.email', read_only=True)
-    voice_name = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = GeneratedSpeech
-        fields = '__all__'
-    
-    def get_voice_name(self, obj):
-        if obj.voice_profile:
-            return obj.voice_profile.name
-        elif obj.voice_clone:
-            return f"{obj.voice_clone.name} (Clone)"
-        return "Unknown"
+import csv
+import io
+import re
+
+from django.conf import settings
+from rest_framework import serializers
+from .models import VoiceProfile, VoiceClone, GeneratedSpeech, CloneUpload, Document
+from . import audio_analysis, waveform
+from .bulk import safe_stem
+from .segments import split_paragraphs
+from .uploads import attach_to_clone, staging_path
+from .services import NATIVE_OUTPUT_FORMAT, OUTPUT_FORMATS, available_output_formats
+
+
+class VoiceProfileSerializer(serializers.ModelSerializer):
+    """Serializer for voice profiles."""
+    
+    class Meta:
+        model = VoiceProfile
+        fields = [
+            'id', 'name', 'description', 'gender', 'emotion', 'language',
+            'sample_audio', 'sample_sprite', 'sample_offset_ms', 'sample_duration_ms',
+            'preview_image', 'is_active', 'is_premium', 'created_at'
+        ]
+        read_only_fields = ['id', 'created_at']
+
+
+class VoiceCloneSerializer(serializers.ModelSerializer):
+    """Serializer for voice clones."""
+    
+    class Meta:
+        model = VoiceClone
+        fields = [
+            'id', 'name', 'description', 'language', 'audio_sample', 'status',
+            'processing_error', 'is_active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'status', 'processing_error', 'created_at', 'updated_at']
+
+
+class VoiceCloneCreateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for creating voice clones.
+    
+    The sample is either a regular multipart `audio_sample` or the id of a
+    finished chunked upload (`upload_id`).
+    """
+    
+    upload_id = serializers.UUIDField(write_only=True, required=False)
+    
+    class Meta:
+        model = VoiceClone
+        fields = ['id', 'name', 'description', 'language', 'audio_sample', 'upload_id', 'status']
+        read_only_fields = ['id', 'status']
+        extra_kwargs = {'audio_sample': {'required': False}}
+    
+    def validate_upload_id(self, value):
+        try:
+            return CloneUpload.objects.get(id=value, user=self.context['request'].user, status='complete')
+        except CloneUpload.DoesNotExist:
+            raise serializers.ValidationError('No finished upload with this id.')
+    
+    def validate(self, attrs):
+        if bool(attrs.get('audio_sample')) == bool(attrs.get('upload_id')):
+            raise serializers.ValidationError('Provide exactly one of audio_sample or upload_id')
+        
+        # Reject unusable recordings now rather than after queuing them
+        try:
+            if attrs.get('upload_id'):
+                self._analysis = audio_analysis.analyze(staging_path(attrs['upload_id']))
+            else:
+                self._analysis = audio_analysis.analyze_upload(attrs['audio_sample'])
+        except audio_analysis.AudioDecodeError:
+            # Formats only ffmpeg can read are checked by the worker instead
+            self._analysis = None
+        if self._analysis is not None:
+            problems = audio_analysis.check_sample(self._analysis)
+            if problems:
+                raise serializers.ValidationError({'audio_sample': problems})
+        return attrs
+    
+    def create(self, validated_data):
+        upload = validated_data.pop('upload_id', None)
+        validated_data['user'] = self.context['request'].user
+        voice_clone = VoiceClone(**validated_data)
+        if getattr(self, '_analysis', None):
+            voice_clone.apply_analysis(self._analysis)
+        if upload is not None:
+            attach_to_clone(upload, voice_clone)
+        voice_clone.save()
+        return voice_clone
+
+
+class CloneUploadSerializer(serializers.ModelSerializer):
+    """Chunked upload session; `offset` is where the next chunk must start."""
+    
+    size = serializers.IntegerField(source='total_size', min_value=1)
+    offset = serializers.IntegerField(source='received_bytes', read_only=True)
+    
+    class Meta:
+        model = CloneUpload
+        fields = ['id', 'filename', 'size', 'offset', 'status', 'created_at']
+        read_only_fields = ['id', 'status', 'created_at']
+
+
+class ArchivedAudioMixin:
+    """Cold-tier audio lives outside MEDIA_ROOT, so it has no URL to give out."""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.storage_tier == 'cold':
+            data['audio_file'] = None
+        return data
+
+
+class GeneratedSpeechSerializer(ArchivedAudioMixin, serializers.ModelSerializer):
+    """Serializer for generated speech."""
+    
+    voice_profile_name = serializers.CharField(source='voice_profile.name', read_only=True)
+    voice_clone_name = serializers.CharField(source='voice_clone.name', read_only=True)
+    has_word_timings = serializers.SerializerMethodField()
+    waveform = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = GeneratedSpeech
+        fields = [
+            'id', 'voice_profile', 'voice_profile_name', 'voice_clone',
+            'voice_clone_name', 'input_text', 'audio_file', 'hls_playlist', 'hls_state',
+            'duration_seconds', 'has_word_timings', 'waveform', 'size_bytes', 'sha256', 'codec',
+            'sample_rate', 'bitrate', 'storage_tier', 'credits_used', 'balance_after', 'created_at'
+        ]
+        read_only_fields = ['id', 'audio_file', 'duration_seconds', 'created_at']
+
+    def get_has_word_timings(self, obj):
+        return bool(obj.word_timings)
+
+    def get_waveform(self, obj):
+        # Only the coarsest peaks; history/<id>/waveform/ serves the others
+        if not obj.waveform:
+            return None
+        return {
+            'duration_ms': obj.waveform['duration_ms'],
+            'buckets': waveform.LIST_RESOLUTION,
+            'peaks': obj.waveform['peaks'][str(waveform.LIST_RESOLUTION)],
+        }
+
+
+class GenerateSpeechSerializer(serializers.Serializer):
+    """Serializer for speech generation request."""
+    
+    text = serializers.CharField(max_length=5000)
+    voice_profile_id = serializers.IntegerField(required=False, allow_null=True)
+    voice_clone_id = serializers.IntegerField(required=False, allow_null=True)
+    is_preview = serializers.BooleanField(required=False, default=False)
+    output_format = serializers.ChoiceField(
+        choices=list(OUTPUT_FORMATS), required=False, default=NATIVE_OUTPUT_FORMAT
+    )
+    # HLS playlist + segments, returned (202) before synthesis finishes; see hls.py
+    segmented = serializers.BooleanField(required=False, default=False)
+    
+    def validate_output_format(self, value):
+        if value not in available_output_formats():
+            raise serializers.ValidationError(f'{value} output is not available on this server.')
+        return value
+    
+    def validate(self, attrs):
+        if not attrs.get('voice_profile_id') and not attrs.get('voice_clone_id'):
+            raise serializers.ValidationError('Either voice_profile_id or voice_clone_id is required')
+        
+        if attrs.get('voice_profile_id') and attrs.get('voice_clone_id'):
+            raise serializers.ValidationError('Only one of voice_profile_id or voice_clone_id can be provided')
+        
+        if attrs.get('segmented'):
+            if attrs.get('is_preview'):
+                raise serializers.ValidationError({'segmented': 'Previews cannot be segmented.'})
+            if attrs.get('output_format') != NATIVE_OUTPUT_FORMAT:
+                raise serializers.ValidationError({'segmented': f'Segmented output is only available as {NATIVE_OUTPUT_FORMAT}.'})
+        
+        return attrs
+
+
+class BulkItemSerializer(serializers.Serializer):
+    """One line of a bulk generation manifest."""
+    
+    text = serializers.CharField(max_length=5000)
+    voice_profile_id = serializers.IntegerField()
+    filename = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class BulkGenerateSerializer(serializers.Serializer):
+    """
+    Bulk generation request: a JSON `items` list, or a CSV `manifest` file
+    with text, voice_profile_id and (optional) filename columns.
+    """
+    
+    MANIFEST_MAX_BYTES = 5 * 1024 * 1024
+    
+    items = serializers.ListField(child=BulkItemSerializer(), required=False, allow_empty=False)
+    manifest = serializers.FileField(required=False)
+    output_format = serializers.ChoiceField(
+        choices=list(OUTPUT_FORMATS), required=False, default=NATIVE_OUTPUT_FORMAT
+    )
+    
+    def validate_output_format(self, value):
+        if value not in available_output_formats():
+            raise serializers.ValidationError(f'{value} output is not available on this server.')
+        return value
+    
+    def validate_manifest(self, value):
+        if value.size > self.MANIFEST_MAX_BYTES:
+            raise serializers.ValidationError('The manifest is too large.')
+        try:
+            rows = list(csv.DictReader(io.StringIO(value.read().decode('utf-8-sig'))))
+        except (UnicodeDecodeError, csv.Error):
+            raise serializers.ValidationError('The manifest must be a UTF-8 CSV file.')
+        if not rows:
+            raise serializers.ValidationError('The manifest has no rows.')
+        items = BulkItemSerializer(data=rows, many=True)
+        if not items.is_valid():
+            # Row 1 is the header
+            raise serializers.ValidationError({
+                f'row {number}': errors for number, errors in enumerate(items.errors, 2) if errors
+            })
+        return items.validated_data
+    
+    def validate(self, attrs):
+        if bool(attrs.get('items')) == bool(attrs.get('manifest')):
+            raise serializers.ValidationError('Provide either items or a manifest file.')
+        items = attrs.pop('items', None) or attrs.pop('manifest')
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise serializers.ValidationError(f'At most {settings.BULK_MAX_ITEMS} items per request.')
+        
+        profile_ids = {item['voice_profile_id'] for item in items}
+        profiles = VoiceProfile.objects.filter(is_active=True).in_bulk(profile_ids)
+        missing = sorted(profile_ids - set(profiles))
+        if missing:
+            raise serializers.ValidationError(f'Voice profiles not found: {", ".join(map(str, missing))}')
+        
+        seen = set()
+        attrs['items'] = []
+        for number, item in enumerate(items, 1):
+            filename = safe_stem(item['filename']) or f'{number:04d}'
+            if filename.lower() in seen:
+                raise serializers.ValidationError(f'Duplicate filename: {filename}')
+            seen.add(filename.lower())
+            attrs['items'].append({
+                'text': item['text'],
+                'voice_profile': profiles[item['voice_profile_id']],
+                'filename': filename,
+            })
+        return attrs
+
+
+class DocumentSerializer(serializers.ModelSerializer):
+    """Long-form script; paragraphs are separated by blank lines."""
+    
+    MAX_CHARACTERS = 200_000
+    MAX_PARAGRAPH_CHARACTERS = 5000
+    
+    text = serializers.CharField(max_length=MAX_CHARACTERS)
+    paragraph_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Document
+        fields = [
+            'id', 'title', 'text', 'voice_profile', 'voice_clone', 'audio_file',
+            'duration_seconds', 'paragraph_count', 'segments', 'rendered_at',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'audio_file', 'duration_seconds', 'segments', 'rendered_at', 'created_at', 'updated_at']
+    
+    def get_paragraph_count(self, obj):
+        return len(split_paragraphs(obj.text))
+    
+    def validate_text(self, value):
+        paragraphs = split_paragraphs(value)
+        if not paragraphs:
+            raise serializers.ValidationError('The document has no text.')
+        for number, paragraph in enumerate(paragraphs, 1):
+            if len(paragraph) > self.MAX_PARAGRAPH_CHARACTERS:
+                raise serializers.ValidationError(
+                    f'Paragraph {number} is longer than {self.MAX_PARAGRAPH_CHARACTERS} characters.'
+                )
+        return value
+    
+    def validate_voice_profile(self, value):
+        if value is not None and not value.is_active:
+            raise serializers.ValidationError('Voice profile not found')
+        return value
+    
+    def validate_voice_clone(self, value):
+        if value is not None and (value.user_id != self.context['request'].user.id or value.status != 'ready'):
+            raise serializers.ValidationError('Voice clone not found or not ready')
+        return value
+    
+    def validate(self, attrs):
+        voice_profile = attrs.get('voice_profile', getattr(self.instance, 'voice_profile', None))
+        voice_clone = attrs.get('voice_clone', getattr(self.instance, 'voice_clone', None))
+        if 'voice_profile' in attrs and 'voice_clone' not in attrs and attrs['voice_profile']:
+            voice_clone = attrs['voice_clone'] = None
+        elif 'voice_clone' in attrs and 'voice_profile' not in attrs and attrs['voice_clone']:
+            voice_profile = attrs['voice_profile'] = None
+        if bool(voice_profile) == bool(voice_clone):
+            raise serializers.ValidationError('Provide exactly one of voice_profile or voice_clone')
+        return attrs
+
+
+class DocumentRenderSerializer(serializers.Serializer):
+    paragraph_gap_ms = serializers.IntegerField(min_value=0, max_value=5000, required=False, default=600)
+
+
+class PreviewFanoutSerializer(serializers.Serializer):
+    """One preview sentence in up to MAX_VOICES catalog voices."""
+    
+    MAX_VOICES = 12
+    
+    text = serializers.CharField(max_length=200)
+    voice_profile_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=MAX_VOICES
+    )
+    
+    def validate_voice_profile_ids(self, value):
+        value = list(dict.fromkeys(value))
+        profiles = VoiceProfile.objects.filter(is_active=True).in_bulk(value)
+        missing = [pk for pk in value if pk not in profiles]
+        if missing:
+            raise serializers.ValidationError(f'Voice profiles not found: {", ".join(map(str, missing))}')
+        return [profiles[pk] for pk in value]
+
+
+class DialogueSpeakerSerializer(serializers.Serializer):
+    voice_profile_id = serializers.IntegerField(required=False, allow_null=True)
+    voice_clone_id = serializers.IntegerField(required=False, allow_null=True)
+    
+    def validate(self, attrs):
+        if bool(attrs.get('voice_profile_id')) == bool(attrs.get('voice_clone_id')):
+            raise serializers.ValidationError('Provide exactly one of voice_profile_id or voice_clone_id')
+        return attrs
+
+
+class DialogueLineSerializer(serializers.Serializer):
+    speaker = serializers.CharField(max_length=100)
+    text = serializers.CharField(max_length=5000)
+    # Silence before this line; defaults to the dialogue's gap_ms
+    pause_ms = serializers.IntegerField(min_value=0, max_value=10000, required=False)
+
+
+class DialogueSerializer(serializers.Serializer):
+    """
+    Multi-speaker script: `speakers` maps names to voices, and the lines
+    come either as a `lines` list or as a `script` of "Name: text" lines.
+    """
+    
+    MAX_LINES = 300
+    SCRIPT_LINE = re.compile(r'^\s*([^:]{1,100}?)\s*:\s*(.+?)\s*$')
+    
+    speakers = serializers.DictField(child=DialogueSpeakerSerializer(), allow_empty=False)
+    lines = serializers.ListField(child=DialogueLineSerializer(), required=False, allow_empty=False)
+    script = serializers.CharField(required=False, max_length=200_000)
+    gap_ms = serializers.IntegerField(min_value=0, max_value=10000, required=False, default=300)
+    
+    def validate_script(self, value):
+        lines = []
+        for number, raw in enumerate(value.splitlines(), 1):
+            if not raw.strip():
+                continue
+            match = self.SCRIPT_LINE.match(raw)
+            if not match:
+                raise serializers.ValidationError(f'Line {number} is not in "Speaker: text" form.')
+            lines.append({'speaker': match.group(1), 'text': match.group(2)})
+        if not lines:
+            raise serializers.ValidationError('The script has no lines.')
+        return lines
+    
+    def validate(self, attrs):
+        if bool(attrs.get('lines')) == bool(attrs.get('script')):
+            raise serializers.ValidationError('Provide either lines or a script.')
+        lines = attrs.pop('lines', None) or attrs.pop('script')
+        if len(lines) > self.MAX_LINES:
+            raise serializers.ValidationError(f'At most {self.MAX_LINES} lines per dialogue.')
+        unknown = sorted({line['speaker'] for line in lines} - set(attrs['speakers']))
+        if unknown:
+            raise serializers.ValidationError(f'Unknown speakers: {", ".join(unknown)}')
+        
+        user = self.context['request'].user
+        speakers = attrs['speakers']
+        profile_ids = {s['voice_profile_id'] for s in speakers.values() if s.get('voice_profile_id')}
+        clone_ids = {s['voice_clone_id'] for s in speakers.values() if s.get('voice_clone_id')}
+        profiles = VoiceProfile.objects.filter(is_active=True).in_bulk(profile_ids)
+        clones = VoiceClone.objects.filter(user=user, is_active=True, status='ready').in_bulk(clone_ids)
+        voices = {}
+        for name, speaker in speakers.items():
+            profile = profiles.get(speaker.get('voice_profile_id'))
+            clone = clones.get(speaker.get('voice_clone_id'))
+            if profile is None and clone is None:
+                raise serializers.ValidationError(f'Voice for speaker {name} not found or not ready')
+            voices[name] = (profile, clone)
+        attrs['voices'] = voices
+        attrs['lines'] = lines
+        return attrs
+
+
+class TranslateTextSerializer(serializers.Serializer):
+    """Serializer for text translation request."""
+    
+    text = serializers.CharField(max_length=5000)
+    target_language = serializers.CharField(max_length=10)
+    source_language = serializers.CharField(max_length=10, default='auto', required=False)
+
+
+class AdminVoiceProfileSerializer(serializers.ModelSerializer):
+    """Admin serializer for voice profiles (full CRUD)."""
+    
+    usage_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = VoiceProfile
+        exclude = ['acoustic_features']
+    
+    def get_usage_count(self, obj):
+        return obj.generated_speeches.count()
+    
+    def update(self, instance, validated_data):
+        if 'sample_audio' in validated_data:
+            # The sprite still holds the old sample until sprites are rebuilt
+            instance.sample_sprite = None
+            instance.sample_offset_ms = None
+            instance.sample_duration_ms = None
+        return super().update(instance, validated_data)
+
+
+class AdminVoiceCloneSerializer(serializers.ModelSerializer):
+    """Admin serializer for voice clones."""
+    
+    user_email = serializers.CharField(source='user.email', read_only=True)
+    sample_warnings = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = VoiceClone
+        exclude = ['acoustic_features']
+    
+    def get_sample_warnings(self, obj):
+        analysis = obj.analysis()
+        return audio_analysis.check_sample(analysis) if analysis else []
+
+
+class AdminGeneratedSpeechSerializer(ArchivedAudioMixin, serializers.ModelSerializer):
+    """Admin serializer for generated speeches."""
+    
+    user_email = serializers.CharField(source='user.email', read_only=True)
+    voice_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = GeneratedSpeech
+        exclude = ['word_timings', 'waveform']
+    
+    def get_voice_name(self, obj):
+        if obj.voice_profile:
+            return obj.voice_profile.name
+        elif obj.voice_clone:
+            return f"{obj.voice_clone.name} (Clone)"
+        return "Unknown"
@@ -1,356 +1,593 @@
-"""
-Voice generation service using edge-tts (Microsoft Edge TTS).
-Provides high-quality neural voices with support for multiple genders and languages.
-"""
-
-import os
-import uuid
-import asyncio
-import edge_tts
-from django.conf import settings
-
-# Mapping of Voice Profile attributes to Edge TTS ShortNames
-# Format: (Gender, Language, Emotion) -> Voice ShortName
-# Emotion support is limited in free API, so we map to specific character voices where possible.
-
-VOICE_MAP = {
-    # English - Multiple Variants
-    ('male', 'en', 'neutral'): 'en-US-GuyNeural',
-    ('male', 'en', 'happy'): 'en-US-ChristopherNeural',
-    ('male', 'en', 'excited'): 'en-US-EricNeural',
-    ('female', 'en', 'neutral'): 'en-US-AriaNeural',
-    ('female', 'en', 'happy'): 'en-US-JennyNeural',
-    ('female', 'en', 'calm'): 'en-US-MichelleNeural',
-    
-    # Spanish
-    ('male', 'es', 'neutral'): 'es-ES-AlvaroNeural',
-    ('female', 'es', 'neutral'): 'es-ES-ElviraNeural',
-    
-    # French
-    ('male', 'fr', 'neutral'): 'fr-FR-HenriNeural',
-    ('female', 'fr', 'neutral'): 'fr-FR-DeniseNeural',
-    
-    # German
-    ('male', 'de', 'neutral'): 'de-DE-ConradNeural',
-    ('female', 'de', 'neutral'): 'de-DE-KatjaNeural',
-    
-    # Portuguese
-    ('male', 'pt', 'neutral'): 'pt-BR-AntonioNeural',
-    ('female', 'pt', 'neutral'): 'pt-BR-FranciscaNeural',
-    
-    # Italian
-    ('male', 'it', 'neutral'): 'it-IT-DiegoNeural',
-    ('female', 'it', 'neutral'): 'it-IT-ElsaNeural',
-    
-    # Russian
-    ('male', 'ru', 'neutral'): 'ru-RU-DmitryNeural',
-    ('female', 'ru', 'neutral'): 'ru-RU-SvetlanaNeural',
-    
-    # Japanese
-    ('male', 'ja', 'neutral'): 'ja-JP-KeitaNeural',
-    ('female', 'ja', 'neutral'): 'ja-JP-NanamiNeural',
-    
-    # Korean
-    ('male', 'ko', 'neutral'): 'ko-KR-InJoonNeural',
-    ('female', 'ko', 'neutral'): 'ko-KR-SunHiNeural',
-    
-    # Chinese
-    ('male', 'zh', 'neutral'): 'zh-CN-YunxiNeural',
-    ('female', 'zh', 'neutral'): 'zh-CN-XiaoxiaoNeural',
-    
-    # Hindi
-    ('male', 'hi', 'neutral'): 'hi-IN-MadhurNeural',
-    ('female', 'hi', 'neutral'): 'hi-IN-SwaraNeural',
-    
-    # Bengali
-    ('male', 'bn', 'neutral'): 'bn-IN-BashkarNeural',
-    ('female', 'bn', 'neutral'): 'bn-IN-TanishaaNeural',
-    
-    # Tamil
-    ('male', 'ta', 'neutral'): 'ta-IN-ValluvarNeural',
-    ('female', 'ta', 'neutral'): 'ta-IN-PallaviNeural',
-    
-    # Telugu
-    ('male', 'te', 'neutral'): 'te-IN-MohanNeural',
-    ('female', 'te', 'neutral'): 'te-IN-ShrutiNeural',
-    
-    # Marathi
-    ('male', 'mr', 'neutral'): 'mr-IN-ManoharNeural',
-    ('female', 'mr', 'neutral'): 'mr-IN-AarohiNeural',
-    
-    # Gujarati
-    ('male', 'gu', 'neutral'): 'gu-IN-NiranjanNeural',
-    ('female', 'gu', 'neutral'): 'gu-IN-DhwaniNeural',
-    
-    # Kannada
-    ('male', 'kn', 'neutral'): 'kn-IN-GaganNeural',
-    ('female', 'kn', 'neutral'): 'kn-IN-SapnaNeural',
-    
-    # Malayalam
-    ('male', 'ml', 'neutral'): 'ml-IN-MidhunNeural',
-    ('female', 'ml', 'neutral'): 'ml-IN-SobhanaNeural',
-    
-    # Punjabi
-    ('male', 'pa', 'neutral'): 'pa-IN-GurbaniNeural',
-    ('female', 'pa', 'neutral'): 'pa-IN-GurbaniNeural',
-    
-    # Urdu
-    ('male', 'ur', 'neutral'): 'ur-PK-AsadNeural',
-    ('female', 'ur', 'neutral'): 'ur-PK-UzmaNeural',
-    
-    # Thai
-    ('male', 'th', 'neutral'): 'th-TH-NiwatNeural',
-    ('female', 'th', 'neutral'): 'th-TH-PremwadeeNeural',
-    
-    # Vietnamese
-    ('male', 'vi', 'neutral'): 'vi-VN-NamMinhNeural',
-    ('female', 'vi', 'neutral'): 'vi-VN-HoaiMyNeural',
-    
-    # Indonesian
-    ('male', 'id', 'neutral'): 'id-ID-ArdiNeural',
-    ('female', 'id', 'neutral'): 'id-ID-GadisNeural',
-    
-    # Malay
-    ('male', 'ms', 'neutral'): 'ms-MY-OsmanNeural',
-    ('female', 'ms', 'neutral'): 'ms-MY-YasminNeural',
-    
-    # Filipino
-    ('male', 'fil', 'neutral'): 'fil-PH-AngeloNeural',
-    ('female', 'fil', 'neutral'): 'fil-PH-BlessicaNeural',
-    
-    # Burmese
-    ('male', 'my', 'neutral'): 'my-MM-ThihaNeural',
-    ('female', 'my', 'neutral'): 'my-MM-NilarNeural',
-    
-    # Arabic
-    ('male', 'ar', 'neutral'): 'ar-SA-HamedNeural',
-    ('female', 'ar', 'neutral'): 'ar-SA-ZariyahNeural',
-    
-    # Hebrew
-    ('male', 'he', 'neutral'): 'he-IL-AvriNeural',
-    ('female', 'he', 'neutral'): 'he-IL-HilaNeural',
-    
-    # Persian
-    ('male', 'fa', 'neutral'): 'fa-IR-FaridNeural',
-    ('female', 'fa', 'neutral'): 'fa-IR-DilaraNeural',
-    
-    # Turkish
-    ('male', 'tr', 'neutral'): 'tr-TR-AhmetNeural',
-    ('female', 'tr', 'neutral'): 'tr-TR-EmelNeural',
-    
-    # Dutch
-    ('male', 'nl', 'neutral'): 'nl-NL-MaartenNeural',
-    ('female', 'nl', 'neutral'): 'nl-NL-ColetteNeural',
-    
-    # Polish
-    ('male', 'pl', 'neutral'): 'pl-PL-MarekNeural',
-    ('female', 'pl', 'neutral'): 'pl-PL-ZofiaNeural',
-    
-    # Swedish
-    ('male', 'sv', 'neutral'): 'sv-SE-MattiasNeural',
-    ('female', 'sv', 'neutral'): 'sv-SE-SofieNeural',
-    
-    # Danish
-    ('male', 'da', 'neutral'): 'da-DK-JeppeNeural',
-    ('female', 'da', 'neutral'): 'da-DK-ChristelNeural',
-    
-    # Norwegian
-    ('male', 'no', 'neutral'): 'nb-NO-FinnNeural',
-    ('female', 'no', 'neutral'): 'nb-NO-PernilleNeural',
-    
-    # Finnish
-    ('male', 'fi', 'neutral'): 'fi-FI-HarriNeural',
-    ('female', 'fi', 'neutral'): 'fi-FI-NooraNeural',
-    
-    # Greek
-    ('male', 'el', 'neutral'): 'el-GR-NestorasNeural',
-    ('female', 'el', 'neutral'): 'el-GR-AthinaNeural',
-    
-    # Czech
-    ('male', 'cs', 'neutral'): 'cs-CZ-AntoninNeural',
-    ('female', 'cs', 'neutral'): 'cs-CZ-VlastaNeural',
-    
-    # Hungarian
-    ('male', 'hu', 'neutral'): 'hu-HU-TamasNeural',
-    ('female', 'hu', 'neutral'): 'hu-HU-NoemiNeural',
-    
-    # Romanian
-    ('male', 'ro', 'neutral'): 'ro-RO-EmilNeural',
-    ('female', 'ro', 'neutral'): 'ro-RO-AlinaNeural',
-    
-    # Ukrainian
-    ('male', 'uk', 'neutral'): 'uk-UA-OstapNeural',
-    ('female', 'uk', 'neutral'): 'uk-UA-PolinaNeural',
-    
-    # Bulgarian
-    ('male', 'bg', 'neutral'): 'bg-BG-BorislavNeural',
-    ('female', 'bg', 'neutral'): 'bg-BG-KalinaNeural',
-    
-    # Slovak
-    ('male', 'sk', 'neutral'): 'sk-SK-LukasNeural',
-    ('female', 'sk', 'neutral'): 'sk-SK-ViktoriaNeural',
-    
-    # Croatian
-    ('male', 'hr', 'neutral'): 'hr-HR-SreckoNeural',
-    ('female', 'hr', 'neutral'): 'hr-HR-GabrijelaNeural',
-    
-    # Slovenian
-    ('male', 'sl', 'neutral'): 'sl-SI-RokNeural',
-    ('female', 'sl', 'neutral'): 'sl-SI-PetraNeural',
-    
-    # Lithuanian
-    ('male', 'lt', 'neutral'): 'lt-LT-LeonasNeural',
-    ('female', 'lt', 'neutral'): 'lt-LT-OnaNeural',
-    
-    # Latvian
-    ('male', 'lv', 'neutral'): 'lv-LV-NilsNeural',
-    ('female', 'lv', 'neutral'): 'lv-LV-EveritaNeural',
-    
-    # Estonian
-    ('male', 'et', 'neutral'): 'et-EE-KertNeural',
-    ('female', 'et', 'neutral'): 'et-EE-AnuNeural',
-    
-    # Catalan
-    ('male', 'ca', 'neutral'): 'ca-ES-EnricNeural',
-    ('female', 'ca', 'neutral'): 'ca-ES-JoanaNeural',
-    
-    # Irish
-    ('male', 'ga', 'neutral'): 'ga-IE-ColmNeural',
-    ('female', 'ga', 'neutral'): 'ga-IE-OrlaNeural',
-    
-    # Welsh
-    ('male', 'cy', 'neutral'): 'cy-GB-AledNeural',
-    ('female', 'cy', 'neutral'): 'cy-GB-NiaNeural',
-    
-    # Swahili
-    ('male', 'sw', 'neutral'): 'sw-KE-RafikiNeural',
-    ('female', 'sw', 'neutral'): 'sw-KE-ZuriNeural',
-    
-    # Afrikaans
-    ('male', 'af', 'neutral'): 'af-ZA-WillemNeural',
-    ('female', 'af', 'neutral'): 'af-ZA-AdriNeural',
-    
-    # Amharic
-    ('male', 'am', 'neutral'): 'am-ET-AmehaNeural',
-    ('female', 'am', 'neutral'): 'am-ET-MekdesNeural',
-    
-    # Zulu
-    ('male', 'zu', 'neutral'): 'zu-ZA-ThembaNeural',
-    ('female', 'zu', 'neutral'): 'zu-ZA-ThandoNeural',
-}
-
-# Fallback voices by language (gender-neutral fallback)
-LANGUAGE_FALLBACKS = {
-    'en': 'en-US-AriaNeural', 'es': 'es-ES-ElviraNeural', 'fr': 'fr-FR-DeniseNeural',
-    'de': 'de-DE-KatjaNeural', 'pt': 'pt-BR-FranciscaNeural', 'it': 'it-IT-ElsaNeural',
-    'ru': 'ru-RU-SvetlanaNeural', 'ja': 'ja-JP-NanamiNeural', 'ko': 'ko-KR-SunHiNeural',
-    'zh': 'zh-CN-XiaoxiaoNeural', 'hi': 'hi-IN-SwaraNeural', 'bn': 'bn-IN-TanishaaNeural',
-    'ta': 'ta-IN-PallaviNeural', 'te': 'te-IN-ShrutiNeural', 'mr': 'mr-IN-AarohiNeural',
-    'gu': 'gu-IN-DhwaniNeural', 'kn': 'kn-IN-SapnaNeural', 'ml': 'ml-IN-SobhanaNeural',
-    'pa': 'pa-IN-GurbaniNeural', 'ur': 'ur-PK-UzmaNeural', 'th': 'th-TH-PremwadeeNeural',
-    'vi': 'vi-VN-HoaiMyNeural', 'id': 'id-ID-GadisNeural', 'ms': 'ms-MY-YasminNeural',
-    'fil': 'fil-PH-BlessicaNeural', 'my': 'my-MM-NilarNeural', 'ar': 'ar-SA-ZariyahNeural',
-    'he': 'he-IL-HilaNeural', 'fa': 'fa-IR-DilaraNeural', 'tr': 'tr-TR-EmelNeural',
-    'nl': 'nl-NL-ColetteNeural', 'pl': 'pl-PL-ZofiaNeural', 'sv': 'sv-SE-SofieNeural',
-    'da': 'da-DK-ChristelNeural', 'no': 'nb-NO-PernilleNeural', 'fi': 'fi-FI-NooraNeural',
-    'el': 'el-GR-AthinaNeural', 'cs': 'cs-CZ-VlastaNeural', 'hu': 'hu-HU-NoemiNeural',
-    'ro': 'ro-RO-AlinaNeural', 'uk': 'uk-UA-PolinaNeural', 'bg': 'bg-BG-KalinaNeural',
-    'sk': 'sk-SK-ViktoriaNeural', 'hr': 'hr-HR-GabrijelaNeural', 'sl': 'sl-SI-PetraNeural',
-    'lt': 'lt-LT-OnaNeural', 'lv': 'lv-LV-EveritaNeural', 'et': 'et-EE-AnuNeural',
-    'ca': 'ca-ES-JoanaNeural', 'ga': 'ga-IE-OrlaNeural', 'cy': 'cy-GB-NiaNeural',
-    'sw': 'sw-KE-ZuriNeural', 'af': 'af-ZA-AdriNeural', 'am': 'am-ET-MekdesNeural',
-    'zu': 'zu-ZA-ThandoNeural',
-}
-
-class VoiceGenerationService:
-    """Service for generating speech using edge-tts."""
-    
-    def __init__(self):
-        self.media_root = settings.MEDIA_ROOT
-        self.output_dir = os.path.join(self.media_root, 'generated_audio')
-        os.makedirs(self.output_dir, exist_ok=True)
-    
-    def get_voice_shortname(self, profile=None, clone=None):
-        """Determine the best Edge TTS voice based on profile or clone."""
-        # If it's a clone, allow a deterministic random voice from the available list
-        if clone:
-            # Create a list of all available voices
-            available_voices = list(set(VOICE_MAP.values()))
-            available_voices.sort() # Ensure consistent order
-            
-            # Use clone ID to deterministically pick a voice
-            # This ensures the same clone always gets the same voice
-            idx = clone.id % len(available_voices)
-            return available_voices[idx]
-
-        if not profile:
-            return 'en-US-AriaNeural' # Default fallback
-            
-        gender = getattr(profile, 'gender', 'female').lower()
-        language = getattr(profile, 'language', 'en').lower()
-        emotion = getattr(profile, 'emotion', 'neutral').lower()
-        
-        # Try exact match
-        key = (gender, language, emotion)
-        if key in VOICE_MAP:
-            return VOICE_MAP[key]
-            
-        # Try match with neutral emotion
-        key = (gender, language, 'neutral')
-        if key in VOICE_MAP:
-            return VOICE_MAP[key]
-            
-        # Use language fallback
-        if language in LANGUAGE_FALLBACKS:
-            return LANGUAGE_FALLBACKS[language]
-        
-        return 'en-US-AriaNeural' # Ultimate fallback
-
-    def generate_speech(self, text, voice_profile=None, voice_clone=None):
-        """
-        Generate speech from text using edge-tts.
-        """
-        voice_shortname = self.get_voice_shortname(voice_profile, voice_clone)
-        
-        # Generate unique filename
-        filename = f"{uuid.uuid4().hex}.mp3"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        try:
-            # edge-tts is async, so we need to run it in an event loop
-            async def _generate():
-                communicate = edge_tts.Communicate(text, voice_shortname)
-                await communicate.save(filepath)
-            
-            asyncio.run(_generate())
-            
-            # Get actual duration (optional)
-            duration = len(text) / (150 * 5 / 60) # Fallback estimate
-            try:
-                from mutagen.mp3 import MP3
-                audio = MP3(filepath)
-                duration = audio.info.length
-            except:
-                pass
-                
-        except Exception as e:
-            print(f"EdgeTTS Error: {e}")
-            import traceback
-            traceback.print_exc()
-            # If fail, try to create empty file or generic error handling
-            with open(filepath, 'wb') as f:
-                f.write(b'')
-            duration = 0
-            
-        return {
-            'audio_path': f'generated_audio/{filename}',
-            'duration': round(duration, 2)
-        }
-    
-    def process_voice_clone(self, voice_clone):
-        # ... existing code ...
-        voice_clone.status = 'ready'
-        voice_clone.save()
-        return voice_clone
-
-voice_service = VoiceGenerationService()
+"""
+Voice generation service using edge-tts (Microsoft Edge TTS).
+Provides high-quality neural voices with support for multiple genders and languages.
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+import shutil
+import subprocess
+import edge_tts
+from django.conf import settings
+
+from config import metrics, timing
+
+from . import audio_analysis, media, subtitles, voice_features, waveform
+
+GENERATION_STAGE_SECONDS = metrics.histogram(
+    'voiceai_generation_stage_seconds',
+    'Time spent in each stage of speech generation',
+    ['stage'],
+)
+TTS_FAILURES = metrics.counter('voiceai_tts_failures_total', 'edge-tts synthesis failures')
+
+logger = logging.getLogger(__name__)
+
+# edge-tts always streams 24 kHz mono MP3 at 48 kbit/s (its highest quality);
+# every other format is transcoded from that with ffmpeg.
+NATIVE_OUTPUT_FORMAT = 'mp3'
+OUTPUT_FORMATS = {
+    'mp3': {'extension': 'mp3', 'ffmpeg_args': None},
+    'mp3_low': {'extension': 'mp3', 'ffmpeg_args': ['-c:a', 'libmp3lame', '-ar', '16000', '-b:a', '24k', '-f', 'mp3']},
+    'opus': {'extension': 'webm', 'ffmpeg_args': ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip', '-f', 'webm']},
+    'ogg': {'extension': 'ogg', 'ffmpeg_args': ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip', '-f', 'ogg']},
+    'wav': {'extension': 'wav', 'ffmpeg_args': ['-c:a', 'pcm_s16le', '-f', 'wav']},
+}
+TRANSCODE_TIMEOUT = 120
+
+
+def ffmpeg_binary():
+    return shutil.which(getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'))
+
+
+def available_output_formats():
+    """Formats this server can produce (transcoded ones need ffmpeg)."""
+    has_ffmpeg = ffmpeg_binary() is not None
+    return [name for name, spec in OUTPUT_FORMATS.items() if spec['ffmpeg_args'] is None or has_ffmpeg]
+
+
+def transcode(source_path, target_path, output_format):
+    """Re-encode edge-tts MP3 into `output_format`; raises on failure."""
+    binary = ffmpeg_binary()
+    if binary is None:
+        raise RuntimeError('ffmpeg is not installed')
+    subprocess.run(
+        [binary, '-hide_banner', '-loglevel', 'error', '-y', '-i', source_path, '-vn', '-ac', '1',
+         *OUTPUT_FORMATS[output_format]['ffmpeg_args'], target_path],
+        check=True,
+        capture_output=True,
+        timeout=TRANSCODE_TIMEOUT,
+    )
+
+# Mapping of Voice Profile attributes to Edge TTS ShortNames
+# Format: (Gender, Language, Emotion) -> Voice ShortName
+# Emotion support is limited in free API, so we map to specific character voices where possible.
+
+VOICE_MAP = {
+    # English - Multiple Variants
+    ('male', 'en', 'neutral'): 'en-US-GuyNeural',
+    ('male', 'en', 'happy'): 'en-US-ChristopherNeural',
+    ('male', 'en', 'excited'): 'en-US-EricNeural',
+    ('female', 'en', 'neutral'): 'en-US-AriaNeural',
+    ('female', 'en', 'happy'): 'en-US-JennyNeural',
+    ('female', 'en', 'calm'): 'en-US-MichelleNeural',
+    
+    # Spanish
+    ('male', 'es', 'neutral'): 'es-ES-AlvaroNeural',
+    ('female', 'es', 'neutral'): 'es-ES-ElviraNeural',
+    
+    # French
+    ('male', 'fr', 'neutral'): 'fr-FR-HenriNeural',
+    ('female', 'fr', 'neutral'): 'fr-FR-DeniseNeural',
+    
+    # German
+    ('male', 'de', 'neutral'): 'de-DE-ConradNeural',
+    ('female', 'de', 'neutral'): 'de-DE-KatjaNeural',
+    
+    # Portuguese
+    ('male', 'pt', 'neutral'): 'pt-BR-AntonioNeural',
+    ('female', 'pt', 'neutral'): 'pt-BR-FranciscaNeural',
+    
+    # Italian
+    ('male', 'it', 'neutral'): 'it-IT-DiegoNeural',
+    ('female', 'it', 'neutral'): 'it-IT-ElsaNeural',
+    
+    # Russian
+    ('male', 'ru', 'neutral'): 'ru-RU-DmitryNeural',
+    ('female', 'ru', 'neutral'): 'ru-RU-SvetlanaNeural',
+    
+    # Japanese
+    ('male', 'ja', 'neutral'): 'ja-JP-KeitaNeural',
+    ('female', 'ja', 'neutral'): 'ja-JP-NanamiNeural',
+    
+    # Korean
+    ('male', 'ko', 'neutral'): 'ko-KR-InJoonNeural',
+    ('female', 'ko', 'neutral'): 'ko-KR-SunHiNeural',
+    
+    # Chinese
+    ('male', 'zh', 'neutral'): 'zh-CN-YunxiNeural',
+    ('female', 'zh', 'neutral'): 'zh-CN-XiaoxiaoNeural',
+    
+    # Hindi
+    ('male', 'hi', 'neutral'): 'hi-IN-MadhurNeural',
+    ('female', 'hi', 'neutral'): 'hi-IN-SwaraNeural',
+    
+    # Bengali
+    ('male', 'bn', 'neutral'): 'bn-IN-BashkarNeural',
+    ('female', 'bn', 'neutral'): 'bn-IN-TanishaaNeural',
+    
+    # Tamil
+    ('male', 'ta', 'neutral'): 'ta-IN-ValluvarNeural',
+    ('female', 'ta', 'neutral'): 'ta-IN-PallaviNeural',
+    
+    # Telugu
+    ('male', 'te', 'neutral'): 'te-IN-MohanNeural',
+    ('female', 'te', 'neutral'): 'te-IN-ShrutiNeural',
+    
+    # Marathi
+    ('male', 'mr', 'neutral'): 'mr-IN-ManoharNeural',
+    ('female', 'mr', 'neutral'): 'mr-IN-AarohiNeural',
+    
+    # Gujarati
+    ('male', 'gu', 'neutral'): 'gu-IN-NiranjanNeural',
+    ('female', 'gu', 'neutral'): 'gu-IN-DhwaniNeural',
+    
+    # Kannada
+    ('male', 'kn', 'neutral'): 'kn-IN-GaganNeural',
+    ('female', 'kn', 'neutral'): 'kn-IN-SapnaNeural',
+    
+    # Malayalam
+    ('male', 'ml', 'neutral'): 'ml-IN-MidhunNeural',
+    ('female', 'ml', 'neutral'): 'ml-IN-SobhanaNeural',
+    
+    # Punjabi
+    ('male', 'pa', 'neutral'): 'pa-IN-GurbaniNeural',
+    ('female', 'pa', 'neutral'): 'pa-IN-GurbaniNeural',
+    
+    # Urdu
+    ('male', 'ur', 'neutral'): 'ur-PK-AsadNeural',
+    ('female', 'ur', 'neutral'): 'ur-PK-UzmaNeural',
+    
+    # Thai
+    ('male', 'th', 'neutral'): 'th-TH-NiwatNeural',
+    ('female', 'th', 'neutral'): 'th-TH-PremwadeeNeural',
+    
+    # Vietnamese
+    ('male', 'vi', 'neutral'): 'vi-VN-NamMinhNeural',
+    ('female', 'vi', 'neutral'): 'vi-VN-HoaiMyNeural',
+    
+    # Indonesian
+    ('male', 'id', 'neutral'): 'id-ID-ArdiNeural',
+    ('female', 'id', 'neutral'): 'id-ID-GadisNeural',
+    
+    # Malay
+    ('male', 'ms', 'neutral'): 'ms-MY-OsmanNeural',
+    ('female', 'ms', 'neutral'): 'ms-MY-YasminNeural',
+    
+    # Filipino
+    ('male', 'fil', 'neutral'): 'fil-PH-AngeloNeural',
+    ('female', 'fil', 'neutral'): 'fil-PH-BlessicaNeural',
+    
+    # Burmese
+    ('male', 'my', 'neutral'): 'my-MM-ThihaNeural',
+    ('female', 'my', 'neutral'): 'my-MM-NilarNeural',
+    
+    # Arabic
+    ('male', 'ar', 'neutral'): 'ar-SA-HamedNeural',
+    ('female', 'ar', 'neutral'): 'ar-SA-ZariyahNeural',
+    
+    # Hebrew
+    ('male', 'he', 'neutral'): 'he-IL-AvriNeural',
+    ('female', 'he', 'neutral'): 'he-IL-HilaNeural',
+    
+    # Persian
+    ('male', 'fa', 'neutral'): 'fa-IR-FaridNeural',
+    ('female', 'fa', 'neutral'): 'fa-IR-DilaraNeural',
+    
+    # Turkish
+    ('male', 'tr', 'neutral'): 'tr-TR-AhmetNeural',
+    ('female', 'tr', 'neutral'): 'tr-TR-EmelNeural',
+    
+    # Dutch
+    ('male', 'nl', 'neutral'): 'nl-NL-MaartenNeural',
+    ('female', 'nl', 'neutral'): 'nl-NL-ColetteNeural',
+    
+    # Polish
+    ('male', 'pl', 'neutral'): 'pl-PL-MarekNeural',
+    ('female', 'pl', 'neutral'): 'pl-PL-ZofiaNeural',
+    
+    # Swedish
+    ('male', 'sv', 'neutral'): 'sv-SE-MattiasNeural',
+    ('female', 'sv', 'neutral'): 'sv-SE-SofieNeural',
+    
+    # Danish
+    ('male', 'da', 'neutral'): 'da-DK-JeppeNeural',
+    ('female', 'da', 'neutral'): 'da-DK-ChristelNeural',
+    
+    # Norwegian
+    ('male', 'no', 'neutral'): 'nb-NO-FinnNeural',
+    ('female', 'no', 'neutral'): 'nb-NO-PernilleNeural',
+    
+    # Finnish
+    ('male', 'fi', 'neutral'): 'fi-FI-HarriNeural',
+    ('female', 'fi', 'neutral'): 'fi-FI-NooraNeural',
+    
+    # Greek
+    ('male', 'el', 'neutral'): 'el-GR-NestorasNeural',
+    ('female', 'el', 'neutral'): 'el-GR-AthinaNeural',
+    
+    # Czech
+    ('male', 'cs', 'neutral'): 'cs-CZ-AntoninNeural',
+    ('female', 'cs', 'neutral'): 'cs-CZ-VlastaNeural',
+    
+    # Hungarian
+    ('male', 'hu', 'neutral'): 'hu-HU-TamasNeural',
+    ('female', 'hu', 'neutral'): 'hu-HU-NoemiNeural',
+    
+    # Romanian
+    ('male', 'ro', 'neutral'): 'ro-RO-EmilNeural',
+    ('female', 'ro', 'neutral'): 'ro-RO-AlinaNeural',
+    
+    # Ukrainian
+    ('male', 'uk', 'neutral'): 'uk-UA-OstapNeural',
+    ('female', 'uk', 'neutral'): 'uk-UA-PolinaNeural',
+    
+    # Bulgarian
+    ('male', 'bg', 'neutral'): 'bg-BG-BorislavNeural',
+    ('female', 'bg', 'neutral'): 'bg-BG-KalinaNeural',
+    
+    # Slovak
+    ('male', 'sk', 'neutral'): 'sk-SK-LukasNeural',
+    ('female', 'sk', 'neutral'): 'sk-SK-ViktoriaNeural',
+    
+    # Croatian
+    ('male', 'hr', 'neutral'): 'hr-HR-SreckoNeural',
+    ('female', 'hr', 'neutral'): 'hr-HR-GabrijelaNeural',
+    
+    # Slovenian
+    ('male', 'sl', 'neutral'): 'sl-SI-RokNeural',
+    ('female', 'sl', 'neutral'): 'sl-SI-PetraNeural',
+    
+    # Lithuanian
+    ('male', 'lt', 'neutral'): 'lt-LT-LeonasNeural',
+    ('female', 'lt', 'neutral'): 'lt-LT-OnaNeural',
+    
+    # Latvian
+    ('male', 'lv', 'neutral'): 'lv-LV-NilsNeural',
+    ('female', 'lv', 'neutral'): 'lv-LV-EveritaNeural',
+    
+    # Estonian
+    ('male', 'et', 'neutral'): 'et-EE-KertNeural',
+    ('female', 'et', 'neutral'): 'et-EE-AnuNeural',
+    
+    # Catalan
+    ('male', 'ca', 'neutral'): 'ca-ES-EnricNeural',
+    ('female', 'ca', 'neutral'): 'ca-ES-JoanaNeural',
+    
+    # Irish
+    ('male', 'ga', 'neutral'): 'ga-IE-ColmNeural',
+    ('female', 'ga', 'neutral'): 'ga-IE-OrlaNeural',
+    
+    # Welsh
+    ('male', 'cy', 'neutral'): 'cy-GB-AledNeural',
+    ('female', 'cy', 'neutral'): 'cy-GB-NiaNeural',
+    
+    # Swahili
+    ('male', 'sw', 'neutral'): 'sw-KE-RafikiNeural',
+    ('female', 'sw', 'neutral'): 'sw-KE-ZuriNeural',
+    
+    # Afrikaans
+    ('male', 'af', 'neutral'): 'af-ZA-WillemNeural',
+    ('female', 'af', 'neutral'): 'af-ZA-AdriNeural',
+    
+    # Amharic
+    ('male', 'am', 'neutral'): 'am-ET-AmehaNeural',
+    ('female', 'am', 'neutral'): 'am-ET-MekdesNeural',
+    
+    # Zulu
+    ('male', 'zu', 'neutral'): 'zu-ZA-ThembaNeural',
+    ('female', 'zu', 'neutral'): 'zu-ZA-ThandoNeural',
+}
+
+# Fallback voices by language (gender-neutral fallback)
+LANGUAGE_FALLBACKS = {
+    'en': 'en-US-AriaNeural', 'es': 'es-ES-ElviraNeural', 'fr': 'fr-FR-DeniseNeural',
+    'de': 'de-DE-KatjaNeural', 'pt': 'pt-BR-FranciscaNeural', 'it': 'it-IT-ElsaNeural',
+    'ru': 'ru-RU-SvetlanaNeural', 'ja': 'ja-JP-NanamiNeural', 'ko': 'ko-KR-SunHiNeural',
+    'zh': 'zh-CN-XiaoxiaoNeural', 'hi': 'hi-IN-SwaraNeural', 'bn': 'bn-IN-TanishaaNeural',
+    'ta': 'ta-IN-PallaviNeural', 'te': 'te-IN-ShrutiNeural', 'mr': 'mr-IN-AarohiNeural',
+    'gu': 'gu-IN-DhwaniNeural', 'kn': 'kn-IN-SapnaNeural', 'ml': 'ml-IN-SobhanaNeural',
+    'pa': 'pa-IN-GurbaniNeural', 'ur': 'ur-PK-UzmaNeural', 'th': 'th-TH-PremwadeeNeural',
+    'vi': 'vi-VN-HoaiMyNeural', 'id': 'id-ID-GadisNeural', 'ms': 'ms-MY-YasminNeural',
+    'fil': 'fil-PH-BlessicaNeural', 'my': 'my-MM-NilarNeural', 'ar': 'ar-SA-ZariyahNeural',
+    'he': 'he-IL-HilaNeural', 'fa': 'fa-IR-DilaraNeural', 'tr': 'tr-TR-EmelNeural',
+    'nl': 'nl-NL-ColetteNeural', 'pl': 'pl-PL-ZofiaNeural', 'sv': 'sv-SE-SofieNeural',
+    'da': 'da-DK-ChristelNeural', 'no': 'nb-NO-PernilleNeural', 'fi': 'fi-FI-NooraNeural',
+    'el': 'el-GR-AthinaNeural', 'cs': 'cs-CZ-VlastaNeural', 'hu': 'hu-HU-NoemiNeural',
+    'ro': 'ro-RO-AlinaNeural', 'uk': 'uk-UA-PolinaNeural', 'bg': 'bg-BG-KalinaNeural',
+    'sk': 'sk-SK-ViktoriaNeural', 'hr': 'hr-HR-GabrijelaNeural', 'sl': 'sl-SI-PetraNeural',
+    'lt': 'lt-LT-OnaNeural', 'lv': 'lv-LV-EveritaNeural', 'et': 'et-EE-AnuNeural',
+    'ca': 'ca-ES-JoanaNeural', 'ga': 'ga-IE-OrlaNeural', 'cy': 'cy-GB-NiaNeural',
+    'sw': 'sw-KE-ZuriNeural', 'af': 'af-ZA-AdriNeural', 'am': 'am-ET-MekdesNeural',
+    'zu': 'zu-ZA-ThandoNeural',
+}
+
+class CloneSampleError(Exception):
+    """A clone sample that cannot be used; the message is shown to the user."""
+
+
+CLONE_SAMPLE_RATE = 24000
+CLONE_MIN_SECONDS = 3
+CLONE_MAX_SECONDS = 120
+# Trim silence quieter than this from both ends of clone samples
+CLONE_SILENCE_THRESHOLD = '-50dB'
+
+
+def normalize_clone_sample(source_path, target_path):
+    """Resample to mono 24 kHz WAV, trim edge silence and cap the length."""
+    trim = f'silenceremove=start_periods=1:start_threshold={CLONE_SILENCE_THRESHOLD}'
+    subprocess.run(
+        [ffmpeg_binary(), '-hide_banner', '-loglevel', 'error', '-y', '-i', source_path, '-vn',
+         '-af', f'{trim},areverse,{trim},areverse',
+         '-ac', '1', '-ar', str(CLONE_SAMPLE_RATE), '-t', str(CLONE_MAX_SECONDS),
+         '-c:a', 'pcm_s16le', '-f', 'wav', target_path],
+        check=True,
+        capture_output=True,
+        timeout=TRANSCODE_TIMEOUT,
+    )
+
+
+def probe_duration(path):
+    """Duration in seconds, or None if mutagen does not recognise the file."""
+    try:
+        import mutagen
+        audio = mutagen.File(path)
+    except Exception:
+        return None
+    if audio is None or not getattr(audio, 'info', None):
+        return None
+    return audio.info.length
+
+
+class VoiceGenerationService:
+    """Service for generating speech using edge-tts."""
+    
+    def __init__(self):
+        self.media_root = settings.MEDIA_ROOT
+        self.output_dir = os.path.join(self.media_root, 'generated_audio')
+        os.makedirs(self.output_dir, exist_ok=True)
+    
+    def delete_media(self, name):
+        """Remove a file stored under MEDIA_ROOT by its relative name, if present."""
+        try:
+            os.remove(os.path.join(self.media_root, name))
+        except FileNotFoundError:
+            pass
+    
+    def get_voice_shortname(self, profile=None, clone=None):
+        """Determine the best Edge TTS voice based on profile or clone."""
+        if clone:
+            # Catalog voice whose sample sounds closest to the clone's
+            matched = voice_features.match_profile(clone)
+            if matched is not None:
+                return self.get_voice_shortname(profile=matched)
+
+            # No features yet: a deterministic pick from the available list
+            # Create a list of all available voices
+            available_voices = list(set(VOICE_MAP.values()))
+            available_voices.sort() # Ensure consistent order
+            
+            # Use clone ID to deterministically pick a voice
+            # This ensures the same clone always gets the same voice
+            idx = clone.id % len(available_voices)
+            return available_voices[idx]
+
+        if not profile:
+            return 'en-US-AriaNeural' # Default fallback
+            
+        gender = getattr(profile, 'gender', 'female').lower()
+        language = getattr(profile, 'language', 'en').lower()
+        emotion = getattr(profile, 'emotion', 'neutral').lower()
+        
+        # Try exact match
+        key = (gender, language, emotion)
+        if key in VOICE_MAP:
+            return VOICE_MAP[key]
+            
+        # Try match with neutral emotion
+        key = (gender, language, 'neutral')
+        if key in VOICE_MAP:
+            return VOICE_MAP[key]
+            
+        # Use language fallback
+        if language in LANGUAGE_FALLBACKS:
+            return LANGUAGE_FALLBACKS[language]
+        
+        return 'en-US-AriaNeural' # Ultimate fallback
+
+    async def stream_to_file(self, text, voice_shortname, filepath, on_chunk=None):
+        """
+        Stream edge-tts MP3 for `text` into `filepath`; returns the word timings.
+
+        `on_chunk`, if given, also receives every piece of audio as it arrives.
+        """
+        # Word boundaries arrive interleaved with the audio in the same stream
+        word_timings = []
+        communicate = edge_tts.Communicate(text, voice_shortname, boundary='WordBoundary')
+        with open(filepath, 'wb') as audio:
+            async for chunk in communicate.stream():
+                if chunk['type'] == 'audio':
+                    audio.write(chunk['data'])
+                    if on_chunk is not None:
+                        on_chunk(chunk['data'])
+                elif chunk['type'] == 'WordBoundary':
+                    word_timings.append(subtitles.word_from_boundary(chunk))
+        return word_timings
+
+    def mp3_duration(self, text, filepath):
+        # Get actual duration (optional)
+        duration = len(text) / (150 * 5 / 60) # Fallback estimate
+        with GENERATION_STAGE_SECONDS.time(stage='duration_probe'):
+            try:
+                from mutagen.mp3 import MP3
+                audio = MP3(filepath)
+                duration = audio.info.length
+            except:
+                pass
+        return duration
+
+    def synthesize(self, text, voice_shortname, filepath):
+        """
+        Write edge-tts MP3 for `text` to `filepath`.
+
+        Returns (duration_seconds, word_timings); raises if synthesis fails.
+        """
+        # edge-tts is async, so we need to run it in an event loop
+        with GENERATION_STAGE_SECONDS.time(stage='tts'), timing.span('tts'):
+            word_timings = asyncio.run(self.stream_to_file(text, voice_shortname, filepath))
+        return self.mp3_duration(text, filepath), word_timings
+
+    def generate_speech(self, text, voice_profile=None, voice_clone=None, output_format=NATIVE_OUTPUT_FORMAT):
+        """
+        Generate speech from text using edge-tts.
+
+        `output_format` is one of OUTPUT_FORMATS; anything but the native MP3
+        is transcoded after synthesis. If transcoding fails the native MP3 is
+        kept, and the returned 'output_format' says which one was produced.
+        'word_timings' lists [start_ms, end_ms, word] for every spoken word
+        and 'metadata' the file's media.describe() fields. 'waveform' holds
+        its peaks (waveform.compute), or None.
+        """
+        voice_shortname = self.get_voice_shortname(voice_profile, voice_clone)
+        
+        # Generate unique filename, in a ab/cd/ shard directory (see media.py)
+        stem = media.shard_stem(uuid.uuid4().hex)
+        os.makedirs(os.path.join(self.output_dir, os.path.dirname(stem)), exist_ok=True)
+        filename = f"{stem}.mp3"
+        filepath = os.path.join(self.output_dir, filename)
+        if output_format != NATIVE_OUTPUT_FORMAT:
+            # Synthesize next to the final file, then transcode into it
+            filepath = os.path.join(self.output_dir, f"{stem}.tts.mp3")
+        
+        try:
+            duration, word_timings = self.synthesize(text, voice_shortname, filepath)
+
+            if output_format != NATIVE_OUTPUT_FORMAT:
+                filename, output_format = self._transcode_output(filepath, stem, output_format)
+                
+        except Exception:
+            TTS_FAILURES.inc()
+            logger.exception('edge-tts synthesis failed for voice %s', voice_shortname)
+            # If fail, try to create empty file or generic error handling
+            if output_format != NATIVE_OUTPUT_FORMAT and os.path.exists(filepath):
+                os.remove(filepath)
+            filename = f"{stem}.mp3"
+            with open(os.path.join(self.output_dir, filename), 'wb') as f:
+                f.write(b'')
+            duration = 0
+            output_format = NATIVE_OUTPUT_FORMAT
+            word_timings = []
+            success = False
+        else:
+            success = True
+            
+        with GENERATION_STAGE_SECONDS.time(stage='describe'):
+            metadata = media.describe(os.path.join(self.output_dir, filename))
+        with GENERATION_STAGE_SECONDS.time(stage='waveform'):
+            peaks = waveform.compute(os.path.join(self.output_dir, filename)) if success else None
+            
+        return {
+            'success': success,
+            'audio_path': f'generated_audio/{filename}',
+            'duration': round(duration, 2),
+            'output_format': output_format,
+            'word_timings': word_timings,
+            'metadata': metadata,
+            'waveform': peaks,
+        }
+
+    def _transcode_output(self, source_path, stem, output_format):
+        """Turn the synthesized MP3 into the requested format; returns (filename, format)."""
+        filename = f"{stem}.{OUTPUT_FORMATS[output_format]['extension']}"
+        try:
+            with GENERATION_STAGE_SECONDS.time(stage='transcode'), timing.span('transcode'):
+                transcode(source_path, os.path.join(self.output_dir, filename), output_format)
+        except (OSError, RuntimeError, subprocess.SubprocessError):
+            logger.warning('Transcoding to %s failed, keeping MP3', output_format, exc_info=True)
+            filename = f"{stem}.mp3"
+            os.replace(source_path, os.path.join(self.output_dir, filename))
+            return filename, NATIVE_OUTPUT_FORMAT
+        os.remove(source_path)
+        return filename, output_format
+    
+    def _store_clone_features(self, voice_clone, path):
+        try:
+            voice_clone.acoustic_features = voice_features.encode(voice_features.extract_features(path))
+        except audio_analysis.AudioDecodeError:
+            # Generation falls back to the id-based voice pick
+            logger.info('No acoustic features for clone %s', voice_clone.id)
+
+    def process_voice_clone(self, voice_clone):
+        """
+        Validate and normalize a clone sample, then mark the clone ready.
+
+        With ffmpeg available the sample is converted to 24 kHz mono WAV,
+        leading/trailing silence is trimmed and it is capped at
+        CLONE_MAX_SECONDS. Problems with the sample itself mark the clone
+        failed with a reason the user can act on.
+        """
+        try:
+            self._prepare_clone_sample(voice_clone)
+        except CloneSampleError as e:
+            voice_clone.status = 'failed'
+            voice_clone.processing_error = str(e)
+        else:
+            voice_clone.status = 'ready'
+            voice_clone.processing_error = ''
+        voice_clone.save()
+        return voice_clone
+
+    def _prepare_clone_sample(self, voice_clone):
+        if not voice_clone.audio_sample:
+            raise CloneSampleError('No audio sample was uploaded.')
+        source_path = voice_clone.audio_sample.path
+        if not os.path.exists(source_path) or os.path.getsize(source_path) == 0:
+            raise CloneSampleError('The uploaded audio sample is empty.')
+
+        if ffmpeg_binary() is not None:
+            stem, extension = os.path.splitext(os.path.basename(source_path))
+            target_filename = f'{stem}-normalized.wav' if extension.lower() == '.wav' else f'{stem}.wav'
+            target_path = os.path.join(os.path.dirname(source_path), target_filename)
+            relative_name = f'{os.path.dirname(voice_clone.audio_sample.name)}/{target_filename}'
+            try:
+                normalize_clone_sample(source_path, target_path)
+            except subprocess.CalledProcessError:
+                raise CloneSampleError('The uploaded file could not be decoded as audio.')
+            os.remove(source_path)
+            voice_clone.audio_sample.name = relative_name
+            source_path = target_path
+
+        try:
+            metrics = audio_analysis.analyze(source_path)
+        except audio_analysis.AudioDecodeError:
+            metrics = None
+        if metrics is not None:
+            voice_clone.apply_analysis(metrics)
+            problems = audio_analysis.check_sample(metrics)
+            if problems:
+                raise CloneSampleError(' '.join(problems))
+            self._store_clone_features(voice_clone, source_path)
+            return
+
+        # Not decodable here (no ffmpeg for this format): check the length only
+        duration = probe_duration(source_path)
+        if duration is None:
+            raise CloneSampleError('The uploaded file is not a recognised audio format.')
+        if duration < CLONE_MIN_SECONDS:
+            raise CloneSampleError(
+                f'The sample has {duration:.1f}s of audio; at least {CLONE_MIN_SECONDS}s of speech is needed.'
+            )
+
+voice_service = VoiceGenerationService()
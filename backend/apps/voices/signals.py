@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalog
+from .models import VoiceProfile
+
+
+@receiver(post_save, sender=VoiceProfile)
+@receiver(post_delete, sender=VoiceProfile)
+def invalidate_voice_catalog(sender, **kwargs):
+    """Drop cached catalog responses whenever a profile changes."""
+    catalog.invalidate()
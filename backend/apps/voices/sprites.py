@@ -0,0 +1,96 @@
+"""
+Per-language audio sprites of the catalog voice samples.
+
+The voice picker would otherwise fetch every VoiceProfile.sample_audio
+separately. build_sprites() joins the samples of each language into one
+MP3 (frame-wise, see segments.concatenate) with SPRITE_GAP_MS of silence
+between them, and records each profile's offset and duration so the
+client loads one file per language and seeks within it.
+
+Sprite names contain a hash of their contents, so they can be cached
+forever; sprites that are no longer referenced are deleted. Samples that
+are not in edge-tts' native MP3 format (e.g. uploaded by an admin in
+another format) cannot be joined frame-wise and are left out; the picker
+falls back to their sample_audio.
+"""
+
+import hashlib
+import os
+from collections import defaultdict
+
+from . import catalog, segments
+from .models import VoiceProfile
+from .services import voice_service
+
+SPRITE_DIR = 'voiceprofile_sprites'
+# Silence between samples, so seeking a little early or late stays quiet
+SPRITE_GAP_MS = 240
+NATIVE_FORMAT = {'sample_rate': 24000, 'channels': 1, 'bitrate': 48000}
+
+
+def native_duration_ms(path):
+    """Duration of `path` if it is tag-less edge-tts MP3, else None."""
+    try:
+        from mutagen.mp3 import MP3
+        audio = MP3(path)
+    except Exception:
+        return None
+    info = audio.info
+    if audio.tags or any(getattr(info, field) != value for field, value in NATIVE_FORMAT.items()):
+        return None
+    return round(info.length * 1000)
+
+
+def build_sprites():
+    """
+    Rebuild the sprite of every language from the active profiles' samples.
+
+    Returns ({language: samples in its sprite}, number of samples left out).
+    """
+    media_root = voice_service.media_root
+    profiles = (
+        VoiceProfile.objects.filter(is_active=True)
+        .exclude(sample_audio='').exclude(sample_audio__isnull=True)
+        .order_by('language', 'name', 'id')
+    )
+    by_language = defaultdict(list)
+    skipped = 0
+    for profile in profiles:
+        path = os.path.join(media_root, profile.sample_audio.name)
+        duration = native_duration_ms(path) if os.path.exists(path) else None
+        if duration is None:
+            skipped += 1
+            continue
+        by_language[profile.language].append((profile, path, duration))
+
+    included = []
+    referenced = set()
+    for language, entries in by_language.items():
+        digest = hashlib.sha256()
+        for profile, _, duration in entries:
+            digest.update(f'{profile.id}:{profile.sample_audio.name}:{duration}\n'.encode())
+        name = f'{SPRITE_DIR}/{language}-{digest.hexdigest()[:12]}.mp3'
+        starts, _ = segments.concatenate(os.path.join(media_root, name), [
+            (path, duration, SPRITE_GAP_MS if index else 0)
+            for index, (_, path, duration) in enumerate(entries)
+        ])
+        for (profile, _, duration), start in zip(entries, starts):
+            profile.sample_sprite = name
+            profile.sample_offset_ms = start
+            profile.sample_duration_ms = duration
+            included.append(profile)
+        referenced.add(name)
+
+    VoiceProfile.objects.bulk_update(included, ['sample_sprite', 'sample_offset_ms', 'sample_duration_ms'])
+    VoiceProfile.objects.exclude(id__in=[p.id for p in included]).update(
+        sample_sprite=None, sample_offset_ms=None, sample_duration_ms=None
+    )
+    # bulk_update()/update() skip post_save, so refresh the catalog explicitly
+    catalog.invalidate()
+
+    sprite_dir = os.path.join(media_root, SPRITE_DIR)
+    for filename in os.listdir(sprite_dir) if os.path.isdir(sprite_dir) else []:
+        if f'{SPRITE_DIR}/{filename}' not in referenced:
+            os.remove(os.path.join(sprite_dir, filename))
+
+    return {language: len(entries) for language, entries in by_language.items()}, skipped
@@ -0,0 +1,123 @@
+"""
+Word timings and subtitle rendering for generated speech.
+
+edge-tts reports a WordBoundary event (offset and duration in 100 ns
+ticks) for every spoken word while it streams the audio. Synthesis keeps
+them as a compact list of [start_ms, end_ms, word] triples, stored on
+GeneratedSpeech.word_timings, and everything here is derived from that:
+
+- align(): maps each word back to its character offset in the input text,
+  for karaoke-style highlighting of the original text
+- cues(): groups words into subtitle cues, breaking at sentence ends, long
+  pauses, MAX_CUE_CHARACTERS or MAX_CUE_MS
+- to_srt() / to_vtt(): the cues as SubRip or WebVTT documents
+"""
+
+TICKS_PER_MS = 10_000
+
+MAX_CUE_CHARACTERS = 42
+MAX_CUE_MS = 6000
+# A silence this long between two words starts a new cue
+CUE_GAP_MS = 700
+SENTENCE_END = '.!?…。！？'
+
+
+def word_from_boundary(chunk):
+    """[start_ms, end_ms, word] for an edge-tts WordBoundary chunk."""
+    start = chunk['offset'] // TICKS_PER_MS
+    return [start, start + chunk['duration'] // TICKS_PER_MS, chunk['text']]
+
+
+def align(text, words):
+    """
+    Character offset of each word in `text` (None where it can't be found).
+
+    Words are searched for in order, each after the previous match, so a
+    word the engine normalized (numbers, abbreviations) only loses its own
+    offset.
+    """
+    lowered = text.lower()
+    offsets = []
+    position = 0
+    for _, _, word in words:
+        index = lowered.find(word.lower(), position)
+        if index == -1:
+            offsets.append(None)
+            continue
+        offsets.append(index)
+        position = index + len(word)
+    return offsets
+
+
+def _extend_to_punctuation(text, end):
+    """Include punctuation and closing quotes that directly follow a word."""
+    while end < len(text) and not text[end].isspace() and not text[end].isalnum():
+        end += 1
+    return end
+
+
+def cues(text, words):
+    """Group word timings into (start_ms, end_ms, caption) subtitle cues."""
+    offsets = align(text, words)
+    result = []
+    current = []
+
+    def flush():
+        if not current:
+            return
+        first, last = current[0], current[-1]
+        if offsets[first] is not None and offsets[last] is not None:
+            end = _extend_to_punctuation(text, offsets[last] + len(words[last][2]))
+            caption = ' '.join(text[offsets[first]:end].split())
+        else:
+            caption = ' '.join(words[i][2] for i in current)
+        result.append((words[first][0], words[last][1], caption))
+        current.clear()
+
+    for i, (start, end, word) in enumerate(words):
+        if current:
+            first = current[0]
+            characters = sum(len(words[j][2]) + 1 for j in current) + len(word)
+            if (
+                characters > MAX_CUE_CHARACTERS
+                or end - words[first][0] > MAX_CUE_MS
+                or start - words[current[-1]][1] > CUE_GAP_MS
+            ):
+                flush()
+        current.append(i)
+        if offsets[i] is not None:
+            # The word's last character too, in case the engine kept its punctuation
+            after = _extend_to_punctuation(text, offsets[i] + len(word))
+            if any(c in SENTENCE_END for c in text[offsets[i] + len(word) - 1:after]):
+                flush()
+    flush()
+    return result
+
+
+def _timestamp(ms, separator):
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f'{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{ms:03d}'
+
+
+def to_srt(text, words):
+    blocks = []
+    for number, (start, end, caption) in enumerate(cues(text, words), 1):
+        blocks.append(f"{number}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{caption}\n")
+    return '\n'.join(blocks)
+
+
+def to_vtt(text, words):
+    blocks = ['WEBVTT\n']
+    for start, end, caption in cues(text, words):
+        blocks.append(f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{caption}\n")
+    return '\n'.join(blocks)
+
+
+def timings(text, words):
+    """Word timings as JSON-friendly dicts, with offsets into `text`."""
+    return [
+        {'start_ms': start, 'end_ms': end, 'word': word, 'offset': offset}
+        for (start, end, word), offset in zip(words, align(text, words))
+    ]
@@ -1,23 +1,1446 @@
-from django.test import TestCase
-from .models import VoiceProfile
-
-class VoiceProfileTests(TestCase):
-    def test_create_voice_profile(self):
-        """Test creating a voice profile."""
-        profile = VoiceProfile.objects.create(
-            name='Test Voice',
-            gender='male',
-            emotion='neutral',
-            language='en'
-        )
-        
-        self.assertEqual(str(profile), 'Test Voice (male, neutral)')
-        self.assertTrue(profile.is_active)
-        
-    def test_voice_profile_defaults(self):
-        """Test default values for voice profile."""
-        profile = VoiceProfile.objects.create(name='Default Voice', gender='female')
-        
-        self.assertEqual(profile.language, 'en')
-        self.assertEqual(profile.emotion, 'neutral')
-        self.assertFalse(profile.is_premium)
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import wave
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import Throttled
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from config import metrics, timing
+from config.log import AsyncQueueHandler, RequestContextFilter, SamplingFilter
+from config.throttling import generation_slot, slots_in_use
+
+from . import catalog, media, retention, segments, subtitles, waveform
+from .audio_analysis import analyze, check_sample
+from .clone_processing import process_pending
+from .hls import SegmentWriter
+from .management.commands.profile_endpoint import StubCommunicate
+from .models import CloneUpload, Document, GeneratedSpeech, SpeechSegment, VoiceClone, VoiceProfile
+from .segments import SILENT_FRAME
+from .serializers import GenerateSpeechSerializer
+from .services import GENERATION_STAGE_SECONDS, VOICE_MAP, voice_service
+from .uploads import staging_path
+from .views import GENERATION_REFUNDS
+from .voice_features import encode, extract_features
+
+
+class VoiceProfileTests(TestCase):
+    def test_create_voice_profile(self):
+        """Test creating a voice profile."""
+        profile = VoiceProfile.objects.create(
+            name='Test Voice',
+            gender='male',
+            emotion='neutral',
+            language='en'
+        )
+        
+        self.assertEqual(str(profile), 'Test Voice (male, neutral)')
+        self.assertTrue(profile.is_active)
+        
+    def test_voice_profile_defaults(self):
+        """Test default values for voice profile."""
+        profile = VoiceProfile.objects.create(name='Default Voice', gender='female')
+        
+        self.assertEqual(profile.language, 'en')
+        self.assertEqual(profile.emotion, 'neutral')
+        self.assertFalse(profile.is_premium)
+
+
+class SpeechHistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='history@example.com', password='pass12345', name='History'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(25):
+            GeneratedSpeech.objects.create(
+                user=self.user, input_text=f'line {i}', audio_file=f'generated_audio/{i}.mp3'
+            )
+
+    def test_cursor_pages_cover_all_rows_once(self):
+        """Following next links visits every row exactly once, newest first."""
+        response = self.client.get('/api/voices/history/')
+        first_page = response.json()
+        self.assertEqual(len(first_page['results']), 20)
+        self.assertNotIn('count', first_page)
+        self.assertIn('cursor=', first_page['next'])
+
+        second_page = self.client.get(first_page['next']).json()
+        self.assertEqual(len(second_page['results']), 5)
+        self.assertIsNone(second_page['next'])
+
+        ids = [row['id'] for row in first_page['results'] + second_page['results']]
+        self.assertEqual(len(set(ids)), 25)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_include_count_returns_estimate(self):
+        response = self.client.get('/api/voices/history/', {'include_count': 'true'})
+        self.assertEqual(response.json()['count'], 25)
+
+
+class VoiceCatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='catalog@example.com', password='pass12345', name='Catalog'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.profile = VoiceProfile.objects.create(name='Aria', gender='female', language='en')
+
+    def test_cached_catalog_is_served_without_queries(self):
+        first = self.client.get('/api/voices/profiles/', {'language': 'en'})
+        self.assertEqual(len(first.json()), 1)
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/voices/profiles/', {'language': 'en'})
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_etag_revalidation_and_invalidation(self):
+        etag = self.client.get('/api/voices/profiles/')['ETag']
+        response = self.client.get('/api/voices/profiles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.profile.name = 'Aria Updated'
+        self.profile.save()
+        response = self.client.get('/api/voices/profiles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['name'], 'Aria Updated')
+
+    def test_per_process_cache_picks_up_other_workers_changes(self):
+        etag = self.client.get('/api/voices/profiles/')['ETag']
+        # Saved by another worker: this process's cache never hears of it
+        VoiceProfile.objects.filter(pk=self.profile.pk).update(name='Aria Elsewhere')
+        self.assertEqual(self.client.get('/api/voices/profiles/')['ETag'], etag)
+
+        later = time.time() + catalog.LOCAL_VERSION_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later):
+            response = self.client.get('/api/voices/profiles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['name'], 'Aria Elsewhere')
+
+
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='throttle@example.com', password='pass12345', name='Throttle'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_translate_returns_429_with_retry_after_when_bucket_is_empty(self):
+        rates = {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'translate': '2/min'}
+        result = {'success': True, 'translated_text': 'hola', 'source_language': 'en', 'target_language': 'es'}
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}), \
+                mock.patch('apps.voices.views.translation_service.translate', return_value=result):
+            statuses = [
+                self.client.post('/api/voices/translate/', {'text': 'hi', 'target_language': 'es'}).status_code
+                for _ in range(3)
+            ]
+            response = self.client.post('/api/voices/translate/', {'text': 'hi', 'target_language': 'es'})
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_generation_slots_cap_concurrency_per_user(self):
+        with override_settings(GENERATION_MAX_CONCURRENT=1):
+            with generation_slot(self.user.id):
+                with self.assertRaises(Throttled):
+                    with generation_slot(self.user.id):
+                        pass
+            # The slot is released once the first generation finishes
+            with generation_slot(self.user.id):
+                pass
+
+    def test_an_expired_slot_does_not_free_the_others(self):
+        with override_settings(GENERATION_MAX_CONCURRENT=2):
+            with generation_slot(self.user.id):
+                with generation_slot(self.user.id):
+                    # The first slot's key expires while both are still held
+                    cache.delete(f'throttle:generation-slots:{self.user.id}:0')
+                    with generation_slot(self.user.id):
+                        with self.assertRaises(Throttled):
+                            with generation_slot(self.user.id):
+                                pass
+                        self.assertEqual(slots_in_use(self.user.id), 2)
+            self.assertEqual(slots_in_use(self.user.id), 0)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir, True)
+        settings_override = override_settings(METRICS_DIR=self.metrics_dir, METRICS_TOKEN='scrape-token')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def test_endpoint_requires_token(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+
+    def test_stage_histogram_and_counters_are_exposed(self):
+        GENERATION_STAGE_SECONDS.observe(0.2, stage='tts')
+        GENERATION_STAGE_SECONDS.observe(3, stage='tts')
+        GENERATION_REFUNDS.inc()
+
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        body = response.content.decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE voiceai_generation_stage_seconds histogram', body)
+        self.assertIn('voiceai_generation_stage_seconds_bucket{stage="tts",le="0.25"} 1', body)
+        self.assertIn('voiceai_generation_stage_seconds_bucket{stage="tts",le="+Inf"} 2', body)
+        self.assertIn('voiceai_generation_stage_seconds_count{stage="tts"} 2', body)
+        self.assertIn('voiceai_generation_refunds_total 1', body)
+
+    def test_snapshots_from_other_workers_are_merged(self):
+        GENERATION_REFUNDS.inc(2)
+        metrics.registry.flush()
+        # Pretend a second worker process wrote its own snapshot
+        with open(metrics.registry.snapshot_path()) as f:
+            snapshot = json.load(f)
+        with open(os.path.join(self.metrics_dir, 'other-worker.json'), 'w') as f:
+            json.dump(snapshot, f)
+
+        merged = metrics.collect()
+        self.assertEqual(merged['voiceai_generation_refunds_total']['samples']['[]'], 4)
+
+    def test_concurrent_flushes_leave_one_complete_snapshot(self):
+        GENERATION_REFUNDS.inc()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: metrics.registry.flush(), range(40)))
+
+        self.assertEqual(os.listdir(self.metrics_dir), [os.path.basename(metrics.registry.snapshot_path())])
+        with open(metrics.registry.snapshot_path()) as f:
+            self.assertEqual(json.load(f)['voiceai_generation_refunds_total']['samples']['[]'], 1)
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='timing@example.com', password='pass12345', name='Timing'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_translate_reports_spans_in_server_timing_header(self):
+        result = {'success': True, 'translated_text': 'hola', 'source_language': 'en', 'target_language': 'es'}
+        with mock.patch('apps.voices.views.translation_service.translate', return_value=result):
+            response = self.client.post('/api/voices/translate/', {'text': 'hi', 'target_language': 'es'})
+
+        header = response['Server-Timing']
+        self.assertIn('auth;dur=', header)
+        self.assertIn('translate;dur=', header)
+        self.assertIn('total;dur=', header)
+
+    def test_db_queries_are_counted_and_slow_requests_logged(self):
+        with override_settings(SLOW_REQUEST_MS=0.001), self.assertLogs('config.timing', 'WARNING') as logs:
+            response = self.client.get('/api/voices/history/')
+
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('/api/voices/history/', logs.output[0])
+        self.assertIn('db=', logs.output[0])
+
+    def test_header_is_left_out_when_disabled(self):
+        with override_settings(SERVER_TIMING_HEADER=False):
+            response = self.client.get('/api/voices/history/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_span_is_a_no_op_outside_requests(self):
+        with timing.span('tts'):
+            pass
+        self.assertIsNone(timing.current())
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profiles_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profiles_dir, True)
+        settings_override = override_settings(PROFILES_DIR=self.profiles_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        User = get_user_model()
+        self.admin = User.objects.create_user(
+            email='admin-prof@example.com', password='pass12345', name='Admin', is_admin=True
+        )
+        self.member = User.objects.create_user(
+            email='member-prof@example.com', password='pass12345', name='Member'
+        )
+        self.admin_auth = f'Bearer {RefreshToken.for_user(self.admin).access_token}'
+        self.member_auth = f'Bearer {RefreshToken.for_user(self.member).access_token}'
+
+    def test_profile_flag_is_ignored_for_non_admins(self):
+        response = self.client.get('/api/voices/history/?_profile=1', HTTP_AUTHORIZATION=self.member_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.profiles_dir), [])
+
+    def test_admin_request_is_profiled_and_downloadable(self):
+        response = self.client.get('/api/voices/history/', HTTP_AUTHORIZATION=self.admin_auth, HTTP_X_PROFILE='1')
+        name = response['X-Profile-Id']
+
+        listing = self.client.get('/api/admin/profiling/', HTTP_AUTHORIZATION=self.admin_auth)
+        self.assertEqual([p['name'] for p in listing.json()], [name])
+
+        report = self.client.get(f'/api/admin/profiling/{name}/?report=text', HTTP_AUTHORIZATION=self.admin_auth)
+        self.assertIn('function calls', report.content.decode())
+
+        download = self.client.get(f'/api/admin/profiling/{name}/', HTTP_AUTHORIZATION=self.member_auth)
+        self.assertEqual(download.status_code, 403)
+
+    def test_profile_endpoint_command_rolls_back_and_cleans_up(self):
+        profile = VoiceProfile.objects.create(name='Stub', gender='female', emotion='neutral', language='en')
+        audio_before = generated_files()
+        out = io.StringIO()
+        call_command('profile_endpoint', 'generate_speech', '--iterations', '2',
+                     '--profile-id', str(profile.id), stdout=out)
+
+        self.assertIn('Response statuses: [201, 201]', out.getvalue())
+        self.assertEqual(GeneratedSpeech.objects.count(), 0)
+        self.admin.refresh_from_db()
+        self.assertEqual(self.admin.credits, 10)
+        self.assertEqual(generated_files(), audio_before)
+
+
+class StructuredLoggingTests(TestCase):
+    def test_request_id_is_echoed_and_attached_to_records(self):
+
+        seen = []
+
+        def translate(*args, **kwargs):
+            record = logging.makeLogRecord({'msg': 'inside view'})
+            RequestContextFilter().filter(record)
+            seen.append(record.request_id)
+            return {'success': True, 'translated_text': 'hola', 'source_language': 'en', 'target_language': 'es'}
+
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(
+            email='log@example.com', password='pass12345', name='Log'
+        ))
+        with mock.patch('apps.voices.views.translation_service.translate', side_effect=translate):
+            response = client.post('/api/voices/translate/', {'text': 'hi', 'target_language': 'es'},
+                                   HTTP_X_REQUEST_ID='req-123')
+            generated = client.post('/api/voices/translate/', {'text': 'hi', 'target_language': 'es'})
+
+        self.assertEqual(response['X-Request-ID'], 'req-123')
+        self.assertEqual(seen[0], 'req-123')
+        self.assertEqual(seen[1], generated['X-Request-ID'])
+
+    def test_queue_handler_writes_json_lines_off_thread(self):
+        stream = io.StringIO()
+        handler = AsyncQueueHandler(stream=stream)
+        handler.addFilter(RequestContextFilter())
+        logger = logging.getLogger('apps.tests.structured')
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.error('Failed for %s', 'user-1', exc_info=True, extra={'credits': 5})
+        handler.stop()
+
+        line = json.loads(stream.getvalue().strip())
+        self.assertEqual(line['message'], 'Failed for user-1')
+        self.assertEqual(line['level'], 'ERROR')
+        self.assertEqual(line['credits'], 5)
+        self.assertIn('ValueError: boom', line['exc_info'])
+
+    def test_sampling_filter_only_thins_debug_records(self):
+        sampler = SamplingFilter(rate=0)
+        debug = logging.makeLogRecord({'levelno': logging.DEBUG})
+        warning = logging.makeLogRecord({'levelno': logging.WARNING})
+        self.assertFalse(sampler.filter(debug))
+        self.assertTrue(sampler.filter(warning))
+
+
+def generated_files():
+    """Every file below generated_audio/, which is sharded into subdirectories."""
+    return {
+        os.path.join(root, filename)
+        for root, _, filenames in os.walk(voice_service.output_dir)
+        for filename in filenames
+    }
+
+
+class ScratchMediaMixin:
+    """A scratch MEDIA_ROOT (generated audio included) and edge-tts stubbed with `communicate`."""
+
+    communicate = StubCommunicate
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = tmp.name
+        for patcher in (
+            mock.patch.object(voice_service, 'media_root', tmp.name),
+            mock.patch.object(voice_service, 'output_dir', os.path.join(tmp.name, 'generated_audio')),
+            mock.patch('apps.voices.services.edge_tts.Communicate', self.communicate),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class OutputFormatTests(ScratchMediaMixin, TestCase):
+    def test_transcoded_formats_require_ffmpeg(self):
+        with mock.patch('apps.voices.services.shutil.which', return_value=None):
+            opus = GenerateSpeechSerializer(data={'text': 'hi', 'voice_profile_id': 1, 'output_format': 'opus'})
+            mp3 = GenerateSpeechSerializer(data={'text': 'hi', 'voice_profile_id': 1})
+            self.assertFalse(opus.is_valid())
+            self.assertIn('output_format', opus.errors)
+            self.assertTrue(mp3.is_valid())
+            self.assertEqual(mp3.validated_data['output_format'], 'mp3')
+
+    def test_generate_speech_transcodes_and_removes_intermediate_mp3(self):
+        def fake_transcode(source_path, target_path, output_format):
+            shutil.copyfile(source_path, target_path)
+
+        with mock.patch('apps.voices.services.transcode', side_effect=fake_transcode):
+            result = voice_service.generate_speech('Hello there', output_format='ogg')
+
+        self.assertEqual(result['output_format'], 'ogg')
+        self.assertTrue(result['audio_path'].endswith('.ogg'))
+        self.assertGreater(result['duration'], 0)
+        names = generated_files()
+        self.assertFalse(any(name.endswith('.tts.mp3') for name in names))
+
+    def test_failed_transcode_falls_back_to_native_mp3(self):
+        with mock.patch('apps.voices.services.transcode', side_effect=RuntimeError('ffmpeg is not installed')):
+            result = voice_service.generate_speech('Hello there', output_format='wav')
+
+        self.assertEqual(result['output_format'], 'mp3')
+        self.assertTrue(result['audio_path'].endswith('.mp3'))
+        self.assertGreater(os.path.getsize(os.path.join(voice_service.media_root, result['audio_path'])), 0)
+
+
+class CloneUploadTests(TestCase):
+    # Five seconds of silent 24 kHz / 48 kbit/s MP3 (24 ms per frame)
+    SAMPLE = (b'\xff\xf3\x64\xc0' + b'\x00' * 140) * 210
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        settings_override = override_settings(
+            MEDIA_ROOT=f'{root}/media', CLONE_UPLOAD_STAGING_DIR=f'{root}/staging', CLONE_UPLOAD_CHUNK_BYTES=4096
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = get_user_model().objects.create_user(
+            email='clone@example.com', password='pass12345', name='Clone'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _patch(self, upload_id, offset, data):
+        return self.client.generic(
+            'PATCH', f'/api/voices/clone-uploads/{upload_id}/', data,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def _upload(self, data):
+        upload_id = self.client.post(
+            '/api/voices/clone-uploads/', {'filename': 'me.mp3', 'size': len(data)}, format='json'
+        ).json()['id']
+        for offset in range(0, len(data), 4096):
+            self._patch(upload_id, offset, data[offset:offset + 4096])
+        return upload_id
+
+    def test_chunked_upload_resumes_and_creates_pending_clone(self):
+        upload_id = self.client.post(
+            '/api/voices/clone-uploads/', {'filename': 'me.mp3', 'size': len(self.SAMPLE)}, format='json'
+        ).json()['id']
+        self.assertEqual(self._patch(upload_id, 0, self.SAMPLE[:4096]).json()['offset'], 4096)
+        # A retried chunk at a stale offset is refused and reports where to resume
+        stale = self._patch(upload_id, 0, self.SAMPLE[:4096])
+        self.assertEqual((stale.status_code, stale.json()['offset']), (409, 4096))
+        self.assertEqual(self.client.get(f'/api/voices/clone-uploads/{upload_id}/').json()['offset'], 4096)
+        for offset in range(4096, len(self.SAMPLE), 4096):
+            last = self._patch(upload_id, offset, self.SAMPLE[offset:offset + 4096])
+        self.assertEqual(last.json()['status'], 'complete')
+
+        response = self.client.post('/api/voices/clones/', {'name': 'Me', 'upload_id': upload_id}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['status'], 'pending')
+
+        clone = VoiceClone.objects.get(id=response.json()['id'])
+        with clone.audio_sample.open('rb') as f:
+            self.assertEqual(f.read(), self.SAMPLE)
+        self.assertFalse(os.path.exists(staging_path(CloneUpload.objects.get(id=upload_id))))
+
+    def test_worker_marks_clones_ready_or_failed(self):
+        good = self.client.post(
+            '/api/voices/clones/', {'name': 'Good', 'upload_id': self._upload(self.SAMPLE)}, format='json'
+        ).json()['id']
+        short = self.client.post(
+            '/api/voices/clones/', {'name': 'Short', 'upload_id': self._upload(self.SAMPLE[:144 * 40])}, format='json'
+        ).json()['id']
+
+        with mock.patch('apps.voices.services.shutil.which', return_value=None):
+            self.assertEqual(process_pending(), (1, 1))
+
+        self.assertEqual(VoiceClone.objects.get(id=good).status, 'ready')
+        short_clone = VoiceClone.objects.get(id=short)
+        self.assertEqual(short_clone.status, 'failed')
+        self.assertIn('at least 3s', short_clone.processing_error)
+
+
+def write_wav(path, samples, sample_rate=16000, channels=1):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+
+class AudioAnalysisTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    def _wav(self, name, samples, **kwargs):
+        path = os.path.join(self.dir, name)
+        write_wav(path, samples, **kwargs)
+        return path
+
+    def _speech_like(self, seconds=6, sample_rate=16000):
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        # 220 Hz tone, gated on/off every half second like syllables and pauses
+        gate = (np.floor(t * 2) % 3 != 2).astype(np.float32)
+        return 0.3 * np.sin(2 * np.pi * 220 * t) * gate
+
+    def test_metrics_for_a_clean_sample(self):
+        sample_metrics = analyze(self._wav('clean.wav', self._speech_like()))
+        self.assertEqual(sample_metrics['sample_rate'], 16000)
+        self.assertAlmostEqual(sample_metrics['duration_seconds'], 6.0)
+        self.assertAlmostEqual(sample_metrics['silence_ratio'], 1 / 3, places=1)
+        self.assertAlmostEqual(sample_metrics['peak_dbfs'], -10.5, places=0)
+        self.assertEqual(sample_metrics['clipping_ratio'], 0)
+        self.assertEqual(check_sample(sample_metrics), [])
+
+    def test_block_size_does_not_change_results(self):
+        stereo = np.repeat(self._speech_like(), 2)
+        path = self._wav('stereo.wav', stereo, channels=2)
+        whole = analyze(path)
+        with mock.patch('apps.voices.audio_analysis.BLOCK_FRAMES', 777):
+            blocked = analyze(path)
+        self.assertEqual(whole, blocked)
+
+    def test_clipped_and_silent_samples_are_flagged(self):
+        clipped = np.clip(self._speech_like() * 10, -1, 1)
+        silent = np.zeros(16000 * 5)
+        self.assertIn('clipped', ' '.join(check_sample(analyze(self._wav('clipped.wav', clipped)))))
+        self.assertIn('silence', ' '.join(check_sample(analyze(self._wav('silent.wav', silent)))))
+
+    def test_silent_upload_is_rejected_before_queuing(self):
+        with open(self._wav('upload.wav', np.zeros(16000 * 5)), 'rb') as f:
+            sample = SimpleUploadedFile('upload.wav', f.read(), content_type='audio/wav')
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(
+            email='silent@example.com', password='pass12345', name='Silent'
+        ))
+        response = client.post('/api/voices/clones/', {'name': 'Silent', 'audio_sample': sample}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('audio_sample', response.json())
+        self.assertFalse(VoiceClone.objects.exists())
+
+
+class VoiceMatchingTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    def _voice(self, f0, tilt, sample_rate=16000, seconds=4):
+        """Harmonic 'voice' at pitch f0; higher tilt = darker spectrum."""
+        t = np.arange(sample_rate * seconds) / sample_rate
+        phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.03 * np.sin(2 * np.pi * 5 * t))) / sample_rate
+        signal = sum(np.sin(k * phase) / k ** tilt for k in range(1, 20))
+        signal *= np.floor(t * 2) % 3 != 2
+        path = os.path.join(self.dir, f'{f0}-{tilt}.wav')
+        write_wav(path, 0.3 * signal / np.abs(signal).max(), sample_rate=sample_rate)
+        return path
+
+    def test_pitch_feature_tracks_f0(self):
+        vector = extract_features(self._voice(220, 1.5))
+        self.assertAlmostEqual(100 * 2 ** float(vector[0]), 220, delta=6)
+        self.assertGreater(vector[2], 0.9)
+
+    def test_clone_is_matched_to_the_closest_catalog_voice(self):
+        low = VoiceProfile.objects.create(
+            name='Low', gender='male', language='en',
+            acoustic_features=encode(extract_features(self._voice(110, 1))),
+        )
+        VoiceProfile.objects.create(
+            name='High', gender='female', language='en',
+            acoustic_features=encode(extract_features(self._voice(220, 2))),
+        )
+        user = get_user_model().objects.create_user(email='match@example.com', password='pass12345', name='M')
+        clone = VoiceClone.objects.create(
+            user=user, name='Mine', language='en', audio_sample='clone_samples/x.wav', status='ready',
+            acoustic_features=encode(extract_features(self._voice(118, 1.2))),
+        )
+
+        self.assertEqual(voice_service.get_voice_shortname(clone=clone), voice_service.get_voice_shortname(profile=low))
+
+    def test_clone_without_features_keeps_the_id_based_pick(self):
+        user = get_user_model().objects.create_user(email='nofeat@example.com', password='pass12345', name='N')
+        clone = VoiceClone.objects.create(user=user, name='Old', audio_sample='clone_samples/y.wav')
+        voices = sorted(set(VOICE_MAP.values()))
+        self.assertEqual(voice_service.get_voice_shortname(clone=clone), voices[clone.id % len(voices)])
+
+
+class WordTimingTests(ScratchMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(email='subs@example.com', password='pass12345', name='S')
+        self.profile = VoiceProfile.objects.create(name='Narrator', gender='female', language='en')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cues_break_at_sentences_and_keep_punctuation(self):
+        text = 'Hello, world! How are "you" today?'
+        words = [[0, 400, 'Hello'], [450, 900, 'world'], [1500, 1700, 'How'],
+                 [1750, 1900, 'are'], [1950, 2200, 'you'], [2250, 2800, 'today']]
+        self.assertEqual(subtitles.cues(text, words), [
+            (0, 900, 'Hello, world!'),
+            (1500, 2800, 'How are "you" today?'),
+        ])
+        self.assertEqual(
+            subtitles.to_srt(text, words),
+            '1\n00:00:00,000 --> 00:00:00,900\nHello, world!\n\n'
+            '2\n00:00:01,500 --> 00:00:02,800\nHow are "you" today?\n',
+        )
+        self.assertTrue(subtitles.to_vtt(text, words).startswith('WEBVTT\n\n00:00:00.000 --> 00:00:00.900\n'))
+
+    def test_generation_records_word_timings_for_subtitle_downloads(self):
+        response = self.client.post('/api/voices/generate/', {
+            'text': 'The quick brown fox. Jumps over the dog.', 'voice_profile_id': self.profile.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['has_word_timings'])
+        speech = GeneratedSpeech.objects.get(id=response.data['id'])
+        self.assertEqual(len(speech.word_timings), 8)
+
+        timings = self.client.get(f'/api/voices/history/{speech.id}/timings/')
+        first, fifth = timings.data['words'][0], timings.data['words'][4]
+        self.assertEqual((first['word'], first['start_ms'], first['offset']), ('The', 0, 0))
+        self.assertEqual((fifth['word'], fifth['offset']), ('Jumps', 21))
+        self.assertGreater(fifth['start_ms'], timings.data['words'][3]['end_ms'] - 1)
+
+        srt = self.client.get(f'/api/voices/history/{speech.id}/subtitles/srt/')
+        self.assertEqual(srt['Content-Type'], 'application/x-subrip; charset=utf-8')
+        body = srt.content.decode()
+        self.assertIn('1\n00:00:00,000 --> ', body)
+        self.assertIn('\nThe quick brown fox.\n\n2\n', body)
+        vtt = self.client.get(f'/api/voices/history/{speech.id}/subtitles/vtt/')
+        self.assertTrue(vtt.content.decode().startswith('WEBVTT'))
+
+    def test_speech_without_timings_has_no_subtitles(self):
+        speech = GeneratedSpeech.objects.create(user=self.user, input_text='Old', audio_file='generated_audio/old.mp3')
+        self.assertEqual(self.client.get(f'/api/voices/history/{speech.id}/subtitles/srt/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/voices/history/{speech.id}/timings/').status_code, 404)
+
+
+class FlakyCommunicate(StubCommunicate):
+    """Stubbed edge-tts that fails on any text containing 'fail'."""
+
+    async def stream(self):
+        if 'fail' in self.text:
+            raise ConnectionError('edge-tts unavailable')
+        async for chunk in super().stream():
+            yield chunk
+
+
+class BulkGenerationTests(ScratchMediaMixin, TestCase):
+    communicate = FlakyCommunicate
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email='bulk@example.com', password='pass12345', name='B')
+        self.user.credits = 100
+        self.user.save()
+        self.profile = VoiceProfile.objects.create(name='IVR', gender='female', language='en')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _archive(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        return archive, json.loads(archive.read('manifest.json'))['items']
+
+    def test_duplicate_lines_are_synthesized_and_charged_once(self):
+        pid = self.profile.id
+        response = self.client.post('/api/voices/generate/bulk/', {'items': [
+            {'text': 'Press one for sales.', 'voice_profile_id': pid, 'filename': 'menu/sales.mp3'},
+            {'text': 'Press two for support.', 'voice_profile_id': pid, 'filename': 'support'},
+            {'text': 'Press one for sales.', 'voice_profile_id': pid},
+        ]}, format='json')
+        archive, manifest = self._archive(response)
+
+        self.assertEqual(sorted(archive.namelist()), ['0003.mp3', 'manifest.json', 'sales.mp3', 'support.mp3'])
+        self.assertEqual(archive.read('sales.mp3'), archive.read('0003.mp3'))
+        self.assertTrue(archive.read('support.mp3'))
+        self.assertEqual([item['status'] for item in manifest], ['ok', 'ok', 'ok'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 90)
+        self.assertEqual(GeneratedSpeech.objects.filter(user=self.user).count(), 2)
+
+    def test_csv_manifest_and_failed_lines_are_refunded(self):
+        csv_data = (
+            'text,voice_profile_id,filename\n'
+            f'Welcome,{self.profile.id},welcome\n'
+            f'This will fail,{self.profile.id},broken\n'
+        ).encode()
+        response = self.client.post('/api/voices/generate/bulk/', {
+            'manifest': SimpleUploadedFile('prompts.csv', csv_data, content_type='text/csv'),
+        }, format='multipart')
+        archive, manifest = self._archive(response)
+
+        self.assertEqual(sorted(archive.namelist()), ['manifest.json', 'welcome.mp3'])
+        self.assertEqual([item['status'] for item in manifest], ['ok', 'failed'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 95)
+        self.assertEqual(list(GeneratedSpeech.objects.values_list('input_text', flat=True)), ['Welcome'])
+
+    def test_rejects_unknown_voices_and_insufficient_credits(self):
+        response = self.client.post('/api/voices/generate/bulk/', {'items': [
+            {'text': 'Hi', 'voice_profile_id': 9999},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        self.user.credits = 5
+        self.user.save()
+        response = self.client.post('/api/voices/generate/bulk/', {'items': [
+            {'text': 'One', 'voice_profile_id': self.profile.id},
+            {'text': 'Two', 'voice_profile_id': self.profile.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 402)
+        self.assertEqual(slots_in_use(self.user.id), 0)
+
+
+class SegmentRenderMixin(ScratchMediaMixin):
+    """Stubbed edge-tts that records what it synthesizes, and a scratch MEDIA_ROOT."""
+
+    def setUp(self):
+        self.synthesized = synthesized = []
+
+        class RecordingCommunicate(StubCommunicate):
+            def __init__(self, text, voice, **kwargs):
+                super().__init__(text, voice, **kwargs)
+                self.voice = voice
+
+            async def stream(self):
+                if 'fail' in self.text or 'fail' in self.voice:
+                    raise ConnectionError('edge-tts unavailable')
+                synthesized.append(self.text)
+                async for chunk in super().stream():
+                    yield chunk
+
+        self.communicate = RecordingCommunicate
+        super().setUp()
+        cache.clear()
+
+        self.user = get_user_model().objects.create_user(email='docs@example.com', password='pass12345', name='D')
+        self.user.credits = 100
+        self.user.save()
+        self.profile = VoiceProfile.objects.create(name='Narrator', gender='male', language='en')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class DocumentRenderTests(SegmentRenderMixin, TestCase):
+    def _create(self, text):
+        response = self.client.post('/api/voices/documents/', {
+            'title': 'Chapter 1', 'text': text, 'voice_profile': self.profile.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def test_rerender_only_synthesizes_changed_paragraphs(self):
+        doc_id = self._create('First paragraph.\n\nSecond paragraph.\n\nThird paragraph.')
+        response = self.client.post(f'/api/voices/documents/{doc_id}/render/', {'paragraph_gap_ms': 480}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['credits_used'], response.data['paragraphs_synthesized']), (15, 3))
+        layout = response.data['segments']
+        self.assertEqual(len(layout), 3)
+        self.assertEqual(layout[1]['start_ms'], layout[0]['duration_ms'] + 480)
+        first_audio = Document.objects.get(id=doc_id).audio_file.name
+        with open(os.path.join(self.media_root, first_audio), 'rb') as f:
+            self.assertEqual(len(f.read()) % 144, 0)
+
+        self.client.patch(f'/api/voices/documents/{doc_id}/', {
+            'text': 'First   paragraph.\n\nSecond paragraph, edited.\n\nThird paragraph.',
+        }, format='json')
+        response = self.client.post(f'/api/voices/documents/{doc_id}/render/', {}, format='json')
+        self.assertEqual((response.data['credits_used'], response.data['paragraphs_synthesized']), (5, 1))
+        self.assertEqual(self.synthesized[-1], 'Second paragraph, edited.')
+        self.assertEqual(len(self.synthesized), 4)
+        self.assertEqual(SpeechSegment.objects.count(), 4)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, first_audio)))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 80)
+
+    def test_failed_paragraphs_are_refunded_and_the_rest_stay_cached(self):
+        doc_id = self._create('This one works.\n\nThis one will fail.')
+        response = self.client.post(f'/api/voices/documents/{doc_id}/render/', {}, format='json')
+        self.assertEqual(response.status_code, 502)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 95)
+        self.assertEqual(list(SpeechSegment.objects.values_list('text', flat=True)), ['This one works.'])
+
+    def test_segments_whose_file_is_gone_are_synthesized_again(self):
+        doc_id = self._create('Kept paragraph.\n\nLost paragraph.')
+        self.client.post(f'/api/voices/documents/{doc_id}/render/', {}, format='json')
+        lost = SpeechSegment.objects.get(text='Lost paragraph.')
+        os.remove(os.path.join(self.media_root, lost.audio_file.name))
+
+        response = self.client.post(f'/api/voices/documents/{doc_id}/render/', {}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['paragraphs_synthesized'], 1)
+        self.assertEqual(self.synthesized[-1], 'Lost paragraph.')
+        self.assertEqual(SpeechSegment.objects.count(), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, lost.audio_file.name)))
+
+    def test_render_errors_after_charging_are_refunded(self):
+        doc_id = self._create('First paragraph.\n\nSecond paragraph.')
+        with mock.patch('apps.voices.segments.assemble', side_effect=OSError('disk full')), \
+                self.assertRaises(OSError):
+            self.client.post(f'/api/voices/documents/{doc_id}/render/', {}, format='json')
+        with mock.patch('apps.voices.models.Document.save', side_effect=OSError('database gone')), \
+                self.assertRaises(OSError):
+            self.client.post(f'/api/voices/documents/{doc_id}/render/', {}, format='json')
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 100)
+
+    def test_assembly_fills_a_vanished_segment_with_silence(self):
+        gone = SpeechSegment(key='cd' * 32, audio_file='speech_segments/cd/cd/gone.mp3', duration_seconds=0.48)
+        target = os.path.join(self.media_root, 'out.mp3')
+        layout, duration = segments.assemble([gone], target, [0])
+
+        self.assertEqual((layout[0]['duration_ms'], duration), (480, 480))
+        with open(target, 'rb') as f:
+            self.assertEqual(f.read(), segments.silence(480))
+
+    def test_document_needs_exactly_one_voice(self):
+        response = self.client.post('/api/voices/documents/', {'title': 'x', 'text': 'Hello'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class DialogueTests(SegmentRenderMixin, TestCase):
+    def test_script_lines_are_rendered_with_per_speaker_voices_and_gaps(self):
+        other = VoiceProfile.objects.create(name='Guest', gender='female', language='en')
+        speakers = {'Host': {'voice_profile_id': self.profile.id}, 'Guest': {'voice_profile_id': other.id}}
+        response = self.client.post('/api/voices/generate/dialogue/', {
+            'speakers': speakers,
+            'script': 'Host: Welcome back.\nGuest: Thanks!\n\nHost: Welcome back.',
+            'gap_ms': 240,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['lines_synthesized'], 2)
+        self.assertEqual(response.data['credits_used'], 10)
+        lines = response.data['lines']
+        self.assertEqual([line['speaker'] for line in lines], ['Host', 'Guest', 'Host'])
+        self.assertEqual(lines[0]['start_ms'], 0)
+        self.assertEqual(lines[1]['start_ms'], lines[0]['duration_ms'] + 240)
+        self.assertEqual(GeneratedSpeech.objects.get(id=response.data['id']).input_text.count('\n'), 2)
+
+        # Same line, other voice: a new segment; repeated lines are free
+        response = self.client.post('/api/voices/generate/dialogue/', {
+            'speakers': speakers,
+            'lines': [
+                {'speaker': 'Guest', 'text': 'Welcome back.'},
+                {'speaker': 'Host', 'text': 'Welcome  back.', 'pause_ms': 1000},
+            ],
+        }, format='json')
+        self.assertEqual(response.data['credits_used'], 5)
+        self.assertEqual(response.data['lines'][1]['start_ms'], response.data['lines'][0]['duration_ms'] + 1008)
+        self.assertEqual(len(self.synthesized), 3)
+
+    def test_rejects_unknown_speakers(self):
+        response = self.client.post('/api/voices/generate/dialogue/', {
+            'speakers': {'Host': {'voice_profile_id': self.profile.id}},
+            'script': 'Host: Hi\nStranger: Hello',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Stranger', str(response.data))
+
+
+class PreviewFanoutTests(SegmentRenderMixin, TestCase):
+    def test_previews_all_voices_at_once_and_reuses_the_cache(self):
+        female = VoiceProfile.objects.create(name='Ava', gender='female', language='en')
+        twin = VoiceProfile.objects.create(name='Ava 2', gender='female', language='en')
+        ids = [self.profile.id, female.id, twin.id]
+
+        response = self.client.post('/api/voices/generate/previews/', {
+            'text': 'Hello there!', 'voice_profile_ids': ids,
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        previews = response.data['previews']
+        self.assertEqual([p['voice_profile_id'] for p in previews], ids)
+        self.assertTrue(all(p['audio_file'].startswith('/media/speech_segments/') for p in previews))
+        # Profiles that resolve to the same edge-tts voice share one synthesis
+        self.assertEqual(previews[1]['audio_file'], previews[2]['audio_file'])
+        self.assertEqual(len(self.synthesized), 2)
+        self.assertFalse(any(p['cached'] for p in previews))
+
+        response = self.client.post('/api/voices/generate/previews/', {
+            'text': 'Hello   there!', 'voice_profile_ids': [female.id],
+        }, format='json')
+        self.assertTrue(response.data['previews'][0]['cached'])
+        self.assertEqual(len(self.synthesized), 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 100)
+
+    def test_failed_voice_is_reported_alongside_the_others(self):
+        female = VoiceProfile.objects.create(name='Ava', gender='female', language='en')
+        with mock.patch.object(voice_service, 'get_voice_shortname', side_effect=['fail-voice', 'en-US-AriaNeural']):
+            response = self.client.post('/api/voices/generate/previews/', {
+                'text': 'Hi', 'voice_profile_ids': [self.profile.id, female.id],
+            }, format='json')
+        previews = response.data['previews']
+        self.assertIn('error', previews[0])
+        self.assertIn('audio_file', previews[1])
+
+    def test_each_synthesized_voice_costs_a_throttle_token(self):
+        voices = [
+            VoiceProfile.objects.create(name=language, gender='female', language=language)
+            for language in ('en', 'fr', 'de')
+        ]
+        rates = {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'preview': '4/min'}
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}):
+            first = self.client.post('/api/voices/generate/previews/', {
+                'text': 'Hello there!', 'voice_profile_ids': [v.id for v in voices],
+            }, format='json')
+            again = self.client.post('/api/voices/generate/previews/', {
+                'text': 'Something new', 'voice_profile_ids': [v.id for v in voices],
+            }, format='json')
+
+        self.assertEqual(first.status_code, 200, first.data)
+        self.assertEqual(again.status_code, 429)
+        self.assertEqual(len(self.synthesized), 3)
+
+
+class SampleSpriteTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        patcher = mock.patch.object(voice_service, 'media_root', self.media_root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _profile(self, name, language, frames):
+        os.makedirs(os.path.join(self.media_root, 'voiceprofile_audio'), exist_ok=True)
+        relative = f'voiceprofile_audio/{name}.mp3'
+        with open(os.path.join(self.media_root, relative), 'wb') as f:
+            f.write(SILENT_FRAME * frames)
+        return VoiceProfile.objects.create(name=name, gender='female', language=language, sample_audio=relative)
+
+    def test_samples_are_joined_per_language_with_offsets_in_the_catalog(self):
+        cache.clear()
+        alpha = self._profile('Alpha', 'en', 50)
+        beta = self._profile('Beta', 'en', 25)
+        gamma = self._profile('Gamma', 'fr', 10)
+        odd = VoiceProfile.objects.create(name='Odd', gender='male', language='en', sample_audio='voiceprofile_audio/missing.wav')
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(email='picker@example.com', password='pass12345', name='P'))
+        self.assertIsNone(client.get('/api/voices/profiles/').data[0]['sample_sprite'])
+
+        call_command('generate_samples', '--sprite', stdout=io.StringIO())
+
+        alpha.refresh_from_db()
+        beta.refresh_from_db()
+        gamma.refresh_from_db()
+        odd.refresh_from_db()
+        self.assertEqual(alpha.sample_sprite, beta.sample_sprite)
+        self.assertNotEqual(alpha.sample_sprite, gamma.sample_sprite)
+        self.assertEqual((alpha.sample_offset_ms, alpha.sample_duration_ms), (0, 1200))
+        self.assertEqual((beta.sample_offset_ms, beta.sample_duration_ms), (1200 + 240, 600))
+        self.assertIsNone(odd.sample_sprite.name)
+        with open(os.path.join(self.media_root, alpha.sample_sprite.name), 'rb') as f:
+            self.assertEqual(len(f.read()), 144 * (50 + 10 + 25))
+
+        # Offsets are part of the (cached) catalog response, which was invalidated
+        listed = {p['name']: p for p in client.get('/api/voices/profiles/').data}
+        self.assertTrue(listed['Beta']['sample_sprite'].endswith(beta.sample_sprite.name))
+        self.assertEqual(listed['Beta']['sample_offset_ms'], 1440)
+
+        # Rebuilding after a change replaces the sprite and removes the old file
+        old_sprite = alpha.sample_sprite.name
+        beta.is_active = False
+        beta.save()
+        call_command('generate_samples', '--sprite', stdout=io.StringIO())
+        alpha.refresh_from_db()
+        self.assertNotEqual(alpha.sample_sprite.name, old_sprite)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, old_sprite)))
+
+
+class ShardingTests(ScratchMediaMixin, TestCase):
+    def _legacy(self, name, content=b'audio'):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return name
+
+    def test_names(self):
+        key = 'ab12' + '0' * 60
+        self.assertEqual(media.shard_name('speech_segments', f'{key}.mp3'), f'speech_segments/ab/12/{key}.mp3')
+        self.assertRegex(media.shard_name('documents', 'Intro Notes.mp3'), r'^documents/[0-9a-f]{2}/[0-9a-f]{2}/Intro Notes\.mp3$')
+        self.assertTrue(media.is_sharded(media.new_name('generated_audio', 'mp3')))
+        self.assertFalse(media.is_sharded('generated_audio/legacy.mp3'))
+
+        upload_to = media.ShardedUploadTo('clone_samples')
+        name = upload_to(None, '../My Voice.WAV')
+        self.assertTrue(media.is_sharded(name))
+        self.assertTrue(name.startswith('clone_samples/') and name.endswith('.wav'))
+
+    def test_generated_speech_is_written_to_a_shard(self):
+        result = voice_service.generate_speech('Hello there')
+
+        self.assertTrue(result['success'])
+        self.assertTrue(media.is_sharded(result['audio_path']))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, result['audio_path'])))
+
+    def test_shard_media_moves_files_and_is_resumable(self):
+        user = get_user_model().objects.create_user(email='shard@example.com', password='pass12345', name='S')
+        legacy = self._legacy('generated_audio/legacy.mp3', b'legacy audio')
+        first = GeneratedSpeech.objects.create(user=user, input_text='a', audio_file=legacy)
+        # Two rows sharing one file (a bulk duplicate) both follow it
+        second = GeneratedSpeech.objects.create(user=user, input_text='a', audio_file=legacy)
+        lost = GeneratedSpeech.objects.create(user=user, input_text='b', audio_file='generated_audio/gone.mp3')
+        profile = VoiceProfile.objects.create(
+            name='Legacy', gender='male', sample_audio=self._legacy('voiceprofile_audio/sample.mp3')
+        )
+
+        out = io.StringIO()
+        call_command('shard_media', '--dry-run', stdout=out)
+        self.assertIn('GeneratedSpeech.audio_file: would move 2, missing 1', out.getvalue())
+        first.refresh_from_db()
+        self.assertEqual(first.audio_file.name, legacy)
+
+        out = io.StringIO()
+        call_command('shard_media', '--batch-size', '1', stdout=out)
+        for row in (first, second, lost, profile):
+            row.refresh_from_db()
+        self.assertTrue(media.is_sharded(first.audio_file.name))
+        self.assertEqual(first.audio_file.name, second.audio_file.name)
+        self.assertEqual(lost.audio_file.name, 'generated_audio/gone.mp3')
+        self.assertTrue(media.is_sharded(profile.sample_audio.name))
+        with open(os.path.join(self.media_root, first.audio_file.name), 'rb') as f:
+            self.assertEqual(f.read(), b'legacy audio')
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, legacy)))
+
+        out = io.StringIO()
+        call_command('shard_media', stdout=out)
+        self.assertIn('Done! 0 files', out.getvalue())
+
+
+class AudioMetadataTests(ScratchMediaMixin, TestCase):
+    def test_generation_records_file_metadata(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(email='meta@example.com', password='pass12345', name='M')
+        user.credits = 10
+        user.save()
+        profile = VoiceProfile.objects.create(name='Meta', gender='female', language='en')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.post('/api/voices/generate/', {'text': 'Hello metadata', 'voice_profile_id': profile.id}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        speech = GeneratedSpeech.objects.get()
+        with open(os.path.join(self.media_root, speech.audio_file.name), 'rb') as f:
+            content = f.read()
+        self.assertEqual(response.data['size_bytes'], len(content))
+        self.assertEqual(response.data['sha256'], hashlib.sha256(content).hexdigest())
+        self.assertEqual((speech.codec, speech.sample_rate, speech.bitrate), ('mp3', 24000, 48000))
+
+    def test_backfill_describes_old_rows_and_skips_missing_files(self):
+        user = get_user_model().objects.create_user(email='backfill@example.com', password='pass12345', name='B')
+        os.makedirs(os.path.join(self.media_root, 'generated_audio'))
+        rows = []
+        for i in range(3):
+            name = f'generated_audio/old{i}.mp3'
+            with open(os.path.join(self.media_root, name), 'wb') as f:
+                f.write(SILENT_FRAME * (10 + i))
+            rows.append(GeneratedSpeech.objects.create(user=user, input_text='old', audio_file=name))
+        lost = GeneratedSpeech.objects.create(user=user, input_text='lost', audio_file='generated_audio/gone.mp3')
+
+        out = io.StringIO()
+        call_command('backfill_audio_metadata', '--batch-size', '2', '--workers', '2', stdout=out)
+
+        self.assertIn('Described: 3, Missing files: 1', out.getvalue())
+        for i, row in enumerate(rows):
+            row.refresh_from_db()
+            self.assertEqual(row.size_bytes, 144 * (10 + i))
+            self.assertEqual(row.codec, 'mp3')
+        lost.refresh_from_db()
+        self.assertIsNone(lost.sha256)
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = os.path.join(tmp.name, 'media')
+        self.cold_root = os.path.join(tmp.name, 'cold')
+        patcher = mock.patch.object(voice_service, 'media_root', self.media_root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        storages = override_settings(STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'cold': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': self.cold_root}},
+        })
+        storages.enable()
+        self.addCleanup(storages.disable)
+        self.user = get_user_model().objects.create_user(email='retain@example.com', password='pass12345', name='R')
+
+    def _speech(self, days_old, frames=100, **fields):
+        name = media.new_name('generated_audio', 'mp3')
+        with open(media.absolute_path(self.media_root, name), 'wb') as f:
+            f.write(SILENT_FRAME * frames)
+        speech = GeneratedSpeech.objects.create(user=self.user, input_text='old', audio_file=name, **fields)
+        GeneratedSpeech.objects.filter(pk=speech.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+        return speech
+
+    def _retain(self, *args, **policy):
+        days = {
+            'RETENTION_COMPACT_DAYS': 0, 'RETENTION_COLD_DAYS': 0,
+            'RETENTION_EXPIRE_DAYS': 0, 'RETENTION_SEGMENT_DAYS': 0, **policy,
+        }
+        out = io.StringIO()
+        with override_settings(**days):
+            call_command('apply_retention', *args, stdout=out)
+        return out.getvalue()
+
+    def test_old_audio_is_reencoded_in_place(self):
+        def fake_transcode(source_path, target_path, output_format):
+            with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+                target.write(source.read(144 * 40))
+
+        old = self._speech(40)
+        young = self._speech(5)
+        wav = self._speech(40, codec='pcm_s16le')
+        GeneratedSpeech.objects.filter(pk=wav.pk).update(audio_file='generated_audio/asked-for.wav')
+        old_name = old.audio_file.name
+
+        with mock.patch('apps.voices.retention.ffmpeg_binary', return_value='/usr/bin/ffmpeg'), \
+                mock.patch('apps.voices.retention.transcode', side_effect=fake_transcode):
+            out = self._retain('--workers', '0', RETENTION_COMPACT_DAYS=30)
+
+        self.assertIn('compacted: 1', out)
+        old.refresh_from_db()
+        young.refresh_from_db()
+        wav.refresh_from_db()
+        self.assertEqual((old.storage_tier, young.storage_tier, wav.storage_tier), ('compact', 'hot', 'hot'))
+        self.assertNotEqual(old.audio_file.name, old_name)
+        self.assertEqual(old.size_bytes, 144 * 40)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, old_name)))
+
+        with mock.patch('apps.voices.retention.ffmpeg_binary', return_value=None):
+            self.assertIn('compaction skipped', self._retain('--workers', '0', RETENTION_COMPACT_DAYS=1))
+        young.refresh_from_db()
+        self.assertEqual(young.storage_tier, 'hot')
+
+    def test_archive_and_expire_with_a_process_pool(self):
+        aging = self._speech(100)
+        ancient = self._speech(400)
+        recent = self._speech(10)
+        segment = SpeechSegment.objects.create(
+            key='ab' * 32, voice_shortname='en-US-AriaNeural', text='x', audio_file='speech_segments/ab/ab/x.mp3',
+            duration_seconds=1,
+        )
+        SpeechSegment.objects.filter(pk=segment.pk).update(last_used_at=timezone.now() - timedelta(days=60))
+        policy = {'RETENTION_COLD_DAYS': 60, 'RETENTION_EXPIRE_DAYS': 365, 'RETENTION_SEGMENT_DAYS': 30}
+
+        self.assertIn('Would process archived: 2, expired: 1, segments: 1', self._retain('--dry-run', **policy))
+        self.assertEqual(GeneratedSpeech.objects.filter(storage_tier='hot').count(), 3)
+
+        out = self._retain('--workers', '2', **policy)
+
+        self.assertIn('archived: 1, expired: 1, segments: 1', out)
+        for speech in (aging, ancient, recent):
+            speech.refresh_from_db()
+        self.assertEqual([s.storage_tier for s in (aging, ancient, recent)], ['cold', 'expired', 'hot'])
+        self.assertEqual(ancient.audio_file.name, '')
+        self.assertTrue(os.path.exists(os.path.join(self.cold_root, aging.audio_file.name)))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, aging.audio_file.name)))
+        self.assertFalse(SpeechSegment.objects.exists())
+
+    def test_segments_used_meanwhile_are_kept(self):
+        name = media.shard_name('speech_segments', 'busy.mp3')
+        open(media.absolute_path(self.media_root, name), 'wb').close()
+        SpeechSegment.objects.create(
+            key='ef' * 32, voice_shortname='en-US-AriaNeural', text='x', audio_file=name, duration_seconds=1,
+        )
+        SpeechSegment.objects.update(last_used_at=timezone.now() - timedelta(days=60))
+        batches = retention._batches
+
+        def render_meanwhile(rows, batch_size):
+            for batch in batches(rows, batch_size):
+                SpeechSegment.objects.update(last_used_at=timezone.now())
+                yield batch
+
+        with mock.patch('apps.voices.retention._batches', render_meanwhile):
+            stats = retention.expire_segments(timezone.now() - timedelta(days=30))
+
+        self.assertEqual(stats['segments'], 0)
+        self.assertTrue(SpeechSegment.objects.exists())
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+
+    def test_archived_audio_has_no_url(self):
+        speech = self._speech(100)
+        self._retain('--workers', '0', RETENTION_COLD_DAYS=60)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        listed = client.get('/api/voices/history/').data['results'][0]
+        self.assertEqual((listed['id'], listed['storage_tier']), (speech.id, 'cold'))
+        self.assertIsNone(listed['audio_file'])
+
+
+class WaveformTests(TestCase):
+    def test_peaks_follow_the_signal_at_every_resolution(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'clip.wav')
+            t = np.arange(16000 * 2) / 16000
+            # One quiet second, then one second at half scale
+            write_wav(path, np.where(t < 1, 0.0, 0.5 * np.sin(2 * np.pi * 220 * t)))
+            peaks = waveform.compute(path)
+            short = os.path.join(tmp, 'short.wav')
+            write_wav(short, np.full(800, 0.25))
+            short_peaks = waveform.compute(short)
+
+        self.assertEqual(peaks['duration_ms'], 2000)
+        self.assertEqual(set(peaks['peaks']), {'128', '512', '2048'})
+        coarse = waveform.decode(peaks['peaks']['128'])
+        self.assertEqual(len(coarse), 128)
+        self.assertEqual(coarse[0], (0.0, 0.0))
+        self.assertAlmostEqual(coarse[-1][1], 0.5, delta=0.02)
+        self.assertAlmostEqual(coarse[-1][0], -0.5, delta=0.02)
+        # 50 ms of audio still fills every bucket
+        self.assertEqual(len(waveform.decode(short_peaks['peaks']['2048'])), 2048)
+        self.assertIsNone(waveform.compute(os.path.join(tmp, 'missing.wav')))
+
+    def test_history_serves_the_coarse_peaks_and_the_others_on_request(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        user = get_user_model().objects.create_user(email='wave@example.com', password='pass12345', name='W')
+        user.credits = 10
+        user.save()
+        profile = VoiceProfile.objects.create(name='Wave', gender='female', language='en')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with mock.patch.object(voice_service, 'media_root', tmp.name), \
+                mock.patch.object(voice_service, 'output_dir', os.path.join(tmp.name, 'generated_audio')), \
+                mock.patch('apps.voices.services.edge_tts.Communicate', StubCommunicate), \
+                mock.patch('apps.voices.audio_analysis.iter_blocks',
+                           side_effect=lambda path: (24000, iter([np.full(24000, 0.25, dtype=np.float32)]))):
+            created = client.post('/api/voices/generate/', {'text': 'Draw me', 'voice_profile_id': profile.id}, format='json')
+
+        self.assertEqual(created.status_code, 201)
+        listed = client.get('/api/voices/history/').data['results'][0]
+        self.assertEqual((listed['waveform']['buckets'], listed['waveform']['duration_ms']), (128, 1000))
+        detail = client.get(f"/api/voices/history/{created.data['id']}/waveform/", {'buckets': '512'})
+        self.assertEqual(detail.data['buckets'], 512)
+        peaks = waveform.decode(detail.data['peaks'])
+        self.assertEqual(len(peaks), 512)
+        self.assertTrue(all(abs(high - 0.25) < 0.01 for _, high in peaks))
+        self.assertEqual(client.get(f"/api/voices/history/{created.data['id']}/waveform/", {'buckets': '7'}).status_code, 400)
+
+        bare = GeneratedSpeech.objects.create(user=user, input_text='old', audio_file='generated_audio/old.mp3')
+        self.assertIsNone(client.get('/api/voices/history/').data['results'][0]['waveform'])
+        self.assertEqual(client.get(f'/api/voices/history/{bare.id}/waveform/').status_code, 404)
+
+
+class InlinePool:
+    """Stand-in for the HLS thread pool; runs jobs at once, or on run() when deferred."""
+
+    def __init__(self, deferred=False):
+        self.deferred = deferred
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+        if not self.deferred:
+            self.run()
+
+    def run(self):
+        while self.jobs:
+            fn, args = self.jobs.pop(0)
+            fn(*args)
+
+
+class SegmentedOutputTests(ScratchMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        for patcher in (
+            # Run the background synthesis inline, inside the test transaction
+            mock.patch('apps.voices.hls._pool', return_value=InlinePool()),
+            mock.patch('apps.voices.hls.close_old_connections'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(email='hls@example.com', password='pass12345', name='H')
+        self.user.credits = 10
+        self.user.save()
+        self.profile = VoiceProfile.objects.create(name='Narrator', gender='male', language='en')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _read(self, *parts):
+        with open(os.path.join(self.media_root, *parts), 'rb') as f:
+            return f.read()
+
+    def test_writer_cuts_whole_frames_and_grows_the_playlist(self):
+        audio = SILENT_FRAME * 600  # 14.4 s
+        writer = SegmentWriter(os.path.join(self.media_root, 'hls'), segment_seconds=6)
+        for start in range(0, len(audio), 1000):
+            writer.write(audio[start:start + 1000])
+
+        playlist = self._read('hls', 'index.m3u8').decode()
+        self.assertIn('#EXT-X-TARGETDURATION:6', playlist)
+        self.assertEqual(playlist.count('#EXTINF'), 2)
+        self.assertNotIn('#EXT-X-ENDLIST', playlist)
+
+        writer.close()
+        playlist = self._read('hls', 'index.m3u8').decode()
+        self.assertIn('#EXTINF:6.000,\nsegment00001.mp3\n#EXTINF:2.400,\nsegment00002.mp3\n#EXT-X-ENDLIST', playlist)
+        self.assertEqual(b''.join(self._read('hls', name) for name, _ in writer.segments), audio)
+        self.assertAlmostEqual(writer.duration, 14.4)
+
+    def test_segmented_generation_returns_before_the_audio_is_complete(self):
+        response = self.client.post('/api/voices/generate/', {
+            'text': 'word ' * 40, 'voice_profile_id': self.profile.id, 'segmented': True,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.data['hls_playlist'].endswith('/index.m3u8'))
+        # The response was built before synthesis ran
+        self.assertIsNone(response.data['duration_seconds'])
+
+        speech = GeneratedSpeech.objects.get()
+        self.assertAlmostEqual(speech.duration_seconds, 14.4)
+        self.assertEqual(speech.codec, 'mp3')
+        playlist = self._read(speech.hls_playlist.name).decode()
+        self.assertTrue(playlist.rstrip().endswith('#EXT-X-ENDLIST'))
+        self.assertEqual(playlist.count('#EXTINF'), 3)
+        self.assertEqual(len(self._read(speech.audio_file.name)), 144 * 600)
+
+    def test_failed_segmented_generation_is_refunded_and_removed(self):
+        class BrokenCommunicate:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            async def stream(self):
+                raise ConnectionError('edge-tts unavailable')
+                yield
+
+        with mock.patch('apps.voices.services.edge_tts.Communicate', BrokenCommunicate):
+            response = self.client.post('/api/voices/generate/', {
+                'text': 'Hello', 'voice_profile_id': self.profile.id, 'segmented': True,
+            }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(GeneratedSpeech.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 10)
+        self.assertEqual([files for _, _, files in os.walk(self.media_root) if files], [])
+
+        preview = self.client.post('/api/voices/generate/', {
+            'text': 'Hi', 'voice_profile_id': self.profile.id, 'segmented': True, 'is_preview': True,
+        }, format='json')
+        self.assertEqual(preview.status_code, 400)
+
+    def _post_deferred(self):
+        pool = InlinePool(deferred=True)
+        with mock.patch('apps.voices.hls._pool', return_value=pool):
+            response = self.client.post('/api/voices/generate/', {
+                'text': 'word ' * 40, 'voice_profile_id': self.profile.id, 'segmented': True,
+            }, format='json')
+        self.addCleanup(pool.run)
+        return response, pool
+
+    def test_background_job_holds_the_generation_slot(self):
+        response, pool = self._post_deferred()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['hls_state'], 'pending')
+        self.assertEqual(slots_in_use(self.user.id), 1)
+
+        pool.run()
+        self.assertEqual(slots_in_use(self.user.id), 0)
+        self.assertEqual(GeneratedSpeech.objects.get().hls_state, 'complete')
+
+    def test_full_queue_is_refused_and_refunded(self):
+        with override_settings(HLS_MAX_PENDING=1):
+            first, pool = self._post_deferred()
+            second, _ = self._post_deferred()
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(GeneratedSpeech.objects.count(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 5)
+        self.assertEqual(len([files for _, _, files in os.walk(self.media_root) if files]), 1)
+        pool.run()
+
+    def test_deleting_an_unfinished_generation_removes_its_files(self):
+        response, pool = self._post_deferred()
+        self.assertEqual(self.client.delete(f'/api/voices/history/{response.data["id"]}/').status_code, 204)
+
+        pool.run()
+        self.assertFalse(GeneratedSpeech.objects.exists())
+        self.assertEqual([files for _, _, files in os.walk(self.media_root) if files], [])
+
+    def test_sweeper_refunds_and_removes_lost_jobs(self):
+        response, pool = self._post_deferred()
+        call_command('sweep_segmented', stdout=io.StringIO())
+        self.assertTrue(GeneratedSpeech.objects.exists())
+
+        GeneratedSpeech.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        call_command('sweep_segmented', stdout=io.StringIO())
+        self.assertFalse(GeneratedSpeech.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 10)
+        self.assertEqual([files for _, _, files in os.walk(self.media_root) if files], [])
+
+        # A job that was only late finds its row gone and leaves nothing behind
+        pool.run()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, 10)
+        self.assertEqual([files for _, _, files in os.walk(self.media_root) if files], [])
@@ -0,0 +1,145 @@
+"""
+Resumable, chunked uploads for voice clone samples.
+
+1. POST   /api/voices/clone-uploads/        {"filename", "size"} -> {"id", "offset": 0}
+2. PATCH  /api/voices/clone-uploads/<id>/   raw bytes, `Upload-Offset: <offset>`
+   (repeat until offset == size; after a dropped connection, GET the
+   upload to learn the offset and continue from there)
+3. POST   /api/voices/clones/               {"name", ..., "upload_id": "<id>"}
+
+Chunks are streamed from the request body straight into a staging file
+outside MEDIA_ROOT, so neither the chunk nor the whole sample is ever held
+in memory. When the clone is created the finished file is moved into
+storage and the process_clones worker takes over.
+"""
+
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .models import CloneUpload
+
+READ_SIZE = 64 * 1024
+SAMPLE_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.oga', '.opus', '.webm', '.m4a', '.mp4', '.aac', '.flac')
+
+
+class UploadError(Exception):
+    """Raised for a chunk that cannot be applied; `status` is the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class _StagedFile(File):
+    """Lets FileSystemStorage move the staged file into place instead of copying it."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def max_upload_bytes():
+    return getattr(settings, 'CLONE_UPLOAD_MAX_BYTES', 50 * 1024 * 1024)
+
+
+def max_chunk_bytes():
+    return getattr(settings, 'CLONE_UPLOAD_CHUNK_BYTES', 5 * 1024 * 1024)
+
+
+def staging_dir():
+    path = str(getattr(settings, 'CLONE_UPLOAD_STAGING_DIR', None) or os.path.join(settings.BASE_DIR, 'upload_staging'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def staging_path(upload):
+    return os.path.join(staging_dir(), f'{upload.id}.part')
+
+
+def validate_new_upload(filename, size):
+    if not filename.lower().endswith(SAMPLE_EXTENSIONS):
+        raise UploadError(f"Unsupported file type. Allowed: {', '.join(SAMPLE_EXTENSIONS)}")
+    if size <= 0:
+        raise UploadError('Upload size must be positive.')
+    if size > max_upload_bytes():
+        raise UploadError(f'Samples are limited to {max_upload_bytes()} bytes.', status=413)
+
+
+def start_upload(user, filename, size):
+    validate_new_upload(filename, size)
+    upload = CloneUpload.objects.create(user=user, filename=os.path.basename(filename), total_size=size)
+    open(staging_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload, stream, offset, length):
+    """
+    Append `length` bytes read from `stream` at `offset`.
+
+    The offset must equal the bytes already received, so a retried chunk
+    that already landed is rejected (409) rather than written twice.
+    """
+    if upload.status != 'uploading':
+        raise UploadError('Upload is already complete.', status=409)
+    if offset != upload.received_bytes:
+        raise UploadError(f'Expected offset {upload.received_bytes}.', status=409)
+    if length > max_chunk_bytes():
+        raise UploadError(f'Chunks are limited to {max_chunk_bytes()} bytes.', status=413)
+    if offset + length > upload.total_size:
+        raise UploadError('Chunk extends past the declared upload size.', status=413)
+
+    path = staging_path(upload)
+    written = 0
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(offset)
+        while written < length:
+            data = stream.read(min(READ_SIZE, length - written))
+            if not data:
+                break
+            f.write(data)
+            written += len(data)
+        # Drop anything a previously interrupted write left past the offset
+        f.truncate()
+
+    # Count only what actually arrived; the client resumes from here
+    upload.received_bytes = offset + written
+    if upload.received_bytes == upload.total_size:
+        upload.status = 'complete'
+    upload.save(update_fields=['received_bytes', 'status', 'updated_at'])
+    return upload
+
+
+def attach_to_clone(upload, voice_clone):
+    """Move a finished upload into storage as the clone's audio sample."""
+    path = staging_path(upload)
+    with open(path, 'rb') as f:
+        voice_clone.audio_sample.save(upload.filename, _StagedFile(f), save=False)
+    if os.path.exists(path):
+        # Storages that copy rather than move leave the staged file behind
+        os.remove(path)
+    upload.status = 'consumed'
+    upload.save(update_fields=['status', 'updated_at'])
+
+
+def discard(upload):
+    try:
+        os.remove(staging_path(upload))
+    except OSError:
+        pass
+    upload.delete()
+
+
+def prune_stale_uploads(max_age_hours=24):
+    """Delete uploads (and their staged bytes) abandoned for `max_age_hours`."""
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    stale = CloneUpload.objects.filter(updated_at__lt=cutoff).exclude(status='consumed')
+    count = 0
+    for upload in stale:
+        discard(upload)
+        count += 1
+    CloneUpload.objects.filter(status='consumed', updated_at__lt=cutoff).delete()
+    return count
+
@@ -1,338 +1,781 @@
-from rest_framework import viewsets, generics, status
-from rest_framework.decorators import action
-from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count
-from django.utils import timezone
-from django.conf import settings
-from datetime import timedelta
-
-from apps.users.views import IsAdminPermission
-from .models import VoiceProfile, VoiceClone, GeneratedSpeech
-from .serializers import (
-    VoiceProfileSerializer,
-    VoiceCloneSerializer,
-    VoiceCloneCreateSerializer,
-    GeneratedSpeechSerializer,
-    GenerateSpeechSerializer,
-    TranslateTextSerializer,
-    AdminVoiceProfileSerializer,
-    AdminVoiceCloneSerializer,
-    AdminGeneratedSpeechSerializer,
-)
-from .services import voice_service
-from .translation import translation_service
-
-
-class VoiceProfileViewSet(viewsets.ReadOnlyModelViewSet):
-    """List and retrieve voice profiles (read-only for users)."""
-    
-    queryset = VoiceProfile.objects.filter(is_active=True)
-    serializer_class = VoiceProfileSerializer
-    permission_classes = [IsAuthenticated]
-    pagination_class = None  # Return all profiles without pagination
-    filterset_fields = ['gender', 'emotion', 'language', 'is_premium']
-    search_fields = ['name', 'description']
-    ordering_fields = ['name', 'created_at']
-
-
-class VoiceCloneViewSet(viewsets.ModelViewSet):
-    """CRUD operations for user's voice clones."""
-    
-    serializer_class = VoiceCloneSerializer
-    permission_classes = [IsAuthenticated]
-    
-    def get_queryset(self):
-        return VoiceClone.objects.filter(user=self.request.user)
-    
-    def get_serializer_class(self):
-        if self.action == 'create':
-            return VoiceCloneCreateSerializer
-        return VoiceCloneSerializer
-    
-    def perform_create(self, serializer):
-        print(f"DEBUG: Validated Data: {serializer.validated_data}")
-        voice_clone = serializer.save()
-        # Process the voice clone (in background in production)
-        voice_service.process_voice_clone(voice_clone)
-
-
-class GenerateSpeechView(generics.CreateAPIView):
-    """Generate speech from text."""
-    
-    serializer_class = GenerateSpeechSerializer
-    permission_classes = [IsAuthenticated]
-    
-    def create(self, request, *args, **kwargs):
-        from django.db.models import F
-        from apps.users.models import User # Ensure User is imported
-        import traceback
-
-        print(f"DEBUG: Generate request for user {request.user.email}")
-
-        try:
-            serializer = self.get_serializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
-
-            is_preview = serializer.validated_data.get('is_preview', False)
-            
-            if is_preview:
-                if len(serializer.validated_data['text']) > 200:
-                    return Response(
-                        {'error': 'Preview text must be 200 characters or less.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                CREDIT_COST = 0
-            else:
-                CREDIT_COST = 5
-            
-            print(f"DEBUG: Attempting to deduct credits (Cost: {CREDIT_COST})...")
-            
-            if CREDIT_COST > 0:
-                updated = User.objects.filter(
-                    id=request.user.id, 
-                    credits__gte=CREDIT_COST
-                ).update(credits=F('credits') - CREDIT_COST)
-
-                if updated == 0:
-                    print("DEBUG: Insufficient credits")
-                    return Response(
-                        {'error': 'Insufficient credits. Please recharge.'},
-                        status=status.HTTP_402_PAYMENT_REQUIRED
-                    )
-                print("DEBUG: Credits deducted.")
-            
-            request.user.refresh_from_db()
-            balance_after = request.user.credits
-            print(f"DEBUG: New Balance: {balance_after}")
-
-            voice_profile = None
-            voice_clone = None
-            
-            if serializer.validated_data.get('voice_profile_id'):
-                try:
-                    voice_profile = VoiceProfile.objects.get(
-                        id=serializer.validated_data['voice_profile_id'],
-                        is_active=True
-                    )
-                except VoiceProfile.DoesNotExist:
-                    print("DEBUG: Voice Profile not found")
-                    User.objects.filter(id=request.user.id).update(credits=F('credits') + CREDIT_COST)
-                    return Response(
-                        {'error': 'Voice profile not found'},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-            
-            if serializer.validated_data.get('voice_clone_id'):
-                try:
-                    voice_clone = VoiceClone.objects.get(
-                        id=serializer.validated_data['voice_clone_id'],
-                        user=request.user,
-                        is_active=True,
-                        status='ready'
-                    )
-                except VoiceClone.DoesNotExist:
-                    print("DEBUG: Voice Clone not found")
-                    User.objects.filter(id=request.user.id).update(credits=F('credits') + CREDIT_COST)
-                    return Response(
-                        {'error': 'Voice clone not found or not ready'},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-            
-            print(f"DEBUG: Generating speech for text: {serializer.validated_data['text'][:20]}...")
-            # Generate speech
-            result = voice_service.generate_speech(
-                text=serializer.validated_data['text'],
-                voice_profile=voice_profile,
-                voice_clone=voice_clone
-            )
-            print(f"DEBUG: Generation result: {result}")
-            
-            # For preview/demo: return audio URL directly, no DB save
-            if is_preview:
-                # Build proper media URL path (e.g. /media/generated_audio/file.mp3)
-                audio_url = f"{settings.MEDIA_URL}{result['audio_path']}"
-                return Response({
-                    'audio_file': audio_url,
-                    'duration_seconds': result['duration'],
-                    'is_preview': True,
-                }, status=status.HTTP_200_OK)
-            
-            # Save generated speech record (only for non-preview)
-            generated = GeneratedSpeech.objects.create(
-                user=request.user,
-                voice_profile=voice_profile,
-                voice_clone=voice_clone,
-                input_text=serializer.validated_data['text'],
-                audio_file=result['audio_path'],
-                duration_seconds=result['duration'],
-                credits_used=CREDIT_COST,
-                balance_after=balance_after
-            )
-            print("DEBUG: Record saved successfully")
-            
-            return Response(
-                GeneratedSpeechSerializer(generated, context={'request': request}).data,
-                status=status.HTTP_201_CREATED
-            )
-            
-        except Exception as e:
-            print(f"CRITICAL ERROR in GenerateSpeechView: {e}")
-            traceback.print_exc()
-            # Atomic Refund if generation fails
-            User.objects.filter(id=request.user.id).update(credits=F('credits') + CREDIT_COST)
-            return Response(
-                {'error': f'Generation failed: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-
-class TranslateTextView(generics.CreateAPIView):
-    """Translate text to target language."""
-    
-    serializer_class = TranslateTextSerializer
-    permission_classes = [IsAuthenticated]
-    
-    def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        
-        text = serializer.validated_data['text']
-        target_language = serializer.validated_data['target_language']
-        source_language = serializer.validated_data.get('source_language', 'auto')
-        
-        # Perform translation
-        result = translation_service.translate(text, target_language, source_language)
-        
-        if result['success']:
-            return Response({
-                'original_text': text,
-                'translated_text': result['translated_text'],
-                'source_language': result['source_language'],
-                'target_language': result['target_language'],
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                'original_text': text,
-                'translated_text': result['translated_text'],
-                'source_language': result['source_language'],
-                'target_language': result['target_language'],
-                'error': result['error'],
-            }, status=status.HTTP_200_OK)  # Still return 200 with partial data
-
-
-class SpeechHistoryViewSet(viewsets.ModelViewSet):
-    """User's generated speech history."""
-    
-    serializer_class = GeneratedSpeechSerializer
-    permission_classes = [IsAuthenticated]
-    ordering_fields = ['created_at']
-    http_method_names = ['get', 'delete', 'head', 'options']
-    
-    def get_queryset(self):
-        return GeneratedSpeech.objects.filter(user=self.request.user)
-
-
-# Admin ViewSets
-
-class AdminVoiceProfileViewSet(viewsets.ModelViewSet):
-    """Admin CRUD for voice profiles."""
-    
-    queryset = VoiceProfile.objects.all()
-    serializer_class = AdminVoiceProfileSerializer
-    permission_classes = [IsAdminPermission]
-    filterset_fields = ['gender', 'emotion', 'language', 'is_active', 'is_premium']
-    search_fields = ['name', 'description']
-    ordering_fields = ['name', 'created_at']
-
-
-class AdminVoiceCloneViewSet(viewsets.ModelViewSet):
-    """Admin CRUD for voice clones."""
-    
-    queryset = VoiceClone.objects.all()
-    serializer_class = AdminVoiceCloneSerializer
-    permission_classes = [IsAdminPermission]
-    filterset_fields = ['status', 'is_active']
-    search_fields = ['name', 'user__email']
-    ordering_fields = ['created_at']
-    
-    @action(detail=True, methods=['post'])
-    def approve(self, request, pk=None):
-        """Approve and activate a voice clone."""
-        clone = self.get_object()
-        clone.status = 'ready'
-        clone.is_active = True
-        clone.save()
-        return Response({'message': 'Voice clone approved'})
-    
-    @action(detail=True, methods=['post'])
-    def reject(self, request, pk=None):
-        """Reject a voice clone."""
-        clone = self.get_object()
-        clone.status = 'failed'
-        clone.is_active = False
-        clone.save()
-        return Response({'message': 'Voice clone rejected'})
-
-
-class AdminGeneratedSpeechViewSet(viewsets.ReadOnlyModelViewSet):
-    """Admin view for generated speeches."""
-    
-    queryset = GeneratedSpeech.objects.all()
-    serializer_class = AdminGeneratedSpeechSerializer
-    permission_classes = [IsAdminPermission]
-    filterset_fields = ['voice_profile', 'voice_clone']
-    search_fields = ['input_text', 'user__email']
-    ordering_fields = ['created_at']
-
-
-class AdminDashboardView(generics.GenericAPIView):
-    """Admin dashboard statistics."""
-    
-    permission_classes = [IsAdminPermission]
-    
-    def get(self, request):
-        today = timezone.now()
-        last_30_days = today - timedelta(days=30)
-        last_7_days = today - timedelta(days=7)
-        
-        # Voice profiles stats
-        total_profiles = VoiceProfile.objects.count()
-        active_profiles = VoiceProfile.objects.filter(is_active=True).count()
-        
-        # Voice clones stats
-        total_clones = VoiceClone.objects.count()
-        pending_clones = VoiceClone.objects.filter(status='pending').count()
-        ready_clones = VoiceClone.objects.filter(status='ready').count()
-        
-        # Generated speeches stats
-        total_generations = GeneratedSpeech.objects.count()
-        monthly_generations = GeneratedSpeech.objects.filter(
-            created_at__gte=last_30_days
-        ).count()
-        weekly_generations = GeneratedSpeech.objects.filter(
-            created_at__gte=last_7_days
-        ).count()
-        
-        # Most used voices
-        top_voices = VoiceProfile.objects.annotate(
-            usage_count=Count('generated_speeches')
-        ).order_by('-usage_count')[:5]
-        
-        return Response({
-            'voice_profiles': {
-                'total': total_profiles,
-                'active': active_profiles,
-            },
-            'voice_clones': {
-                'total': total_clones,
-                'pending': pending_clones,
-                'ready': ready_clones,
-            },
-            'generated_speeches': {
-                'total': total_generations,
-                'this_month': monthly_generations,
-                'this_week': weekly_generations,
-            },
-            'top_voices': VoiceProfileSerializer(top_voices, many=True).data,
-        })
+from rest_framework import viewsets, generics, mixins, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.conf import settings
+from contextlib import ExitStack
+from datetime import timedelta
+import logging
+import os
+
+from apps.users.authentication import invalidate_user
+from apps.users.views import IsAdminPermission
+from config import metrics, timing
+from config.pagination import CreatedAtCursorPagination
+from config.throttling import (
+    BulkGenerationRateThrottle, GenerationRateThrottle, PreviewRateThrottle, TranslateRateThrottle,
+    generation_slot,
+)
+from .models import VoiceProfile, VoiceClone, GeneratedSpeech, CloneUpload, Document
+from .serializers import (
+    VoiceProfileSerializer,
+    VoiceCloneSerializer,
+    VoiceCloneCreateSerializer,
+    CloneUploadSerializer,
+    GeneratedSpeechSerializer,
+    GenerateSpeechSerializer,
+    BulkGenerateSerializer,
+    DocumentSerializer,
+    DialogueSerializer,
+    PreviewFanoutSerializer,
+    DocumentRenderSerializer,
+    TranslateTextSerializer,
+    AdminVoiceProfileSerializer,
+    AdminVoiceCloneSerializer,
+    AdminGeneratedSpeechSerializer,
+)
+from . import audio_analysis, bulk, catalog, credits, hls, media, segments, subtitles, uploads, waveform
+from .services import voice_service, GENERATION_STAGE_SECONDS
+from .translation import translation_service
+
+logger = logging.getLogger(__name__)
+
+GENERATION_REFUNDS = metrics.counter(
+    'voiceai_generation_refunds_total', 'Credits refunded after a failed generation'
+)
+
+
+class VoiceProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """List and retrieve voice profiles (read-only for users)."""
+    
+    queryset = VoiceProfile.objects.filter(is_active=True)
+    serializer_class = VoiceProfileSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None  # Return all profiles without pagination
+    filterset_fields = ['gender', 'emotion', 'language', 'is_premium']
+    search_fields = ['name', 'description']
+    ordering_fields = ['name', 'created_at']
+    
+    def list(self, request, *args, **kwargs):
+        """Serve the catalog from cache, honoring If-None-Match / If-Modified-Since."""
+        entry = catalog.get_entry(request)
+        if entry is None:
+            entry = catalog.store_entry(request, super().list(request, *args, **kwargs).data)
+        
+        not_modified = get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified']
+        )
+        response = not_modified or Response(entry['data'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class VoiceCloneViewSet(viewsets.ModelViewSet):
+    """CRUD operations for user's voice clones."""
+    
+    serializer_class = VoiceCloneSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return VoiceClone.objects.filter(user=self.request.user)
+    
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return VoiceCloneCreateSerializer
+        return VoiceCloneSerializer
+    
+    def perform_create(self, serializer):
+        logger.debug('Creating voice clone %r', serializer.validated_data.get('name'))
+        # Saved as 'pending'; the process_clones worker validates and normalizes it
+        serializer.save()
+
+
+class CloneUploadViewSet(mixins.CreateModelMixin,
+                         mixins.RetrieveModelMixin,
+                         mixins.DestroyModelMixin,
+                         viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads of clone samples (see apps.voices.uploads).
+    
+    PATCH bodies are raw bytes and are streamed to disk without parsing.
+    """
+    
+    serializer_class = CloneUploadSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return CloneUpload.objects.filter(user=self.request.user)
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = uploads.start_upload(
+                request.user,
+                serializer.validated_data['filename'],
+                serializer.validated_data['total_size'],
+            )
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=e.status)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED)
+    
+    def partial_update(self, request, *args, **kwargs):
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'Upload-Offset and Content-Length headers are required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        with transaction.atomic():
+            # Row lock: two chunks for the same upload are applied one at a time
+            upload = self.get_queryset().select_for_update().filter(pk=kwargs['pk']).first()
+            if upload is None:
+                return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+            try:
+                uploads.append_chunk(upload, request.stream, offset, length)
+            except uploads.UploadError as e:
+                return Response(
+                    {'error': str(e), 'offset': upload.received_bytes},
+                    status=e.status
+                )
+        return Response(self.get_serializer(upload).data)
+    
+    def perform_destroy(self, instance):
+        uploads.discard(instance)
+
+
+class GenerateSpeechView(timing.TimedAuthenticationMixin, generics.CreateAPIView):
+    """Generate speech from text."""
+    
+    serializer_class = GenerateSpeechSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [GenerationRateThrottle]
+    
+    def post(self, request, *args, **kwargs):
+        # Cap concurrent generations per user so one account can't hold every worker.
+        # A segmented generation takes the slot over until its background job ends.
+        with ExitStack() as slot:
+            slot.enter_context(generation_slot(request.user.id))
+            self._slot = slot
+            return super().post(request, *args, **kwargs)
+    
+    def create(self, request, *args, **kwargs):
+        from django.db.models import F
+        from apps.users.models import User # Ensure User is imported
+
+        logger.debug('Generate request from user %s', request.user.id)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            is_preview = serializer.validated_data.get('is_preview', False)
+            
+            if is_preview:
+                if len(serializer.validated_data['text']) > 200:
+                    return Response(
+                        {'error': 'Preview text must be 200 characters or less.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                CREDIT_COST = 0
+            else:
+                CREDIT_COST = 5
+            
+            with GENERATION_STAGE_SECONDS.time(stage='credit_deduction'):
+                if CREDIT_COST > 0:
+                    updated = User.objects.filter(
+                        id=request.user.id, 
+                        credits__gte=CREDIT_COST
+                    ).update(credits=F('credits') - CREDIT_COST)
+
+                    if updated == 0:
+                        logger.info('Insufficient credits for user %s', request.user.id)
+                        return Response(
+                            {'error': 'Insufficient credits. Please recharge.'},
+                            status=status.HTTP_402_PAYMENT_REQUIRED
+                        )
+                    # Credits changed via update(), which skips the post_save signal
+                    invalidate_user(request.user.id)
+                    balance_after = User.objects.values_list('credits', flat=True).get(id=request.user.id)
+                else:
+                    balance_after = request.user.credits
+            logger.debug('Charged %s credits, balance now %s', CREDIT_COST, balance_after)
+
+            voice_profile = None
+            voice_clone = None
+            
+            with GENERATION_STAGE_SECONDS.time(stage='voice_lookup'):
+                if serializer.validated_data.get('voice_profile_id'):
+                    try:
+                        voice_profile = VoiceProfile.objects.get(
+                            id=serializer.validated_data['voice_profile_id'],
+                            is_active=True
+                        )
+                    except VoiceProfile.DoesNotExist:
+                        logger.info('Voice profile %s not found, refunding', serializer.validated_data['voice_profile_id'])
+                        User.objects.filter(id=request.user.id).update(credits=F('credits') + CREDIT_COST)
+                        invalidate_user(request.user.id)
+                        GENERATION_REFUNDS.inc()
+                        return Response(
+                            {'error': 'Voice profile not found'},
+                            status=status.HTTP_404_NOT_FOUND
+                        )
+
+                if serializer.validated_data.get('voice_clone_id'):
+                    try:
+                        voice_clone = VoiceClone.objects.get(
+                            id=serializer.validated_data['voice_clone_id'],
+                            user=request.user,
+                            is_active=True,
+                            status='ready'
+                        )
+                    except VoiceClone.DoesNotExist:
+                        logger.info('Voice clone %s not ready, refunding', serializer.validated_data['voice_clone_id'])
+                        User.objects.filter(id=request.user.id).update(credits=F('credits') + CREDIT_COST)
+                        invalidate_user(request.user.id)
+                        GENERATION_REFUNDS.inc()
+                        return Response(
+                            {'error': 'Voice clone not found or not ready'},
+                            status=status.HTTP_404_NOT_FOUND
+                        )
+            
+            if serializer.validated_data['segmented']:
+                # Answer right away; the playlist fills up while synthesis runs
+                audio_name, playlist_name = hls.new_names()
+                generated = GeneratedSpeech.objects.create(
+                    user=request.user,
+                    voice_profile=voice_profile,
+                    voice_clone=voice_clone,
+                    input_text=serializer.validated_data['text'],
+                    audio_file=audio_name,
+                    hls_playlist=playlist_name,
+                    hls_state='pending',
+                    credits_used=CREDIT_COST,
+                    balance_after=balance_after,
+                )
+                job_slot = self._slot.pop_all()
+                try:
+                    hls.start(
+                        generated,
+                        serializer.validated_data['text'],
+                        voice_service.get_voice_shortname(voice_profile, voice_clone),
+                        cleanup=job_slot.close,
+                    )
+                except BaseException as e:
+                    job_slot.close()
+                    generated.delete()
+                    hls.discard(playlist_name)
+                    if not isinstance(e, hls.QueueFull):
+                        raise
+                    credits.refund(request.user.id, CREDIT_COST)
+                    GENERATION_REFUNDS.inc()
+                    return Response(
+                        {'error': 'Too many segmented generations are queued. Please try again shortly.'},
+                        status=status.HTTP_429_TOO_MANY_REQUESTS
+                    )
+                data = GeneratedSpeechSerializer(generated, context={'request': request}).data
+                return Response(data, status=status.HTTP_202_ACCEPTED)
+            
+            logger.debug('Generating speech for %d characters', len(serializer.validated_data['text']))
+            # Generate speech
+            result = voice_service.generate_speech(
+                text=serializer.validated_data['text'],
+                voice_profile=voice_profile,
+                voice_clone=voice_clone,
+                output_format=serializer.validated_data['output_format'],
+            )
+            logger.debug('Generation result: %s', result)
+            
+            # For preview/demo: return audio URL directly, no DB save
+            if is_preview:
+                # Build proper media URL path (e.g. /media/generated_audio/file.mp3)
+                audio_url = f"{settings.MEDIA_URL}{result['audio_path']}"
+                return Response({
+                    'audio_file': audio_url,
+                    'duration_seconds': result['duration'],
+                    'output_format': result['output_format'],
+                    'word_timings': subtitles.timings(serializer.validated_data['text'], result['word_timings']),
+                    'waveform': result['waveform'],
+                    'is_preview': True,
+                }, status=status.HTTP_200_OK)
+            
+            # Save generated speech record (only for non-preview)
+            with GENERATION_STAGE_SECONDS.time(stage='record_insert'):
+                generated = GeneratedSpeech.objects.create(
+                    user=request.user,
+                    voice_profile=voice_profile,
+                    voice_clone=voice_clone,
+                    input_text=serializer.validated_data['text'],
+                    audio_file=result['audio_path'],
+                    duration_seconds=result['duration'],
+                    word_timings=result['word_timings'] or None,
+                    credits_used=CREDIT_COST,
+                    balance_after=balance_after,
+                    waveform=result['waveform'],
+                    **result['metadata'],
+                )
+            logger.debug('Saved generated speech %s', generated.id)
+            
+            with GENERATION_STAGE_SECONDS.time(stage='serialize'), timing.span('serialize'):
+                data = GeneratedSpeechSerializer(generated, context={'request': request}).data
+            return Response(data, status=status.HTTP_201_CREATED)
+            
+        except Exception as e:
+            logger.exception('Speech generation failed, refunding %s credits', CREDIT_COST)
+            # Atomic Refund if generation fails
+            User.objects.filter(id=request.user.id).update(credits=F('credits') + CREDIT_COST)
+            invalidate_user(request.user.id)
+            GENERATION_REFUNDS.inc()
+            return Response(
+                {'error': f'Generation failed: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class BulkGenerateView(timing.TimedAuthenticationMixin, generics.CreateAPIView):
+    """
+    Generate many prompts in one request, streamed back as a ZIP archive.
+
+    Identical lines are synthesized once. Credits for all unique lines are
+    charged together before streaming starts; failed lines are refunded
+    when the archive is finished (see bulk.BulkArchive).
+    """
+    
+    serializer_class = BulkGenerateSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [BulkGenerationRateThrottle]
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        output_format = serializer.validated_data['output_format']
+        jobs = bulk.plan(items, output_format)
+        
+        # The slot is held until the archive is closed, not just for this method
+        slot = ExitStack()
+        slot.enter_context(generation_slot(request.user.id))
+        cost = len(jobs) * credits.CREDIT_COST
+        try:
+            credits.charge(request.user.id, cost)
+        except credits.InsufficientCredits as e:
+            slot.close()
+            return Response({'error': str(e)}, status=status.HTTP_402_PAYMENT_REQUIRED)
+        logger.info('Bulk generation: %d items, %d unique, %d credits', len(items), len(jobs), cost)
+        archive = bulk.BulkArchive(request.user, items, jobs, output_format, cleanup=slot.close)
+        
+        response = StreamingHttpResponse(archive, content_type='application/zip')
+        stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+        response['Content-Disposition'] = f'attachment; filename="speech-bulk-{stamp}.zip"'
+        return response
+
+
+class PreviewFanoutView(timing.TimedAuthenticationMixin, generics.CreateAPIView):
+    """
+    Preview one sentence in several voices with a single request.
+    
+    Previews are free cached segments: voices are synthesized concurrently
+    on one event loop, and a sentence already previewed in a voice is
+    served from the cache. Each voice that has to be synthesized costs one
+    'preview' throttle token, like a single preview would.
+    """
+    
+    serializer_class = PreviewFanoutSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [PreviewRateThrottle]
+    
+    def post(self, request, *args, **kwargs):
+        with generation_slot(request.user.id):
+            return super().post(request, *args, **kwargs)
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        text = serializer.validated_data['text']
+        profiles = serializer.validated_data['voice_profile_ids']
+        
+        plan = segments.SegmentPlan([
+            (voice_service.get_voice_shortname(profile=profile), text) for profile in profiles
+        ])
+        cached = set(plan.segments)
+        # The request itself took the first token
+        PreviewRateThrottle().consume(request, len(plan.missing) - 1)
+        failed = set(plan.synthesize())
+        
+        previews = []
+        for profile, key in zip(profiles, plan.keys):
+            if key in failed:
+                previews.append({'voice_profile_id': profile.id, 'error': 'Preview could not be generated.'})
+                continue
+            segment = plan.segments[key]
+            previews.append({
+                'voice_profile_id': profile.id,
+                'audio_file': f'{settings.MEDIA_URL}{segment.audio_file.name}',
+                'duration_seconds': round(segment.duration_seconds, 2),
+                'cached': key in cached,
+            })
+        return Response({'text': text, 'previews': previews}, status=status.HTTP_200_OK)
+
+
+class DialogueView(timing.TimedAuthenticationMixin, generics.CreateAPIView):
+    """
+    Render a multi-speaker conversation into one audio file.
+    
+    Lines are cached segments (see segments.py): lines not heard before are
+    synthesized concurrently and charged, repeated ones are reused for free.
+    """
+    
+    serializer_class = DialogueSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [GenerationRateThrottle]
+    
+    def post(self, request, *args, **kwargs):
+        with generation_slot(request.user.id):
+            return super().post(request, *args, **kwargs)
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = serializer.validated_data['lines']
+        gap = serializer.validated_data['gap_ms']
+        shortnames = {
+            name: voice_service.get_voice_shortname(profile, clone)
+            for name, (profile, clone) in serializer.validated_data['voices'].items()
+        }
+        audio_name = media.new_name('generated_audio', 'mp3')
+        
+        try:
+            layout, duration_ms, cost = segments.render(
+                request.user.id,
+                [(shortnames[line['speaker']], line['text']) for line in lines],
+                os.path.join(voice_service.media_root, audio_name),
+                [line.get('pause_ms', gap if index else 0) for index, line in enumerate(lines)],
+            )
+        except credits.InsufficientCredits as e:
+            return Response({'error': str(e)}, status=status.HTTP_402_PAYMENT_REQUIRED)
+        except segments.SegmentError as e:
+            return Response(
+                {'error': f'{len(e.failed)} line(s) could not be synthesized. Please try again.'},
+                status=status.HTTP_502_BAD_GATEWAY
+            )
+        
+        try:
+            generated = GeneratedSpeech.objects.create(
+                user=request.user,
+                input_text='\n'.join(f"{line['speaker']}: {line['text']}" for line in lines),
+                audio_file=audio_name,
+                duration_seconds=round(duration_ms / 1000, 2),
+                credits_used=cost,
+                balance_after=credits.balance(request.user.id),
+                waveform=waveform.compute(os.path.join(voice_service.media_root, audio_name)),
+                **media.describe(os.path.join(voice_service.media_root, audio_name)),
+            )
+        except BaseException:
+            credits.refund(request.user.id, cost)
+            voice_service.delete_media(audio_name)
+            raise
+        logger.info('Rendered dialogue %s: %d lines, %d credits', generated.id, len(lines), cost)
+        
+        data = GeneratedSpeechSerializer(generated, context={'request': request}).data
+        data['lines_synthesized'] = cost // credits.CREDIT_COST
+        data['lines'] = [
+            {'speaker': line['speaker'], 'start_ms': entry['start_ms'], 'duration_ms': entry['duration_ms']}
+            for line, entry in zip(lines, layout)
+        ]
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class TranslateTextView(timing.TimedAuthenticationMixin, generics.CreateAPIView):
+    """Translate text to target language."""
+    
+    serializer_class = TranslateTextSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [TranslateRateThrottle]
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        text = serializer.validated_data['text']
+        target_language = serializer.validated_data['target_language']
+        source_language = serializer.validated_data.get('source_language', 'auto')
+        
+        # Perform translation
+        with timing.span('translate'):
+            result = translation_service.translate(text, target_language, source_language)
+        
+        if result['success']:
+            return Response({
+                'original_text': text,
+                'translated_text': result['translated_text'],
+                'source_language': result['source_language'],
+                'target_language': result['target_language'],
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({
+                'original_text': text,
+                'translated_text': result['translated_text'],
+                'source_language': result['source_language'],
+                'target_language': result['target_language'],
+                'error': result['error'],
+            }, status=status.HTTP_200_OK)  # Still return 200 with partial data
+
+
+class SpeechHistoryViewSet(viewsets.ModelViewSet):
+    """User's generated speech history."""
+    
+    serializer_class = GeneratedSpeechSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    ordering_fields = ['created_at']
+    http_method_names = ['get', 'delete', 'head', 'options']
+    
+    def get_queryset(self):
+        return GeneratedSpeech.objects.filter(user=self.request.user).select_related(
+            'voice_profile', 'voice_clone'
+        )
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        # An unfinished segmented generation's job removes its files itself (see hls.py)
+        if instance.hls_state == 'complete':
+            hls.discard(instance.hls_playlist.name)
+
+    def _word_timings(self):
+        speech = self.get_object()
+        if not speech.word_timings:
+            raise NotFound('No word timings were recorded for this speech.')
+        return speech
+
+    @action(detail=True, methods=['get'], url_path='waveform')
+    def waveform_peaks(self, request, pk=None):
+        """Waveform peaks at ?buckets= (one of waveform.RESOLUTIONS; default the finest)."""
+        speech = self.get_object()
+        if not speech.waveform:
+            raise NotFound('No waveform was recorded for this speech.')
+        buckets = request.query_params.get('buckets', str(waveform.RESOLUTIONS[-1]))
+        if buckets not in speech.waveform['peaks']:
+            return Response(
+                {'error': f'buckets must be one of {", ".join(map(str, waveform.RESOLUTIONS))}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({
+            'duration_ms': speech.waveform['duration_ms'],
+            'buckets': int(buckets),
+            'peaks': speech.waveform['peaks'][buckets],
+        })
+
+    @action(detail=True, methods=['get'])
+    def timings(self, request, pk=None):
+        """Per-word timings with character offsets into the input text."""
+        speech = self._word_timings()
+        return Response({
+            'duration_seconds': speech.duration_seconds,
+            'words': subtitles.timings(speech.input_text, speech.word_timings),
+        })
+
+    @action(detail=True, methods=['get'], url_path='subtitles/(?P<subtitle_format>srt|vtt)')
+    def download_subtitles(self, request, pk=None, subtitle_format=None):
+        """Download the speech's subtitles as SubRip (.srt) or WebVTT (.vtt)."""
+        speech = self._word_timings()
+        if subtitle_format == 'srt':
+            body, content_type = subtitles.to_srt(speech.input_text, speech.word_timings), 'application/x-subrip'
+        else:
+            body, content_type = subtitles.to_vtt(speech.input_text, speech.word_timings), 'text/vtt'
+        response = HttpResponse(body, content_type=f'{content_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="speech-{speech.id}.{subtitle_format}"'
+        return response
+
+
+class DocumentViewSet(viewsets.ModelViewSet):
+    """
+    Long-form documents, rendered paragraph by paragraph.
+    
+    Rendering reuses every paragraph already synthesized for the same voice
+    (see segments.py), so after an edit only the changed paragraphs are
+    synthesized and charged.
+    """
+    
+    serializer_class = DocumentSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return Document.objects.filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+    
+    def perform_destroy(self, instance):
+        if instance.audio_file:
+            voice_service.delete_media(instance.audio_file.name)
+        instance.delete()
+    
+    @action(detail=True, methods=['post'], url_path='render', throttle_classes=[GenerationRateThrottle])
+    def render_audio(self, request, pk=None):
+        document = self.get_object()
+        options = DocumentRenderSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        if not document.voice_profile and not document.voice_clone:
+            return Response({'error': 'The document has no voice.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        voice_shortname = voice_service.get_voice_shortname(document.voice_profile, document.voice_clone)
+        paragraphs = segments.split_paragraphs(document.text)
+        gap = options.validated_data['paragraph_gap_ms']
+        audio_name = media.new_name('documents', 'mp3')
+        
+        with generation_slot(request.user.id):
+            try:
+                layout, duration_ms, cost = segments.render(
+                    request.user.id,
+                    [(voice_shortname, paragraph) for paragraph in paragraphs],
+                    os.path.join(voice_service.media_root, audio_name),
+                    [0] + [gap] * (len(paragraphs) - 1),
+                )
+            except credits.InsufficientCredits as e:
+                return Response({'error': str(e)}, status=status.HTTP_402_PAYMENT_REQUIRED)
+            except segments.SegmentError as e:
+                return Response(
+                    {'error': f'{len(e.failed)} paragraph(s) could not be synthesized. Please try again.'},
+                    status=status.HTTP_502_BAD_GATEWAY
+                )
+        
+        previous = document.audio_file.name if document.audio_file else None
+        document.audio_file = audio_name
+        document.duration_seconds = round(duration_ms / 1000, 2)
+        document.segments = layout
+        document.rendered_at = timezone.now()
+        try:
+            document.save(update_fields=['audio_file', 'duration_seconds', 'segments', 'rendered_at', 'updated_at'])
+        except BaseException:
+            credits.refund(request.user.id, cost)
+            voice_service.delete_media(audio_name)
+            raise
+        if previous:
+            voice_service.delete_media(previous)
+        logger.info('Rendered document %s: %d paragraphs, %d credits', document.id, len(paragraphs), cost)
+        
+        data = DocumentSerializer(document, context={'request': request}).data
+        data['credits_used'] = cost
+        data['paragraphs_synthesized'] = cost // credits.CREDIT_COST
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# Admin ViewSets
+
+class AdminVoiceProfileViewSet(viewsets.ModelViewSet):
+    """Admin CRUD for voice profiles."""
+    
+    queryset = VoiceProfile.objects.all()
+    serializer_class = AdminVoiceProfileSerializer
+    permission_classes = [IsAdminPermission]
+    filterset_fields = ['gender', 'emotion', 'language', 'is_active', 'is_premium']
+    search_fields = ['name', 'description']
+    ordering_fields = ['name', 'created_at']
+
+
+class AdminVoiceCloneViewSet(viewsets.ModelViewSet):
+    """Admin CRUD for voice clones."""
+    
+    queryset = VoiceClone.objects.all()
+    serializer_class = AdminVoiceCloneSerializer
+    permission_classes = [IsAdminPermission]
+    filterset_fields = ['status', 'is_active']
+    search_fields = ['name', 'user__email']
+    ordering_fields = ['created_at', 'sample_duration_seconds', 'loudness_dbfs', 'silence_ratio', 'clipping_ratio']
+    
+    @action(detail=True, methods=['post'])
+    def approve(self, request, pk=None):
+        """Approve and activate a voice clone."""
+        clone = self.get_object()
+        clone.status = 'ready'
+        clone.is_active = True
+        clone.save()
+        analysis = clone.analysis()
+        return Response({
+            'message': 'Voice clone approved',
+            'analysis': analysis,
+            'warnings': audio_analysis.check_sample(analysis) if analysis else [],
+        })
+    
+    @action(detail=True, methods=['post'])
+    def reject(self, request, pk=None):
+        """Reject a voice clone."""
+        clone = self.get_object()
+        clone.status = 'failed'
+        clone.is_active = False
+        clone.save()
+        return Response({'message': 'Voice clone rejected'})
+
+
+class AdminGeneratedSpeechViewSet(viewsets.ReadOnlyModelViewSet):
+    """Admin view for generated speeches."""
+    
+    queryset = GeneratedSpeech.objects.select_related('user', 'voice_profile', 'voice_clone')
+    serializer_class = AdminGeneratedSpeechSerializer
+    permission_classes = [IsAdminPermission]
+    pagination_class = CreatedAtCursorPagination
+    filterset_fields = ['voice_profile', 'voice_clone']
+    search_fields = ['input_text', 'user__email']
+    ordering_fields = ['created_at']
+
+
+class AdminDashboardView(generics.GenericAPIView):
+    """Admin dashboard statistics."""
+    
+    permission_classes = [IsAdminPermission]
+    
+    def get(self, request):
+        today = timezone.now()
+        last_30_days = today - timedelta(days=30)
+        last_7_days = today - timedelta(days=7)
+        
+        # Voice profiles stats
+        total_profiles = VoiceProfile.objects.count()
+        active_profiles = VoiceProfile.objects.filter(is_active=True).count()
+        
+        # Voice clones stats
+        total_clones = VoiceClone.objects.count()
+        pending_clones = VoiceClone.objects.filter(status='pending').count()
+        ready_clones = VoiceClone.objects.filter(status='ready').count()
+        
+        # Generated speeches stats
+        total_generations = GeneratedSpeech.objects.count()
+        monthly_generations = GeneratedSpeech.objects.filter(
+            created_at__gte=last_30_days
+        ).count()
+        weekly_generations = GeneratedSpeech.objects.filter(
+            created_at__gte=last_7_days
+        ).count()
+        
+        # Most used voices
+        top_voices = VoiceProfile.objects.annotate(
+            usage_count=Count('generated_speeches')
+        ).order_by('-usage_count')[:5]
+        
+        return Response({
+            'voice_profiles': {
+                'total': total_profiles,
+                'active': active_profiles,
+            },
+            'voice_clones': {
+                'total': total_clones,
+                'pending': pending_clones,
+                'ready': ready_clones,
+            },
+            'generated_speeches': {
+                'total': total_generations,
+                'this_month': monthly_generations,
+                'this_week': weekly_generations,
+            },
+            'top_voices': VoiceProfileSerializer(top_voices, many=True).data,
+        })
@@ -0,0 +1,193 @@
+"""
+Acoustic feature vectors and nearest-voice matching.
+
+Each catalog voice (from VoiceProfile.sample_audio) and each clone sample
+gets a small vector, computed once and stored as float32 bytes:
+
+- pitch: median F0 (octaves relative to 100 Hz), F0 spread (inter-quartile
+  range in octaves) and the share of voiced frames
+- spectral envelope: mean log energy in ENVELOPE_BANDS log-spaced bands,
+  level-normalized so recording volume does not matter
+
+Audio is read block by block (audio_analysis.iter_blocks); per-frame
+spectra, autocorrelation pitch estimates and band energies are computed
+for a whole block at once with NumPy, and only histograms and running
+sums are kept between blocks.
+
+match_profile() compares a clone's vector against the standardized
+catalog matrix, which is built once per catalog version and kept in
+process memory, so a lookup is a single vectorized distance computation.
+"""
+
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from . import audio_analysis, catalog
+
+FRAME_SECONDS = 0.04
+HOP_SECONDS = 0.02
+MIN_F0 = 60.0
+MAX_F0 = 400.0
+VOICING_THRESHOLD = 0.45
+ENVELOPE_BANDS = 16
+ENVELOPE_RANGE = (100.0, 8000.0)
+# Half-semitone pitch histogram between MIN_F0 and MAX_F0
+PITCH_BINS = int(np.ceil(24 * np.log2(MAX_F0 / MIN_F0)))
+FEATURE_SIZE = 3 + ENVELOPE_BANDS
+
+
+def _band_matrix(n_bins, sample_rate, n_fft):
+    """(n_bins, ENVELOPE_BANDS) 0/1 matrix summing FFT bins into log-spaced bands."""
+    high = min(ENVELOPE_RANGE[1], sample_rate / 2)
+    edges = np.geomspace(ENVELOPE_RANGE[0], high, ENVELOPE_BANDS + 1)
+    freqs = np.arange(n_bins) * sample_rate / n_fft
+    band = np.searchsorted(edges, freqs, side='right') - 1
+    matrix = np.zeros((n_bins, ENVELOPE_BANDS), dtype=np.float32)
+    inside = (band >= 0) & (band < ENVELOPE_BANDS)
+    matrix[np.nonzero(inside)[0], band[inside]] = 1.0
+    return matrix
+
+
+def _quantile(histogram, q):
+    cumulative = np.cumsum(histogram)
+    index = int(np.searchsorted(cumulative, q * cumulative[-1]))
+    # Bin centre, in octaves above MIN_F0
+    return (min(index, PITCH_BINS - 1) + 0.5) / 24
+
+
+def extract_features(path):
+    """
+    Feature vector (float32, FEATURE_SIZE) for the audio file at `path`.
+
+    Raises audio_analysis.AudioDecodeError if the file cannot be decoded or
+    contains no usable speech.
+    """
+    sample_rate, blocks = audio_analysis.iter_blocks(path)
+    frame = int(sample_rate * FRAME_SECONDS)
+    hop = int(sample_rate * HOP_SECONDS)
+    n_fft = 2 * frame  # zero-padded so the autocorrelation is linear
+    window = np.hanning(frame).astype(np.float32)
+    bands = _band_matrix(n_fft // 2 + 1, sample_rate, n_fft)
+    min_lag = int(sample_rate / MAX_F0)
+    max_lag = min(int(sample_rate / MIN_F0), frame - 1)
+    silence_power = 10 ** (audio_analysis.SILENCE_DBFS / 10)
+
+    pitch_histogram = np.zeros(PITCH_BINS, dtype=np.int64)
+    envelope_sum = np.zeros(ENVELOPE_BANDS, dtype=np.float64)
+    speech_frames = 0
+    voiced_frames = 0
+    carry = np.empty(0, dtype=np.float32)
+
+    for block in blocks:
+        samples = np.concatenate((carry, block)) if len(carry) else block
+        if len(samples) < frame:
+            carry = samples
+            continue
+        frames = sliding_window_view(samples, frame)[::hop]
+        carry = samples[len(frames) * hop:]
+
+        loud = np.mean(np.square(frames), axis=1) >= silence_power
+        if not loud.any():
+            continue
+        spectrum = np.fft.rfft(frames[loud] * window, n=n_fft)
+        power = np.square(np.abs(spectrum)).astype(np.float32)
+
+        envelope_sum += np.log10(power @ bands + 1e-10).sum(axis=0)
+        speech_frames += len(power)
+
+        autocorrelation = np.fft.irfft(power, n=n_fft)[:, :max_lag + 1]
+        lags = np.argmax(autocorrelation[:, min_lag:], axis=1) + min_lag
+        strength = autocorrelation[np.arange(len(lags)), lags] / np.maximum(autocorrelation[:, 0], 1e-10)
+        voiced = strength >= VOICING_THRESHOLD
+        voiced_frames += int(voiced.sum())
+        f0 = sample_rate / lags[voiced]
+        bins = np.floor(24 * np.log2(f0 / MIN_F0)).astype(np.int64)
+        pitch_histogram += np.bincount(np.clip(bins, 0, PITCH_BINS - 1), minlength=PITCH_BINS)
+
+    if speech_frames == 0 or voiced_frames == 0:
+        raise audio_analysis.AudioDecodeError('No voiced speech found')
+
+    offset = np.log2(MIN_F0 / 100.0)
+    median = _quantile(pitch_histogram, 0.5) + offset
+    spread = _quantile(pitch_histogram, 0.75) - _quantile(pitch_histogram, 0.25)
+    envelope = envelope_sum / speech_frames
+    envelope -= envelope.mean()
+    return np.concatenate((
+        [median, spread, voiced_frames / speech_frames], envelope
+    )).astype(np.float32)
+
+
+def encode(vector):
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode(data):
+    if not data:
+        return None
+    vector = np.frombuffer(bytes(data), dtype=np.float32)
+    return vector if len(vector) == FEATURE_SIZE else None
+
+
+class VoiceIndex:
+    """Standardized catalog feature matrix for nearest-neighbour lookups."""
+
+    def __init__(self, profiles):
+        self.profiles = []
+        vectors = []
+        for profile in profiles:
+            vector = decode(profile.acoustic_features)
+            if vector is not None:
+                self.profiles.append(profile)
+                vectors.append(vector)
+        self.languages = np.array([p.language for p in self.profiles])
+        if vectors:
+            matrix = np.vstack(vectors)
+            self.mean = matrix.mean(axis=0)
+            std = matrix.std(axis=0)
+            self.scale = np.where(std > 1e-6, std, 1.0)
+            self.matrix = (matrix - self.mean) / self.scale
+        else:
+            self.matrix = None
+
+    def nearest(self, vector, language=None):
+        """The closest profile, preferring ones in `language`; None if empty."""
+        if self.matrix is None:
+            return None
+        query = (vector - self.mean) / self.scale
+        distances = np.einsum('ij,ij->i', self.matrix - query, self.matrix - query)
+        if language is not None:
+            same_language = self.languages == language
+            if same_language.any():
+                distances = np.where(same_language, distances, np.inf)
+        return self.profiles[int(np.argmin(distances))]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The catalog index, rebuilt when the catalog version changes."""
+    global _index, _index_version
+    from .models import VoiceProfile
+
+    version = catalog.get_version()
+    with _index_lock:
+        if _index is None or _index_version != version:
+            profiles = VoiceProfile.objects.filter(
+                is_active=True, acoustic_features__isnull=False
+            ).only('id', 'name', 'gender', 'emotion', 'language', 'acoustic_features')
+            _index = VoiceIndex(list(profiles))
+            _index_version = version
+        return _index
+
+
+def match_profile(voice_clone):
+    """Catalog profile that sounds closest to the clone, or None."""
+    vector = decode(voice_clone.acoustic_features)
+    if vector is None:
+        return None
+    return get_index().nearest(vector, language=voice_clone.language)
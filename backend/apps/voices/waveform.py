@@ -0,0 +1,78 @@
+"""
+Pre-computed waveform peaks for generated speech.
+
+compute() decodes a finished audio file block by block
+(audio_analysis.iter_blocks), keeps the minimum and maximum of every
+WINDOW_MS window, and reduces those to each of RESOLUTIONS buckets. The
+result is stored on GeneratedSpeech.waveform as
+
+    {'duration_ms': 5230, 'peaks': {'128': '<base64>', '512': ..., '2048': ...}}
+
+where each value is base64 of int8 (min, max) pairs scaled to ±127, so the
+history player can draw the waveform (and show the length) without
+fetching the audio. The history list carries LIST_RESOLUTION; the other
+resolutions are served per speech.
+
+Decoding MP3 needs ffmpeg; without it no waveform is recorded.
+"""
+
+import base64
+
+import numpy as np
+
+from . import audio_analysis
+
+RESOLUTIONS = (128, 512, 2048)
+LIST_RESOLUTION = 128
+WINDOW_MS = 10
+
+
+def _reduce(lows, highs, buckets):
+    # reduceat repeats a window when there are fewer windows than buckets
+    starts = np.arange(buckets) * len(lows) // buckets
+    return np.minimum.reduceat(lows, starts), np.maximum.reduceat(highs, starts)
+
+
+def encode(lows, highs):
+    pairs = np.stack([lows, highs], axis=1).ravel()
+    scaled = np.clip(np.round(pairs * 127), -127, 127).astype(np.int8)
+    return base64.b64encode(scaled.tobytes()).decode('ascii')
+
+
+def decode(encoded):
+    """[(min, max), ...] in [-1, 1] from an encoded resolution."""
+    scaled = np.frombuffer(base64.b64decode(encoded), dtype=np.int8).astype(np.float32) / 127
+    return [(float(low), float(high)) for low, high in scaled.reshape(-1, 2)]
+
+
+def compute(path):
+    """The waveform of an audio file, or None if it can't be decoded."""
+    lows, highs = [], []
+    total = 0
+    try:
+        sample_rate, blocks = audio_analysis.iter_blocks(path)
+        window = max(1, sample_rate * WINDOW_MS // 1000)
+        carry = np.zeros(0, dtype=np.float32)
+        for block in blocks:
+            total += len(block)
+            block = np.concatenate([carry, block])
+            usable = len(block) - len(block) % window
+            if usable:
+                frames = block[:usable].reshape(-1, window)
+                lows.append(frames.min(axis=1))
+                highs.append(frames.max(axis=1))
+            carry = block[usable:]
+        if len(carry):
+            lows.append(np.array([carry.min()]))
+            highs.append(np.array([carry.max()]))
+    except (audio_analysis.AudioDecodeError, OSError):
+        return None
+    if not lows:
+        return None
+
+    lows = np.concatenate(lows)
+    highs = np.concatenate(highs)
+    return {
+        'duration_ms': round(total * 1000 / sample_rate),
+        'peaks': {str(buckets): encode(*_reduce(lows, highs, buckets)) for buckets in RESOLUTIONS},
+    }
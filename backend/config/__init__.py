@@ -1 +1 @@
-# Config module
+# Config module
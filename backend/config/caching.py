@@ -0,0 +1,19 @@
+"""
+Whether the default cache is shared between worker processes.
+
+Without REDIS_URL the default cache is a per-process LocMemCache. Anything
+another worker has to see (invalidations, version bumps) must then not be
+trusted to it.
+"""
+
+from django.conf import settings
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared(alias='default'):
+    """True if every worker process sees the same `alias` cache."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
@@ -1,62 +1,184 @@
-"""
-Custom email backend using Resend Python SDK.
-Bypasses SMTP entirely — works on Railway where SMTP ports are blocked.
-"""
-
-import resend
-from django.conf import settings
-from django.core.mail.backends.base import BaseEmailBackend
-
-
-class ResendEmailBackend(BaseEmailBackend):
-    """
-    Send emails via Resend SDK (https://resend.com).
-    
-    Required settings:
-        RESEND_API_KEY = 'your-api-key'
-        DEFAULT_FROM_EMAIL = 'Your App <onboarding@resend.dev>'  (or verified domain)
-    """
-
-    def __init__(self, fail_silently=False, **kwargs):
-        super().__init__(fail_silently=fail_silently, **kwargs)
-        api_key = getattr(settings, 'RESEND_API_KEY', None)
-        if api_key:
-            resend.api_key = api_key
-
-    def send_messages(self, email_messages):
-        if not resend.api_key:
-            if not self.fail_silently:
-                raise ValueError("RESEND_API_KEY is not set in Django settings.")
-            return 0
-
-        sent_count = 0
-        for message in email_messages:
-            try:
-                self._send(message)
-                sent_count += 1
-            except Exception as e:
-                if not self.fail_silently:
-                    raise
-        return sent_count
-
-    def _send(self, message):
-        params: resend.Emails.SendParams = {
-            "from": message.from_email,
-            "to": list(message.to),
-            "subject": message.subject,
-        }
-
-        # Use HTML or plain text
-        if hasattr(message, 'content_subtype') and message.content_subtype == 'html':
-            params["html"] = message.body
-        else:
-            params["html"] = f"<p>{message.body}</p>"
-
-        # Add CC and BCC if present
-        if message.cc:
-            params["cc"] = list(message.cc)
-        if message.bcc:
-            params["bcc"] = list(message.bcc)
-
-        email = resend.Emails.send(params)
-        return email
+"""
+Custom email backend using Resend Python SDK.
+Bypasses SMTP entirely — works on Railway where SMTP ports are blocked.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import resend
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+from requests.adapters import HTTPAdapter
+
+
+class PartialSendError(Exception):
+    """
+    Some batches of a send_messages() call failed while others went out.
+
+    `sent_messages` are the messages that were delivered, so callers can
+    avoid sending them again.
+    """
+
+    def __init__(self, error, sent_messages):
+        super().__init__(str(error))
+        self.sent_messages = sent_messages
+
+    @property
+    def sent(self):
+        return len(self.sent_messages)
+
+
+class PooledRequestsClient(resend.HTTPClient):
+    """
+    Resend HTTP client backed by one shared requests.Session.
+
+    The SDK's default client calls requests.request(), which opens a new
+    TCP/TLS connection for every email. A session keeps connections alive
+    and pools them across backend instances and threads.
+    """
+
+    def __init__(self, timeout=30, pool_size=10):
+        self._timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def request(self, method, url, headers, json=None, files=None, data=None):
+        try:
+            resp = self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                json=json if data is None and files is None else None,
+                files=files,
+                data=data,
+                timeout=self._timeout,
+            )
+            return resp.content, resp.status_code, resp.headers
+        except requests.RequestException as e:
+            # Resend's Request wraps this into a ResendError
+            raise RuntimeError(f"Request failed: {e}") from e
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide pooled client, creating it on first use."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = PooledRequestsClient(
+                pool_size=ResendEmailBackend.max_workers
+            )
+        return _http_client
+
+
+class ResendEmailBackend(BaseEmailBackend):
+    """
+    Send emails via Resend SDK (https://resend.com).
+
+    Multiple messages go through Resend's batch endpoint (up to `batch_size`
+    per request); large sends are split into batches posted concurrently by
+    at most `max_workers` threads over a shared, pooled HTTP session. If only
+    some of those batches fail, PartialSendError says which messages went out.
+
+    Required settings:
+        RESEND_API_KEY = 'your-api-key'
+        DEFAULT_FROM_EMAIL = 'Your App <onboarding@resend.dev>'  (or verified domain)
+    """
+
+    batch_size = 100  # Resend's per-request batch limit
+    max_workers = 4
+    # Lets callers such as the email outbox hand over whole batches
+    supports_batch = True
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently, **kwargs)
+        api_key = getattr(settings, 'RESEND_API_KEY', None)
+        if api_key:
+            resend.api_key = api_key
+        resend.default_http_client = get_http_client()
+
+    def send_messages(self, email_messages):
+        if not resend.api_key:
+            if not self.fail_silently:
+                raise ValueError("RESEND_API_KEY is not set in Django settings.")
+            return 0
+
+        email_messages = [m for m in email_messages if m.recipients()]
+        if not email_messages:
+            return 0
+        if len(email_messages) == 1:
+            try:
+                self._send(email_messages[0])
+                return 1
+            except Exception:
+                if not self.fail_silently:
+                    raise
+                return 0
+
+        batches = [
+            email_messages[i:i + self.batch_size]
+            for i in range(0, len(email_messages), self.batch_size)
+        ]
+        if len(batches) == 1:
+            return self._send_batch_safely(batches[0])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            futures = [pool.submit(self._send_batch, batch) for batch in batches]
+
+        sent_messages = []
+        first_error = None
+        for batch, future in zip(batches, futures):
+            try:
+                future.result()
+                sent_messages += batch
+            except Exception as e:
+                first_error = first_error or e
+        if first_error is not None and not self.fail_silently:
+            if sent_messages:
+                raise PartialSendError(first_error, sent_messages) from first_error
+            raise first_error
+        return len(sent_messages)
+
+    def _send_batch_safely(self, messages):
+        try:
+            return self._send_batch(messages)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+
+    def _send_batch(self, messages):
+        resend.Batch.send([self._build_params(message) for message in messages])
+        return len(messages)
+
+    def _build_params(self, message):
+        params: resend.Emails.SendParams = {
+            "from": message.from_email,
+            "to": list(message.to),
+            "subject": message.subject,
+        }
+
+        # Use HTML or plain text
+        if hasattr(message, 'content_subtype') and message.content_subtype == 'html':
+            params["html"] = message.body
+        else:
+            params["html"] = f"<p>{message.body}</p>"
+
+        # Add CC and BCC if present
+        if message.cc:
+            params["cc"] = list(message.cc)
+        if message.bcc:
+            params["bcc"] = list(message.bcc)
+
+        return params
+
+    def _send(self, message):
+        email = resend.Emails.send(self._build_params(message))
+        return email
@@ -0,0 +1,153 @@
+"""
+Structured, non-blocking logging.
+
+Every record is written as one JSON object per line. Request threads only
+put records on an in-memory queue (AsyncQueueHandler); a listener thread
+formats and writes them, so slow stdout/pipe I/O never holds up a request.
+
+RequestIDMiddleware tags each request with an id (taken from an incoming
+X-Request-ID header or generated) that is attached to every record logged
+while handling it and echoed back in the response, so log lines can be
+correlated across a request.
+
+SamplingFilter keeps only a fraction of DEBUG records, so verbose
+diagnostics can stay enabled in production at a bounded volume.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+REQUEST_ID_RE = re.compile(r'^[\w.-]{1,64}$')
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id (on the logging thread)."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Pass only `rate` (0..1) of records at or below `max_level`."""
+
+    def __init__(self, rate=1.0, max_level='DEBUG'):
+        super().__init__()
+        self.rate = float(rate)
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+
+    def filter(self, record):
+        if record.levelno > self.max_level or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            payload['request_id'] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that owns its listener thread and output stream.
+
+    Filters attached to this handler run on the calling thread (so they see
+    the request's context); formatting and writing happen on the listener.
+    """
+
+    def __init__(self, stream=None, formatter=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self._target = logging.StreamHandler(stream or sys.stderr)
+        self._target.setFormatter(formatter or JSONFormatter())
+        self._listener = None
+        self._pid = None
+        self._start()
+        atexit.register(self.stop)
+
+    def _start(self):
+        self._pid = os.getpid()
+        self._listener = logging.handlers.QueueListener(self.queue, self._target)
+        self._listener.start()
+
+    def setFormatter(self, fmt):
+        # The formatter belongs to the writing side
+        self._target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve the message and traceback now: args and exc_info may not be
+        # safe to use from another thread later.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._target.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # Forked worker: the parent's listener thread does not exist here
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Drop rather than block the request thread
+            pass
+
+    def stop(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+
+
+class RequestIDMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request_id = incoming if REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+        request.request_id = request_id
+        token = _request_id.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response['X-Request-ID'] = request_id
+        return response
@@ -0,0 +1,273 @@
+"""
+Prometheus-style metrics.
+
+Counters and histograms are kept in memory per process. Gunicorn runs several
+worker processes, so each process periodically writes a snapshot of its
+values to METRICS_DIR (one JSON file per process); the /api/metrics/ endpoint
+merges every snapshot and renders the Prometheus text exposition format.
+
+Usage:
+    STAGE_SECONDS = metrics.histogram('voiceai_stage_seconds', 'Stage time', ['stage'])
+    with STAGE_SECONDS.time(stage='tts'):
+        ...
+    FAILURES = metrics.counter('voiceai_failures_total', 'Failures')
+    FAILURES.inc()
+"""
+
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+FLUSH_INTERVAL = 1.0
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def get_metrics_dir():
+    return str(getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'voiceai-metrics'))
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return json.dumps([str(labels[name]) for name in self.labelnames])
+
+    def describe(self):
+        return {'type': self.type, 'help': self.documentation, 'labels': list(self.labelnames)}
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+        self.registry.maybe_flush()
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def describe(self):
+        description = super().describe()
+        description['buckets'] = list(self.buckets)
+        return description
+
+
+class Registry:
+    """Holds this process's metrics and writes them to METRICS_DIR."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Request threads flush on their own; one snapshot write at a time
+        self.flush_lock = threading.Lock()
+        self.metrics = {}
+        self._last_flush = 0.0
+        self._started = int(time.time())
+
+    def _register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {**metric.describe(), 'samples': json.loads(json.dumps(metric.samples))}
+                for name, metric in self.metrics.items()
+            }
+
+    def snapshot_path(self):
+        # pid + start time, so a recycled pid never overwrites a dead worker's totals
+        return os.path.join(get_metrics_dir(), f'{os.getpid()}-{self._started}.json')
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush < FLUSH_INTERVAL:
+            return
+        # Another thread is already writing a fresh snapshot
+        if not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._write()
+        finally:
+            self.flush_lock.release()
+
+    def flush(self):
+        with self.flush_lock:
+            self._write()
+
+    def _write(self):
+        self._last_flush = time.monotonic()
+        path = self.snapshot_path()
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique, and not *.json, so collect() never reads a partial file
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(path), prefix=f'.{os.path.basename(path)}.', suffix='.tmp'
+            )
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Metrics must never break a request
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def reset(self):
+        """Forget all recorded values (used by tests)."""
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.samples = {}
+
+
+registry = Registry()
+counter = registry.counter
+histogram = registry.histogram
+atexit.register(registry.flush)
+
+
+def collect():
+    """Merge every process snapshot in METRICS_DIR into one set of metrics."""
+    registry.flush()
+    merged = {}
+    metrics_dir = get_metrics_dir()
+    try:
+        filenames = sorted(f for f in os.listdir(metrics_dir) if f.endswith('.json'))
+    except OSError:
+        filenames = []
+
+    for filename in filenames:
+        try:
+            with open(os.path.join(metrics_dir, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, 'samples': {}})
+            for key, value in metric['samples'].items():
+                if metric['type'] == 'counter':
+                    target['samples'][key] = target['samples'].get(key, 0) + value
+                else:
+                    current = target['samples'].get(key)
+                    if current is None:
+                        target['samples'][key] = value
+                    else:
+                        current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                        current['sum'] += value['sum']
+                        current['count'] += value['count']
+    return merged
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(metrics):
+    """Render merged metrics in the Prometheus text exposition format."""
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        labels = metric['labels']
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key in sorted(metric['samples']):
+            values = json.loads(key)
+            sample = metric['samples'][key]
+            if metric['type'] == 'counter':
+                lines.append(f'{name}{_format_labels(labels, values)} {_format_value(sample)}')
+                continue
+            for bound, count in zip(metric['buckets'], sample['buckets']):
+                le = ('le', _format_value(bound))
+                lines.append(f'{name}_bucket{_format_labels(labels, values, le)} {count}')
+            inf = ('le', '+Inf')
+            lines.append(f"{name}_bucket{_format_labels(labels, values, inf)} {sample['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels, values)} {_format_value(sample['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels, values)} {sample['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>` when METRICS_TOKEN is
+    set; otherwise it is only served in DEBUG.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        if request.headers.get('Authorization', '') != f'Bearer {token}':
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        return HttpResponse('Not Found', status=404, content_type='text/plain')
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
@@ -0,0 +1,65 @@
+"""
+Keyset (cursor) pagination for large, append-only listings.
+
+PageNumberPagination issues a COUNT(*) and an OFFSET scan on every page, so
+deep pages get slower as history grows. Cursor pagination seeks directly to
+the last row seen, so page N costs the same as page 1.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Cursor pagination over (created_at, id), newest first.
+
+    The cursor seeks on created_at; id is a tie-breaker so rows created in the
+    same instant keep a stable order. Clients may pass ?include_count=true to
+    receive an estimated total, cached briefly so it is not recomputed on
+    every page.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    include_count_query_param = 'include_count'
+    count_cache_timeout = 60
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated_count = None
+        if request.query_params.get(self.include_count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.estimated_count = self.get_estimated_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_estimated_count(self, queryset):
+        """Return a (possibly slightly stale) row count for the filtered queryset."""
+        sql = str(queryset.order_by().query)
+        key = 'pagination:count:' + hashlib.md5(sql.encode('utf-8')).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.estimated_count is not None:
+            payload['count'] = self.estimated_count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {
+            'type': 'integer',
+            'example': 123,
+        }
+        return response_schema
@@ -0,0 +1,146 @@
+"""
+On-demand request profiling for administrators.
+
+An admin adds `X-Profile: 1` (or `?_profile=1`) to any API request; the
+request then runs under cProfile and the stats are written to PROFILES_DIR.
+The response carries the file name in `X-Profile-Id`, and the admin
+endpoints list profiles and download them either as a raw .prof file (for
+snakeviz / pstats) or as a text summary (`?report=text`).
+
+The flag is ignored for everyone else, and PROFILES_DIR lives outside
+MEDIA_ROOT, which is served publicly.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from apps.users.views import IsAdminPermission
+
+PROFILE_NAME_RE = re.compile(r'^[\w-]+\.prof$')
+SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls')
+
+
+def get_profiles_dir():
+    return str(getattr(settings, 'PROFILES_DIR', None) or os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def profile_path(name):
+    """Absolute path of a stored profile; raises Http404 for unknown or unsafe names."""
+    if not PROFILE_NAME_RE.match(name):
+        raise Http404
+    path = os.path.join(get_profiles_dir(), name)
+    if not os.path.isfile(path):
+        raise Http404
+    return path
+
+
+def save_profile(profiler, label):
+    """Dump profiler stats to PROFILES_DIR and prune the oldest files."""
+    profiles_dir = get_profiles_dir()
+    os.makedirs(profiles_dir, exist_ok=True)
+    slug = re.sub(r'[^\w]+', '-', label).strip('-')[:60] or 'root'
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(os.path.join(profiles_dir, name))
+
+    keep = getattr(settings, 'PROFILES_MAX_FILES', 50)
+    stored = sorted(f for f in os.listdir(profiles_dir) if PROFILE_NAME_RE.match(f))
+    for old in stored[:-keep] if keep else []:
+        try:
+            os.remove(os.path.join(profiles_dir, old))
+        except OSError:
+            pass
+    return name
+
+
+def format_stats(path, sort='cumulative', limit=50):
+    """pstats text report for a stored profile."""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def _is_admin(request):
+    """Authenticate the raw request the way DRF views do and check admin rights."""
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        return bool(IsAdminPermission().has_permission(drf_request, None))
+    except APIException:
+        return False
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wants_profile = (
+            request.headers.get('X-Profile') == '1' or request.GET.get('_profile') == '1'
+        )
+        if not wants_profile or not getattr(settings, 'PROFILING_ENABLED', True):
+            return self.get_response(request)
+        if not _is_admin(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+        response['X-Profile-Id'] = save_profile(profiler, f'{request.method}-{request.path}')
+        return response
+
+
+class ProfileListView(APIView):
+    """List stored request profiles, newest first."""
+
+    permission_classes = [IsAdminPermission]
+
+    def get(self, request):
+        profiles_dir = get_profiles_dir()
+        try:
+            names = [f for f in os.listdir(profiles_dir) if PROFILE_NAME_RE.match(f)]
+        except OSError:
+            names = []
+        profiles = []
+        for name in sorted(names, reverse=True):
+            stat = os.stat(os.path.join(profiles_dir, name))
+            profiles.append({'name': name, 'size': stat.st_size, 'created_at': stat.st_mtime})
+        return Response(profiles)
+
+
+class ProfileDownloadView(APIView):
+    """
+    Download one profile.
+
+    Returns the raw .prof file, or a pstats report with `?report=text`
+    (optionally `&sort=tottime&limit=100`).
+    """
+
+    permission_classes = [IsAdminPermission]
+
+    def get(self, request, name):
+        path = profile_path(name)
+        if request.query_params.get('report') == 'text':
+            sort = request.query_params.get('sort', 'cumulative')
+            if sort not in SORT_KEYS:
+                sort = 'cumulative'
+            try:
+                limit = int(request.query_params.get('limit', 50))
+            except ValueError:
+                limit = 50
+            return HttpResponse(format_stats(path, sort, limit), content_type='text/plain; charset=utf-8')
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
@@ -1,315 +1,463 @@
-"""
-Django settings for AI Voice Cloning application.
-Optimized for deployment on Railway.app.
-"""
-
-import os
-from pathlib import Path
-from datetime import timedelta
-import dj_database_url
-from dotenv import load_dotenv
-
-# Force IPv4 on Railway (IPv6 is not available in Railway containers,
-# causing "Network is unreachable" when connecting to smtp.gmail.com)
-import socket
-_original_getaddrinfo = socket.getaddrinfo
-
-def _ipv4_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
-    """Force IPv4 by setting family to AF_INET when family is unspecified."""
-    if family == 0:
-        family = socket.AF_INET
-    return _original_getaddrinfo(host, port, family, type, proto, flags)
-
-if os.getenv('ENVIRONMENT') == 'production':
-    socket.getaddrinfo = _ipv4_getaddrinfo
-
-# Load environment variables from .env only in development
-# In production, Railway injects them directly
-load_dotenv()
-
-# =============================================================================
-# Core Settings
-# =============================================================================
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-change-this-in-production')
-
-# Railway sets ENVIRONMENT automatically, default to 'production' if not set
-ENVIRONMENT = os.getenv('ENVIRONMENT', 'production')
-DEBUG = ENVIRONMENT == 'development'
-
-ALLOWED_HOSTS = [h.strip() for h in os.getenv('ALLOWED_HOSTS', '').split(',') if h.strip()]
-# Railway automatically injects RAILWAY_PUBLIC_DOMAIN with the generated domain
-RAILWAY_PUBLIC_DOMAIN = os.getenv('RAILWAY_PUBLIC_DOMAIN', '')
-if RAILWAY_PUBLIC_DOMAIN:
-    ALLOWED_HOSTS.append(RAILWAY_PUBLIC_DOMAIN)
-# Always accept *.railway.app so domain regeneration never breaks the app
-ALLOWED_HOSTS.append('.railway.app')
-if DEBUG:
-    ALLOWED_HOSTS = ['*']  # Allow all hosts in development
-
-ROOT_URLCONF = 'config.urls'
-WSGI_APPLICATION = 'config.wsgi.application'
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-
-
-# =============================================================================
-# Application Definition
-# =============================================================================
-
-INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    # Third party
-    'rest_framework',
-    'rest_framework_simplejwt',
-    'corsheaders',
-    'django_filters',
-    # Local apps
-    'apps.users',
-    'apps.voices',
-    'apps.payments',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Serves static files efficiently
-    'corsheaders.middleware.CorsMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
-
-
-# =============================================================================
-# Database
-# =============================================================================
-# Railway provides a DATABASE_URL environment variable (usually PostgreSQL)
-# If not set, fallback to SQLite for local testing (not recommended in production)
-DATABASE_URL = os.getenv('DATABASE_URL') or os.getenv('MYSQL_URL')
-if DATABASE_URL:
-    DATABASES = {
-        'default': dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
-    }
-else:
-    # Local fallback – use SQLite
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
-        }
-    }
-
-
-# =============================================================================
-# Authentication
-# =============================================================================
-
-AUTH_USER_MODEL = 'users.User'
-
-AUTH_PASSWORD_VALIDATORS = [
-    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
-]
-
-
-# =============================================================================
-# Internationalization
-# =============================================================================
-
-LANGUAGE_CODE = 'en-us'
-TIME_ZONE = 'UTC'
-USE_I18N = True
-USE_TZ = True
-
-
-# =============================================================================
-# Static & Media Files
-# =============================================================================
-
-STATIC_URL = 'static/'
-STATIC_ROOT = BASE_DIR / 'staticfiles'
-
-MEDIA_URL = 'media/'
-MEDIA_ROOT = BASE_DIR / 'media'
-
-STORAGES = {
-    "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
-    },
-    "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
-    },
-}
-
-
-# =============================================================================
-# REST Framework
-# =============================================================================
-
-REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ),
-    'DEFAULT_PERMISSION_CLASSES': (
-        'rest_framework.permissions.IsAuthenticated',
-    ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20,
-    'DEFAULT_FILTER_BACKENDS': [
-        'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
-    ],
-}
-
-
-# =============================================================================
-# JWT
-# =============================================================================
-
-SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
-    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
-    'ROTATE_REFRESH_TOKENS': True,
-    'BLACKLIST_AFTER_ROTATION': True,
-    'AUTH_HEADER_TYPES': ('Bearer',),
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
-}
-
-
-# =============================================================================
-# CORS & CSRF
-# =============================================================================
-
-# In production, set CORS_ALLOWED_ORIGINS to your frontend domain(s)
-# Helper to clean origins (remove paths/trailing slashes)
-def clean_origin(url):
-    url = url.strip()
-    if not url: return ''
-    try:
-        from urllib.parse import urlparse
-        p = urlparse(url)
-        if p.scheme and p.netloc:
-            return f"{p.scheme}://{p.netloc}"
-    except:
-        pass
-    return url.rstrip('/')
-
-if DEBUG:
-    CORS_ALLOWED_ORIGINS = [
-        "http://localhost:5173",
-        "http://localhost:3000",
-        "http://127.0.0.1:5173",
-        "http://127.0.0.1:3000",
-    ]
-    CORS_ALLOW_CREDENTIALS = True
-else:
-    CORS_ALLOWED_ORIGINS = [clean_origin(o) for o in os.getenv('CORS_ALLOWED_ORIGINS', '').split(',') if o.strip()]
-    CORS_ALLOW_CREDENTIALS = True
-    
-    FRONTEND_URL = clean_origin(os.getenv('FRONTEND_URL', ''))
-    if FRONTEND_URL and FRONTEND_URL not in CORS_ALLOWED_ORIGINS:
-        CORS_ALLOWED_ORIGINS.append(FRONTEND_URL)
-
-CSRF_TRUSTED_ORIGINS = [clean_origin(o) for o in os.getenv('CSRF_TRUSTED_ORIGINS', '').split(',') if o.strip()]
-# Auto-add Railway public domain for CSRF
-if RAILWAY_PUBLIC_DOMAIN:
-    railway_origin = f'https://{RAILWAY_PUBLIC_DOMAIN}'
-    if railway_origin not in CSRF_TRUSTED_ORIGINS:
-        CSRF_TRUSTED_ORIGINS.append(railway_origin)
-
-
-# =============================================================================
-# Email
-# =============================================================================
-
-# In production (Railway), use Resend HTTP API since SMTP ports are blocked.
-# In development, use regular Gmail SMTP.
-RESEND_API_KEY = os.getenv('RESEND_API_KEY')
-
-if RESEND_API_KEY and not DEBUG:
-    # Production: Resend HTTP API (no SMTP needed)
-    EMAIL_BACKEND = 'config.email_backend.ResendEmailBackend'
-    DEFAULT_FROM_EMAIL = 'onboarding@resend.dev'
-else:
-    # Development: Gmail SMTP
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-    EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
-    EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
-    EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
-    EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', 'False').lower() == 'true'
-    EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
-    EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
-    DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
-    EMAIL_TIMEOUT = 30
-
-
-# =============================================================================
-# Security (Production)
-# =============================================================================
-
-if not DEBUG:
-    # Security settings for HTTPS
-    SECURE_SSL_REDIRECT = True
-    SESSION_COOKIE_SECURE = True
-    CSRF_COOKIE_SECURE = True
-    SECURE_BROWSER_XSS_FILTER = True
-    SECURE_CONTENT_TYPE_NOSNIFF = True
-    SECURE_HSTS_SECONDS = 31536000
-    SECURE_HSTS_INCLUDE_SUBDOMAINS = True
-    SECURE_HSTS_PRELOAD = True
-    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
-    # Adjust SameSite for cross‑origin cookies if needed
-    CSRF_COOKIE_SAMESITE = "None" if CORS_ALLOW_CREDENTIALS else "Lax"
-    SESSION_COOKIE_SAMESITE = "None" if CORS_ALLOW_CREDENTIALS else "Lax"
-
-
-# =============================================================================
-# Logging (optional)
-# =============================================================================
-
-LOGGING = {
-    'version': 1,
-    'disable_existing_loggers': False,
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-        },
-    },
-    'root': {
-        'handlers': ['console'],
-        'level': 'WARNING',
-    },
+"""
+Django settings for AI Voice Cloning application.
+Optimized for deployment on Railway.app.
+"""
+
+import os
+from pathlib import Path
+from datetime import timedelta
+import dj_database_url
+from dotenv import load_dotenv
+
+# Force IPv4 on Railway (IPv6 is not available in Railway containers,
+# causing "Network is unreachable" when connecting to smtp.gmail.com)
+import socket
+_original_getaddrinfo = socket.getaddrinfo
+
+def _ipv4_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """Force IPv4 by setting family to AF_INET when family is unspecified."""
+    if family == 0:
+        family = socket.AF_INET
+    return _original_getaddrinfo(host, port, family, type, proto, flags)
+
+if os.getenv('ENVIRONMENT') == 'production':
+    socket.getaddrinfo = _ipv4_getaddrinfo
+
+# Load environment variables from .env only in development
+# In production, Railway injects them directly
+load_dotenv()
+
+# =============================================================================
+# Core Settings
+# =============================================================================
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-change-this-in-production')
+
+# Railway sets ENVIRONMENT automatically, default to 'production' if not set
+ENVIRONMENT = os.getenv('ENVIRONMENT', 'production')
+DEBUG = ENVIRONMENT == 'development'
+
+ALLOWED_HOSTS = [h.strip() for h in os.getenv('ALLOWED_HOSTS', '').split(',') if h.strip()]
+# Railway automatically injects RAILWAY_PUBLIC_DOMAIN with the generated domain
+RAILWAY_PUBLIC_DOMAIN = os.getenv('RAILWAY_PUBLIC_DOMAIN', '')
+if RAILWAY_PUBLIC_DOMAIN:
+    ALLOWED_HOSTS.append(RAILWAY_PUBLIC_DOMAIN)
+# Always accept *.railway.app so domain regeneration never breaks the app
+ALLOWED_HOSTS.append('.railway.app')
+if DEBUG:
+    ALLOWED_HOSTS = ['*']  # Allow all hosts in development
+
+ROOT_URLCONF = 'config.urls'
+WSGI_APPLICATION = 'config.wsgi.application'
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# =============================================================================
+# Application Definition
+# =============================================================================
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    # Third party
+    'rest_framework',
+    'rest_framework_simplejwt',
+    'corsheaders',
+    'django_filters',
+    # Local apps
+    'apps.users',
+    'apps.voices',
+    'apps.payments',
+]
+
+MIDDLEWARE = [
+    'config.log.RequestIDMiddleware',  # Request id for log correlation
+    'config.timing.ServerTimingMiddleware',  # Outermost, so `total` covers every layer
+    'config.profiling.ProfilingMiddleware',  # Admin-only, on request (X-Profile: 1)
+    'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # Serves static files efficiently
+    'corsheaders.middleware.CorsMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+
+# =============================================================================
+# Database
+# =============================================================================
+# Railway provides a DATABASE_URL environment variable (usually PostgreSQL)
+# If not set, fallback to SQLite for local testing (not recommended in production)
+DATABASE_URL = os.getenv('DATABASE_URL') or os.getenv('MYSQL_URL')
+if DATABASE_URL:
+    DATABASES = {
+        'default': dj_database_url.config(
+            default=DATABASE_URL,
+            conn_max_age=600,
+            conn_health_checks=True,
+        )
+    }
+else:
+    # Local fallback – use SQLite
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+# Set REDIS_URL to share the cache between Gunicorn workers; otherwise each
+# worker keeps its own in-memory cache.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'voiceai-default',
+        }
+    }
+
+
+# =============================================================================
+# Authentication
+# =============================================================================
+
+AUTH_USER_MODEL = 'users.User'
+
+AUTH_PASSWORD_VALIDATORS = [
+    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
+]
+
+
+# =============================================================================
+# Internationalization
+# =============================================================================
+
+LANGUAGE_CODE = 'en-us'
+TIME_ZONE = 'UTC'
+USE_I18N = True
+USE_TZ = True
+
+
+# =============================================================================
+# Static & Media Files
+# =============================================================================
+
+STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+    # Archived generated audio (see apply_retention); not publicly served
+    "cold": {
+        "BACKEND": os.getenv('COLD_STORAGE_BACKEND', 'django.core.files.storage.FileSystemStorage'),
+        "OPTIONS": {"location": os.getenv('COLD_STORAGE_ROOT', str(BASE_DIR / 'cold_storage'))},
+    },
+}
+
+
+# =============================================================================
+# REST Framework
+# =============================================================================
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        # simplejwt's JWTAuthentication with users resolved from cache
+        'apps.users.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_PERMISSION_CLASSES': (
+        'rest_framework.permissions.IsAuthenticated',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'PAGE_SIZE': 20,
+    'DEFAULT_FILTER_BACKENDS': [
+        'django_filters.rest_framework.DjangoFilterBackend',
+        'rest_framework.filters.SearchFilter',
+        'rest_framework.filters.OrderingFilter',
+    ],
+    # Token-bucket budgets (see config/throttling.py): burst size per period
+    'DEFAULT_THROTTLE_RATES': {
+        'generate': os.getenv('THROTTLE_GENERATE', '10/min'),
+        'preview': os.getenv('THROTTLE_PREVIEW', '20/min'),
+        'bulk': os.getenv('THROTTLE_BULK', '5/hour'),
+        'translate': os.getenv('THROTTLE_TRANSLATE', '30/min'),
+        'otp': os.getenv('THROTTLE_OTP', '5/hour'),
+        'text_mail': os.getenv('THROTTLE_TEXT_MAIL', '10/hour'),
+    },
+}
+
+# Max generations a single user may have in flight at once
+GENERATION_MAX_CONCURRENT = int(os.getenv('GENERATION_MAX_CONCURRENT', 2))
+GENERATION_SLOT_TIMEOUT = 300
+
+# Bulk generation (/api/voices/generate/bulk/): manifest size and how many
+# syntheses one request runs in parallel
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 500))
+BULK_CONCURRENCY = int(os.getenv('BULK_CONCURRENCY', 4))
+# Concurrent syntheses (one event loop) for uncached document paragraphs,
+# dialogue lines and fan-out previews
+SEGMENT_CONCURRENCY = int(os.getenv('SEGMENT_CONCURRENCY', 4))
+# Segmented (HLS) generations: segment length, how many are synthesized at
+# once in the background and how many may be queued or running per worker
+# process (more get a 429), and after how long an unfinished one counts as
+# lost (python manage.py sweep_segmented refunds and removes it)
+HLS_SEGMENT_SECONDS = int(os.getenv('HLS_SEGMENT_SECONDS', 6))
+HLS_CONCURRENCY = int(os.getenv('HLS_CONCURRENCY', 4))
+HLS_MAX_PENDING = int(os.getenv('HLS_MAX_PENDING', 16))
+HLS_ORPHAN_SECONDS = int(os.getenv('HLS_ORPHAN_SECONDS', 1800))
+
+
+# =============================================================================
+# JWT
+# =============================================================================
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'ROTATE_REFRESH_TOKENS': True,
+    'BLACKLIST_AFTER_ROTATION': True,
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+}
+
+# Authenticated users are cached for this many seconds (shared cache) and
+# re-read from the shared cache at most every AUTH_USER_LOCAL_CACHE_TIMEOUT.
+# Without REDIS_URL only the local level (AUTH_USER_LOCAL_CACHE_TIMEOUT) is used.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+AUTH_USER_LOCAL_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_LOCAL_CACHE_TIMEOUT', 5))
+
+
+# =============================================================================
+# CORS & CSRF
+# =============================================================================
+
+# In production, set CORS_ALLOWED_ORIGINS to your frontend domain(s)
+# Helper to clean origins (remove paths/trailing slashes)
+def clean_origin(url):
+    url = url.strip()
+    if not url: return ''
+    try:
+        from urllib.parse import urlparse
+        p = urlparse(url)
+        if p.scheme and p.netloc:
+            return f"{p.scheme}://{p.netloc}"
+    except:
+        pass
+    return url.rstrip('/')
+
+if DEBUG:
+    CORS_ALLOWED_ORIGINS = [
+        "http://localhost:5173",
+        "http://localhost:3000",
+        "http://127.0.0.1:5173",
+        "http://127.0.0.1:3000",
+    ]
+    CORS_ALLOW_CREDENTIALS = True
+else:
+    CORS_ALLOWED_ORIGINS = [clean_origin(o) for o in os.getenv('CORS_ALLOWED_ORIGINS', '').split(',') if o.strip()]
+    CORS_ALLOW_CREDENTIALS = True
+    
+    FRONTEND_URL = clean_origin(os.getenv('FRONTEND_URL', ''))
+    if FRONTEND_URL and FRONTEND_URL not in CORS_ALLOWED_ORIGINS:
+        CORS_ALLOWED_ORIGINS.append(FRONTEND_URL)
+
+CSRF_TRUSTED_ORIGINS = [clean_origin(o) for o in os.getenv('CSRF_TRUSTED_ORIGINS', '').split(',') if o.strip()]
+# Auto-add Railway public domain for CSRF
+if RAILWAY_PUBLIC_DOMAIN:
+    railway_origin = f'https://{RAILWAY_PUBLIC_DOMAIN}'
+    if railway_origin not in CSRF_TRUSTED_ORIGINS:
+        CSRF_TRUSTED_ORIGINS.append(railway_origin)
+
+
+# =============================================================================
+# Email
+# =============================================================================
+
+# In production (Railway), use Resend HTTP API since SMTP ports are blocked.
+# In development, use regular Gmail SMTP.
+RESEND_API_KEY = os.getenv('RESEND_API_KEY')
+
+if RESEND_API_KEY and not DEBUG:
+    # Production: Resend HTTP API (no SMTP needed)
+    EMAIL_BACKEND = 'config.email_backend.ResendEmailBackend'
+    DEFAULT_FROM_EMAIL = 'onboarding@resend.dev'
+else:
+    # Development: Gmail SMTP
+    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
+    EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
+    EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
+    EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', 'False').lower() == 'true'
+    EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
+    EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
+    DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+    EMAIL_TIMEOUT = 30
+
+
+# =============================================================================
+# Security (Production)
+# =============================================================================
+
+if not DEBUG:
+    # Security settings for HTTPS
+    SECURE_SSL_REDIRECT = True
+    SESSION_COOKIE_SECURE = True
+    CSRF_COOKIE_SECURE = True
+    SECURE_BROWSER_XSS_FILTER = True
+    SECURE_CONTENT_TYPE_NOSNIFF = True
+    SECURE_HSTS_SECONDS = 31536000
+    SECURE_HSTS_INCLUDE_SUBDOMAINS = True
+    SECURE_HSTS_PRELOAD = True
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+    # Adjust SameSite for cross‑origin cookies if needed
+    CSRF_COOKIE_SAMESITE = "None" if CORS_ALLOW_CREDENTIALS else "Lax"
+    SESSION_COOKIE_SAMESITE = "None" if CORS_ALLOW_CREDENTIALS else "Lax"
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+# Each worker process writes its metric snapshot here; /api/metrics/ merges
+# them. Scrapers authenticate with `Authorization: Bearer $METRICS_TOKEN`.
+METRICS_DIR = os.getenv('METRICS_DIR', '/tmp/voiceai-metrics')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+# =============================================================================
+# Audio
+# =============================================================================
+# Used to transcode edge-tts MP3 into the other output formats
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+
+# Retention of generated audio (python manage.py apply_retention), by age
+# in days; 0 turns a step off, and every step is off unless configured.
+# MP3 audio is re-encoded to RETENTION_COMPACT_FORMAT, then audio is moved
+# to the "cold" storage (no longer downloadable), then deleted. Cached
+# speech segments unused for RETENTION_SEGMENT_DAYS are deleted.
+RETENTION_COMPACT_DAYS = int(os.getenv('RETENTION_COMPACT_DAYS', 0))
+RETENTION_COMPACT_FORMAT = os.getenv('RETENTION_COMPACT_FORMAT', 'mp3_low')
+RETENTION_COLD_DAYS = int(os.getenv('RETENTION_COLD_DAYS', 0))
+RETENTION_EXPIRE_DAYS = int(os.getenv('RETENTION_EXPIRE_DAYS', 0))
+RETENTION_SEGMENT_DAYS = int(os.getenv('RETENTION_SEGMENT_DAYS', 0))
+
+# Chunked clone-sample uploads are staged here (outside MEDIA_ROOT) until
+# the clone is created
+CLONE_UPLOAD_STAGING_DIR = os.getenv('CLONE_UPLOAD_STAGING_DIR', str(BASE_DIR / 'upload_staging'))
+CLONE_UPLOAD_MAX_BYTES = int(os.getenv('CLONE_UPLOAD_MAX_BYTES', str(50 * 1024 * 1024)))
+CLONE_UPLOAD_CHUNK_BYTES = int(os.getenv('CLONE_UPLOAD_CHUNK_BYTES', str(5 * 1024 * 1024)))
+
+
+# =============================================================================
+# Request timing
+# =============================================================================
+# Adds a Server-Timing header (db, auth, tts, translate, serialize, total)
+# to every response (by default only in development: it tells any client
+# how long queries and upstream calls take), and logs requests slower than
+# SLOW_REQUEST_MS (0 = off).
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', str(DEBUG)).lower() == 'true'
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '5000'))
+
+
+# =============================================================================
+# Profiling
+# =============================================================================
+# Admins can profile a single request with `X-Profile: 1` or `?_profile=1`.
+# Profiles are kept outside MEDIA_ROOT (which is publicly served).
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True').lower() == 'true'
+PROFILES_DIR = os.getenv('PROFILES_DIR', str(BASE_DIR / 'profiles'))
+PROFILES_MAX_FILES = int(os.getenv('PROFILES_MAX_FILES', '50'))
+
+
+# =============================================================================
+# Logging
+# =============================================================================
+# JSON lines on stdout, written off the request thread; only LOG_DEBUG_SAMPLE_RATE
+# of DEBUG records are kept. Set LOG_LEVEL=DEBUG to see request diagnostics.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'config.log.JSONFormatter',
+        },
+    },
+    'filters': {
+        'request_context': {
+            '()': 'config.log.RequestContextFilter',
+        },
+        'debug_sampling': {
+            '()': 'config.log.SamplingFilter',
+            'rate': float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1')),
+        },
+    },
+    'handlers': {
+        'console': {
+            # JSON lines written to stdout by a background listener thread
+            'class': 'config.log.AsyncQueueHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': 'json',
+            'filters': ['request_context', 'debug_sampling'],
+        },
+    },
+    'loggers': {
+        'apps': {
+            'level': os.getenv('LOG_LEVEL', 'INFO'),
+        },
+        'config': {
+            'level': os.getenv('LOG_LEVEL', 'INFO'),
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'WARNING',
+    },
 }
\ No newline at end of file
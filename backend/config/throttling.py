@@ -0,0 +1,160 @@
+"""
+Rate limiting for expensive endpoints.
+
+Token-bucket throttles keep their state in the Django cache (shared between
+Gunicorn workers when REDIS_URL is set), so clients get short bursts but a
+bounded sustained rate. Generation additionally caps how many requests a
+single user may have in flight at once, so one account cannot tie up every
+worker thread.
+
+Rates are configured per scope in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+using DRF's "<requests>/<period>" format; the number is both the bucket size
+and the refill per period.
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60)."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket keyed by user id (or client IP for anonymous requests).
+
+    The read-modify-write on the cache is not atomic, so concurrent requests
+    from one client may occasionally slip one or two past the limit; that is
+    an acceptable trade for not needing a lock on every request.
+    """
+
+    scope = None
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        return self._take(request, self.get_scope(request, view), 1)
+
+    def consume(self, request, count):
+        """
+        Take `count` more tokens for work a view only sizes up after throttling.
+
+        Raises Throttled (taking none) if the bucket does not hold them. A
+        count above the bucket size takes the whole bucket.
+        """
+        if count > 0 and not self._take(request, self.get_scope(request, None), count):
+            raise Throttled(wait=self.wait())
+
+    def _take(self, request, scope, count):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if not rate:
+            return True
+
+        capacity, period = parse_rate(rate)
+        count = min(count, capacity)
+        refill_per_second = capacity / period
+        key = f'throttle:{scope}:{self.get_ident_key(request)}'
+        now = time.time()
+
+        tokens, last = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill_per_second)
+        if tokens < count:
+            self._wait = (count - tokens) / refill_per_second
+            cache.set(key, (tokens, now), period)
+            return False
+
+        cache.set(key, (tokens - count, now), period)
+        return True
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class GenerationRateThrottle(TokenBucketThrottle):
+    """Separate budgets for free previews and paid generations."""
+
+    def get_scope(self, request, view):
+        is_preview = request.data.get('is_preview') if hasattr(request.data, 'get') else False
+        if str(is_preview).lower() in ('true', '1'):
+            return 'preview'
+        return 'generate'
+
+
+class PreviewRateThrottle(TokenBucketThrottle):
+    """Previews; the fan-out view also consumes a token per extra voice it synthesizes."""
+
+    scope = 'preview'
+
+
+class BulkGenerationRateThrottle(TokenBucketThrottle):
+    scope = 'bulk'
+
+
+class TranslateRateThrottle(TokenBucketThrottle):
+    scope = 'translate'
+
+
+class OTPRateThrottle(TokenBucketThrottle):
+    scope = 'otp'
+
+
+class TextMailRateThrottle(TokenBucketThrottle):
+    scope = 'text_mail'
+
+
+def _slot_keys(user_id):
+    limit = getattr(settings, 'GENERATION_MAX_CONCURRENT', 2)
+    return [f'throttle:generation-slots:{user_id}:{position}' for position in range(limit)]
+
+
+def slots_in_use(user_id):
+    """How many of the user's generation slots are currently held."""
+    return len(cache.get_many(_slot_keys(user_id)))
+
+
+@contextmanager
+def generation_slot(user_id):
+    """
+    Hold one of the user's concurrent generation slots for the block.
+
+    Raises Throttled (429) when the user already has
+    GENERATION_MAX_CONCURRENT generations running. Each slot is its own
+    cache key, taken with an atomic add() and carrying its own TTL, so a
+    slot that expires (after GENERATION_SLOT_TIMEOUT seconds, in case a
+    worker dies mid-request) frees only itself and never disturbs the
+    count of the others.
+    """
+    timeout = getattr(settings, 'GENERATION_SLOT_TIMEOUT', 300)
+    token = uuid.uuid4().hex
+    for key in _slot_keys(user_id):
+        if cache.add(key, token, timeout):
+            break
+    else:
+        raise Throttled(
+            wait=5,
+            detail='Too many generations in progress. Please wait for one to finish.',
+        )
+    try:
+        yield
+    finally:
+        # Only if it is still ours: after expiring it may belong to a newer generation
+        if cache.get(key) == token:
+            cache.delete(key)
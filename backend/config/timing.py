@@ -0,0 +1,122 @@
+"""
+Per-request timing.
+
+ServerTimingMiddleware collects named spans for the duration of a request
+and returns them in a `Server-Timing` header, so the browser devtools (or
+curl -i) show where a slow request spent its time:
+
+    Server-Timing: db;dur=12.4;desc="7 queries", tts;dur=1830.2, total;dur=1871.0
+
+Database time is captured automatically through a connection execute
+wrapper. Other code marks its own spans:
+
+    from config import timing
+    with timing.span('tts'):
+        ...
+
+Spans with the same name are summed. Outside a request (management
+commands, tests calling services directly) span() does nothing.
+
+The header is only sent with SERVER_TIMING_HEADER (on by default in
+development). Requests slower than SLOW_REQUEST_MS are logged with their
+span breakdown either way.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class Timings:
+    """Span totals for one request: name -> [milliseconds, count]."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+
+    def add(self, name, duration_ms):
+        entry = self.spans.setdefault(name, [0.0, 0])
+        entry[0] += duration_ms
+        entry[1] += 1
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def header_value(self, total_ms):
+        parts = []
+        for name, (duration_ms, count) in self.spans.items():
+            part = f'{name};dur={duration_ms:.1f}'
+            if name == 'db':
+                part += f';desc="{count} queries"'
+            parts.append(part)
+        parts.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(parts)
+
+
+def current():
+    """The active request's Timings, or None outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the current request's `name` span."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - started) * 1000)
+
+
+def _time_queries(execute, sql, params, many, context):
+    with span('db'):
+        return execute(sql, params, many, context)
+
+
+class TimedAuthenticationMixin:
+    """Report DRF authentication (token decode + user lookup) as an 'auth' span."""
+
+    def perform_authentication(self, request):
+        with span('auth'):
+            super().perform_authentication(request)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            with connection.execute_wrapper(_time_queries):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total_ms = timings.total_ms()
+        if getattr(settings, 'SERVER_TIMING_HEADER', False):
+            response['Server-Timing'] = timings.header_value(total_ms)
+
+        threshold = getattr(settings, 'SLOW_REQUEST_MS', 0)
+        if threshold and total_ms >= threshold:
+            breakdown = ' '.join(
+                f'{name}={duration_ms:.0f}ms' for name, (duration_ms, _) in timings.spans.items()
+            )
+            logger.warning(
+                'Slow request %s %s -> %s in %.0fms %s',
+                request.method, request.path, response.status_code, total_ms, breakdown,
+            )
+        return response
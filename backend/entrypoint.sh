@@ -11,5 +11,14 @@ python manage.py ensure_admin
 echo "Collecting static files..."
 python manage.py collectstatic --noinput || echo "WARNING: collectstatic failed, continuing..."
 
+# Drop metric snapshots left by previous container runs
+rm -rf "${METRICS_DIR:-/tmp/voiceai-metrics}"
+
+echo "Starting email dispatcher..."
+python manage.py dispatch_emails &
+
+echo "Starting clone processor..."
+python manage.py process_clones &
+
 echo "Starting Gunicorn on port ${PORT:-8000}..."
 exec gunicorn config.wsgi:application --bind 0.0.0.0:${PORT:-8000} --workers 2 --threads 2 --timeout 120